@@ -0,0 +1,73 @@
+# benchmarks/bench_classifier.py
+"""
+Micro-benchmark for the zero-shot classifier in modules/ai_correlator.py
+
+Runs the model (ai_correlator.run_classifier, without the verdict cache) over distinct
+synthetic Bing titles/snippets with batch sizes 1, 8 and 32 and reports items/sec for
+each. Model load time is measured separately.
+
+Usage: python benchmarks/bench_classifier.py [--items 64] [--batch-sizes 1,8,32]
+"""
+import os
+import sys
+import time
+import argparse
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules import ai_correlator
+
+console = Console()
+
+SAMPLES = [
+    ("John Doe (@johndoe) • Instagram photos and videos", "1,204 Followers, 310 Following, 85 Posts - See Instagram photos and videos from John Doe"),
+    ("John Doe - Senior Engineer - Acme Corp | LinkedIn", "View John Doe's profile on LinkedIn, the world's largest professional community."),
+    ("Local man John Doe wins city marathon", "John Doe crossed the finish line in 2:41, local news reports on Sunday."),
+    ("Acme Corp - Industrial Solutions", "Acme Corp provides industrial automation solutions since 1985."),
+    ("How I built my home lab - John's blog", "In this post I walk through the hardware and software of my home lab."),
+    ("johndoe - Overview", "johndoe has 42 repositories available. Follow their code on GitHub."),
+]
+
+
+def make_texts(n: int) -> list[str]:
+    """n distinct texts in the format classify_profiles sends to the model."""
+    texts = []
+    for i in range(n):
+        title, snippet = SAMPLES[i % len(SAMPLES)]
+        texts.append(f"Title: {title} ({i}). Snippet: {snippet} Result {i} of {n}.")
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zero-shot classifier batch-size benchmark")
+    parser.add_argument("--items", type=int, default=64)
+    parser.add_argument("--batch-sizes", default="1,8,32")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    ai_correlator.get_classifier()
+    console.print(f"[cyan]Model load:[/] {time.perf_counter() - start:.2f}s")
+
+    texts = make_texts(args.items)
+    ai_correlator.run_classifier(make_texts(2), batch_size=2)  # warm-up
+
+    table = Table(title=f"Zero-shot classification, {args.items} items")
+    table.add_column("Batch size", justify="right")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Items/sec", justify="right")
+    reference = None
+    for batch_size in [int(b) for b in args.batch_sizes.split(',')]:
+        start = time.perf_counter()
+        labels = [label for label, _ in ai_correlator.run_classifier(texts, batch_size=batch_size)]
+        elapsed = time.perf_counter() - start
+        if reference is None:
+            reference = labels
+        elif labels != reference:
+            console.print(f"[yellow]Batch size {batch_size} disagrees with the first batch size on some items[/]")
+        table.add_row(str(batch_size), f"{elapsed:.2f}", f"{len(texts) / elapsed:.1f}")
+    console.print(table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/bench_classifier_backends.py
+"""
+Benchmark for the zero-shot classifier backends in modules/classifier_backends.py
+
+- Runs every backend in its own subprocess, so peak RSS is measured per backend
+- Classifies the labeled fixture set (fixtures/classifier/labeled.json) in batches
+  and reports load time, throughput, p50/p95 batch latency and peak RSS
+- Reports accuracy against the fixture labels and agreement with the reference
+  "transformers" backend (same top label)
+- The classifier cache is not used, every item goes through the model
+
+Usage: python benchmarks/bench_classifier_backends.py [--backends transformers,onnx,int8,distilled]
+                                                      [--batch-size 8] [--repeat 3]
+"""
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import subprocess
+from rich.console import Console
+from rich.table import Table
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from modules import classifier_backends
+
+console = Console()
+
+FIXTURE = os.path.join(ROOT, "benchmarks", "fixtures", "classifier", "labeled.json")
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def worker(name: str, batch_size: int, repeat: int):
+    """Benchmark one backend in this process and print the results as JSON."""
+    from modules.ai_correlator import LABELS
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        fixture = json.load(f)
+    texts = [f"Title: {item['title']}. Snippet: {item['snippet']}" for item in fixture]
+
+    start = time.perf_counter()
+    model = classifier_backends.Classifier(name)
+    load = time.perf_counter() - start
+    model.predict(texts[:batch_size], LABELS, batch_size)  # warm-up
+
+    latencies = []
+    predictions = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        predictions = []
+        for i in range(0, len(texts), batch_size):
+            t0 = time.perf_counter()
+            predictions += model.predict(texts[i:i + batch_size], LABELS, batch_size)
+            latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'backend': name,
+        'load_seconds': load,
+        'items_per_second': len(texts) * repeat / elapsed,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'peak_rss_mb': peak_rss_mb(),
+        'labels': [label for label, _ in predictions],
+        'accuracy': sum(p[0] == item['label'] for p, item in zip(predictions, fixture)) / len(fixture),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zero-shot classifier backend benchmark")
+    parser.add_argument("--backends", default=",".join(classifier_backends.BACKENDS))
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.batch_size, args.repeat)
+        return
+
+    results = {}
+    for name in args.backends.split(','):
+        if name not in classifier_backends.available_backends():
+            console.print(f"[yellow]Skipping {name}: needs {', '.join(classifier_backends.BACKENDS[name]['modules'])}[/]")
+            continue
+        console.print(f"[cyan]Benchmarking {name}...[/]")
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", name,
+                               "--batch-size", str(args.batch_size), "--repeat", str(args.repeat)],
+                              capture_output=True, text=True, cwd=ROOT)
+        if proc.returncode != 0:
+            console.print(f"[red]{name} failed:[/] {proc.stderr.strip()[-500:]}")
+            continue
+        results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    if not results:
+        console.print("[red]No backend could be benchmarked.[/]")
+        return
+
+    reference = results.get(classifier_backends.DEFAULT_BACKEND)
+    table = Table(title=f"Classifier backends, batch size {args.batch_size}")
+    for column in ("Backend", "Load (s)", "Items/sec", "p50 (ms)", "p95 (ms)", "Peak RSS (MB)", "Accuracy", "Agreement"):
+        table.add_column(column, justify="left" if column == "Backend" else "right")
+    for name, r in results.items():
+        agreement = "-"
+        if reference:
+            same = sum(a == b for a, b in zip(r['labels'], reference['labels']))
+            agreement = f"{same / len(reference['labels']):.0%}"
+        table.add_row(name, f"{r['load_seconds']:.1f}", f"{r['items_per_second']:.1f}", f"{r['p50_ms']:.0f}",
+                      f"{r['p95_ms']:.0f}", f"{r['peak_rss_mb']:.0f}", f"{r['accuracy']:.0%}", agreement)
+    console.print(table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_correlation.py
+"""
+Benchmark for the cross-target correlation index in modules/correlation.py
+
+- Fills a scratch index with synthetic runs: each target gets a few dozen
+  identifiers (URLs, handles, emails, phones, media hashes) and is re-run
+  several times, with a share of identifiers reused across targets
+- Reports the indexing rate and the p50/p95 latency of `correlate(target)`
+
+Usage: python benchmarks/bench_correlation.py [--targets 10000] [--runs 3] [--ids 40]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules.correlation import CorrelationIndex
+
+console = Console()
+
+
+def make_identifiers(rng: random.Random, shared: list, n: int) -> list[tuple[str, str]]:
+    ids = []
+    for _ in range(n):
+        if rng.random() < 0.05:
+            ids.append(rng.choice(shared))
+            continue
+        kind = rng.choice(['url', 'url', 'handle', 'email', 'phone', 'media'])
+        token = f"{rng.getrandbits(48):x}"
+        ids.append({
+            'url': ('url', f"https://site{rng.randrange(3000)}.com/{token}"),
+            'handle': ('handle', f"user_{token}"),
+            'email': ('email', f"{token}@mail.com"),
+            'phone': ('phone', f"+1{rng.randrange(10**9, 10**10)}"),
+            'media': ('media', f"{rng.getrandbits(256):064x}"),
+        }[kind])
+    return ids
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Correlation index benchmark")
+    parser.add_argument("--targets", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=3, help="runs per target")
+    parser.add_argument("--ids", type=int, default=40, help="identifiers per run")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    shared = [('handle', f"shared{i}") for i in range(500)] + [('url', f"https://github.com/shared{i}") for i in range(500)]
+    with tempfile.TemporaryDirectory() as tmp:
+        index = CorrelationIndex(os.path.join(tmp, "correlation.sqlite"))
+        start = time.perf_counter()
+        total = 0
+        for t in range(args.targets):
+            base = make_identifiers(rng, shared, args.ids)
+            for r in range(args.runs):
+                # later runs mostly see the same identifiers again
+                ids = base if r == 0 else base[:int(args.ids * 0.9)] + make_identifiers(rng, shared, args.ids // 10)
+                total += index.add(f"target{t}", f"run{t}-{r}", rng.choice(['maigret', 'bing']), ids)
+        build = time.perf_counter() - start
+
+        latencies = []
+        overlaps = 0
+        for _ in range(args.queries):
+            target = f"target{rng.randrange(args.targets)}"
+            start = time.perf_counter()
+            overlaps += len(index.correlate(target))
+            latencies.append(time.perf_counter() - start)
+
+        identifiers = index.conn.execute("SELECT COUNT(*) FROM identifiers").fetchone()[0]
+        sightings = index.conn.execute("SELECT COUNT(*) FROM sightings").fetchone()[0]
+
+    table = Table(title=f"Correlation index: {args.targets} targets x {args.runs} runs")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right")
+    table.add_row("runs indexed", str(args.targets * args.runs))
+    table.add_row("identifiers / sightings", f"{identifiers} / {sightings}")
+    table.add_row("indexing rate", f"{total / build:,.0f} ids/s")
+    table.add_row("correlate p50", f"{percentile(latencies, 0.5) * 1000:.2f} ms")
+    table.add_row("correlate p95", f"{percentile(latencies, 0.95) * 1000:.2f} ms")
+    table.add_row("avg overlapping targets", f"{overlaps / args.queries:.1f}")
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
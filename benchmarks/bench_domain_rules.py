@@ -0,0 +1,83 @@
+# benchmarks/bench_domain_rules.py
+"""
+Benchmark for the compiled domain rules in modules/filter_links.py
+
+- Builds synthetic Maigret "Claimed" records over a few thousand site hosts,
+  with www./scheme/case/trailing-slash variants and blocked hosts mixed in
+- Times the previous substring-scan filter against the compiled rule engine
+  at 10k and 100k URLs and reports how many links survive dedup with each
+
+Usage: python benchmarks/bench_domain_rules.py [--sizes 10000,100000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from urllib.parse import urlparse
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules import filter_links
+
+console = Console()
+
+
+def make_records(n: int, seed: int = 1) -> list[dict]:
+    rng = random.Random(seed)
+    hosts = [f"site{i}.{rng.choice(['com', 'net', 'org', 'io', 'ru'])}" for i in range(3000)]
+    hosts += [h.replace("https://", "").strip("/") for h in filter_links.BLOCKED_DOMAINS]
+    hosts += ["eu.op.gg", "harrypotter.fandom.com"] + list(filter_links.PRIMARY_DOMAINS)
+    records = []
+    for _ in range(n):
+        host = rng.choice(hosts)
+        user = f"user{rng.randrange(50)}"
+        url = f"{rng.choice(['https', 'http'])}://{rng.choice(['', 'www.'])}{host}/{user}{rng.choice(['', '/'])}"
+        if rng.random() < 0.1:
+            url = url.upper()
+        records.append({"site": {}, "status": {"status": "Claimed", "url": url, "site_name": host}})
+    return records
+
+
+def legacy_extract(data: list[dict]) -> list[dict]:
+    """The filter as it was: substring scan of BLOCKED_DOMAINS and an urlparse per lookup."""
+    def is_blocked(url):
+        domain = urlparse(url).netloc.replace("www.", "")
+        return any(blocked in domain for blocked in filter_links.BLOCKED_DOMAINS)
+    results = []
+    for entry in data:
+        status = entry.get("status", {})
+        url = status.get("url")
+        if status.get("status") == "Claimed" and url and not is_blocked(url):
+            results.append({'platform': filter_links.PRIMARY_DOMAINS.get(urlparse(url).netloc, status.get("site_name")),
+                            'url': url, 'score': 0.8})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Domain rule engine benchmark")
+    parser.add_argument("--sizes", default="10000,100000")
+    args = parser.parse_args()
+
+    table = Table(title="Maigret link filtering")
+    table.add_column("URLs", justify="right")
+    table.add_column("Filter")
+    table.add_column("Seconds", justify="right")
+    table.add_column("URLs/sec", justify="right")
+    table.add_column("Kept", justify="right")
+    table.add_column("Unique after dedup", justify="right")
+    for n in [int(s) for s in args.sizes.split(',')]:
+        records = make_records(n)
+        for name, func, key in (("legacy substring scan", legacy_extract, 'url'),
+                                ("compiled suffix trie", filter_links.extract_from_maigret, 'canonical_url')):
+            start = time.perf_counter()
+            kept = func(records)
+            unique = {entry[key] for entry in kept}
+            elapsed = time.perf_counter() - start
+            table.add_row(str(n), name, f"{elapsed:.3f}", f"{n / elapsed:,.0f}", str(len(kept)), str(len(unique)))
+    console.print(table)
+
+
+if __name__ == '__main__':
+    main()
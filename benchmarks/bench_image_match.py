@@ -0,0 +1,83 @@
+# benchmarks/bench_image_match.py
+"""
+Benchmark for the perceptual-hash search in modules/image_match.py
+
+- Fills an in-memory index with random (pHash, dHash) pairs spread over
+  synthetic profiles and plants a few near-duplicates of the query
+- Times the vectorized Hamming search against a per-row Python loop on a
+  slice of the index, and checks the planted rows come back first
+
+Usage: python benchmarks/bench_image_match.py [--sizes 100000,1000000,4000000]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules.image_match import HashIndex, rank_profiles
+
+console = Console()
+
+
+def build_index(n: int, query: np.ndarray, rng: np.random.Generator, tmp: str) -> HashIndex:
+    index = HashIndex(tmp)
+    index.hashes = rng.integers(0, 2 ** 63, size=(2, n), dtype=np.uint64)
+    index.labels = [{'path': f"img{i}.jpg", 'target': f"target{i % 5000}", 'profile': f"user{i % 20000}"}
+                    for i in range(n)]
+    for k, row in enumerate(rng.choice(n, size=5, replace=False)):
+        flips = np.uint64((1 << (k + 1)) - 1)  # 1..5 bits away
+        index.hashes[:, row] = query ^ flips
+    return index
+
+
+def loop_search(index: HashIndex, query: np.ndarray, threshold: int) -> list[int]:
+    p, d = int(query[0]), int(query[1])
+    return [i for i in range(index.hashes.shape[1])
+            if (bin(int(index.hashes[0, i]) ^ p).count('1') + bin(int(index.hashes[1, i]) ^ d).count('1'))
+            <= 2 * threshold]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perceptual hash index benchmark")
+    parser.add_argument("--sizes", default="100000,1000000,4000000")
+    parser.add_argument("--threshold", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(3)
+    query = rng.integers(0, 2 ** 63, size=2, dtype=np.uint64)
+    table = Table(title="Perceptual hash search")
+    table.add_column("Index size", justify="right")
+    table.add_column("Vectorized (ms)", justify="right")
+    table.add_column("Python loop (ms, extrapolated)", justify="right")
+    table.add_column("Planted found", justify="right")
+    table.add_column("Profiles", justify="right")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in [int(s) for s in args.sizes.split(',')]:
+            index = build_index(n, query, rng, tmp)
+            index.search(query[0], query[1], args.threshold)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                matches = index.search(query[0], query[1], args.threshold)
+            vectorized = (time.perf_counter() - start) / args.repeat
+
+            sample = min(n, 50_000)
+            sliced = HashIndex(tmp)
+            sliced.hashes = index.hashes[:, :sample]
+            start = time.perf_counter()
+            loop_search(sliced, query, args.threshold)
+            looped = (time.perf_counter() - start) * n / sample
+
+            table.add_row(f"{n:,}", f"{vectorized * 1000:.2f}", f"{looped * 1000:,.0f}",
+                          f"{sum(1 for m in matches if m['distance'] <= 5)}/5", str(len(rank_profiles(matches))))
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
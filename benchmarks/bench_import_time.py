@@ -0,0 +1,77 @@
+# benchmarks/bench_import_time.py
+"""
+Startup benchmark for `python main.py --help`
+
+- Runs the CLI under `-X importtime` and sums the cumulative import time of top-level modules
+- Lists the slowest imports
+- Fails (exit code 1) if startup imports exceed the budget or pull in a heavy stage dependency
+
+Usage: python benchmarks/bench_import_time.py [--budget-ms 100] [--top 10]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# must never be imported just to print help
+HEAVY_MODULES = ("rich", "pygments", "bs4", "requests", "instaloader", "IPython", "transformers", "torch")
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(args: list[str]) -> tuple[float, list[tuple[str, int, int]]]:
+    """Return (wall seconds, [(module, cumulative us, depth)]) for one run of main.py."""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "main.py", *args],
+                          cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    imports = []
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            imports.append((match.group(4), int(match.group(2)), len(match.group(3)) // 2))
+    return wall, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget check for main.py --help")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Max cumulative top-level import time")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=5, help="Best of N runs is reported")
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(args.runs):
+        wall, imports = measure(["--help"])
+        total_us = sum(cum for _, cum, depth in imports if depth == 0)
+        if best is None or total_us < best[1]:
+            best = (wall, total_us, imports)
+    wall, total_us, imports = best
+
+    print(f"wall time: {wall * 1000:.1f} ms, top-level imports: {total_us / 1000:.1f} ms "
+          f"(budget {args.budget_ms:.0f} ms)")
+    print("slowest top-level imports:")
+    top = sorted((i for i in imports if i[2] == 0), key=lambda i: i[1], reverse=True)[:args.top]
+    for name, cum, _ in top:
+        print(f"  {cum / 1000:8.1f} ms  {name}")
+
+    loaded = {name.split('.')[0] for name, _, _ in imports}
+    heavy = [m for m in HEAVY_MODULES if m in loaded]
+    failed = False
+    if heavy:
+        print(f"FAIL: --help imports heavy modules: {', '.join(heavy)}")
+        failed = True
+    if total_us / 1000 > args.budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
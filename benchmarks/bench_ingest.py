@@ -0,0 +1,97 @@
+# benchmarks/bench_ingest.py
+"""
+Benchmark for modules/ingest.py against the previous load_json
+
+- Writes a synthetic Maigret NDJSON report of each requested size to a temp dir
+- Each loader runs in its own subprocess that reads and counts every record,
+  so peak RSS (ru_maxrss) is measured cleanly per loader
+- Reports wall time and peak RSS for both
+
+Usage: python benchmarks/bench_ingest.py [--sizes 10000,100000,500000]
+"""
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def write_report(path: str, n: int):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(n):
+            record = {"username": "johndoe", "parsing_enabled": False, "url_main": f"https://site{i}.com/",
+                      "site": {"name": f"Site{i}", "tags": ["social", "us"], "checkType": "status_code"},
+                      "status": {"username": "johndoe", "site_name": f"Site{i}", "status": "Claimed",
+                                 "url": f"https://www.site{i}.com/johndoe", "ids": {}, "tags": ["social"]},
+                      "http_status": 200, "rank": i}
+            f.write(json.dumps(record) + "\n")
+
+
+def legacy_load_json(path: str):
+    """The loader filter_links used before: read all, strip, try json.loads, then parse again per line."""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read().strip()
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+def worker(loader: str, path: str):
+    if loader == 'legacy':
+        records = legacy_load_json(path)
+    else:
+        from modules.ingest import load_stream
+        records = load_stream(path)
+    count = sum(1 for _ in records)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'count': count, 'peak_kb': peak_kb}))
+
+
+def run(loader: str, path: str) -> dict:
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, __file__, "--worker", loader, path],
+                          capture_output=True, text=True, check=True)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report ingestion benchmark (time and peak RSS)")
+    parser.add_argument("--sizes", default="10000,100000,500000")
+    parser.add_argument("--worker", nargs=2, metavar=("LOADER", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    from rich.console import Console
+    from rich.table import Table
+    table = Table(title="Maigret NDJSON ingestion")
+    table.add_column("Records", justify="right")
+    table.add_column("File (MB)", justify="right")
+    table.add_column("Loader")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Peak RSS (MB)", justify="right")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in [int(s) for s in args.sizes.split(',')]:
+            path = os.path.join(tmp, f"report_{n}_ndjson.json")
+            write_report(path, n)
+            size_mb = os.path.getsize(path) / 2 ** 20
+            for loader in ('legacy', 'stream'):
+                r = run(loader, path)
+                assert r['count'] == n, f"{loader} read {r['count']} of {n} records"
+                table.add_row(str(n), f"{size_mb:.1f}", loader, f"{r['seconds']:.2f}", f"{r['peak_kb'] / 1024:.1f}")
+    Console().print(table)
+
+
+if __name__ == '__main__':
+    main()
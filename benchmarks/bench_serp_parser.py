@@ -0,0 +1,98 @@
+# benchmarks/bench_serp_parser.py
+"""
+Benchmark for the Bing SERP parser backends in modules/serp_parser.py
+
+- Runs every installed backend, plus the previous h2/find_next("p") parser for
+  reference, over the saved SERP fixtures in benchmarks/fixtures/serp/
+- Reports parse time and how many results match the fixture's expected output
+- `--scale N` also times a synthetic page made of N copies of the largest fixture's results
+
+Usage: python benchmarks/bench_serp_parser.py [--repeat 20] [--scale 20]
+"""
+import os
+import re
+import sys
+import json
+import glob
+import time
+import argparse
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules.serp_parser import parse_serp, available_backends
+
+console = Console()
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "serp")
+
+
+def parse_legacy(html: str) -> list[dict]:
+    """The parser bing.py used before: every <h2> link, snippet from find_next("p")."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    results = []
+    for h2 in soup.find_all("h2"):
+        a = h2.find("a")
+        if not a or not a.get("href"):
+            continue
+        snippet_tag = h2.find_next("p")
+        results.append({"title": a.get_text(strip=True), "url": a["href"].strip(),
+                        "snippet": snippet_tag.get_text(strip=True) if snippet_tag else ""})
+    return results
+
+
+def score(results: list[dict], expected: list[dict]) -> str:
+    """Count expected URLs found with the right snippet (whitespace-insensitive), plus results that should not be there."""
+    snippets = {e["url"]: re.sub(r"\s+", "", e["snippet"]) for e in expected}
+    correct = sum(1 for r in results if snippets.get(r["url"]) == re.sub(r"\s+", "", r["snippet"]))
+    extra = sum(1 for r in results if r["url"] not in snippets)
+    return f"{correct}/{len(expected)} (+{extra} extra)"
+
+
+def timed(func, html: str, repeat: int) -> tuple[float, list[dict]]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = func(html)
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SERP parser backend benchmark")
+    parser.add_argument("--repeat", type=int, default=20, help="Best of N parses is reported")
+    parser.add_argument("--scale", type=int, default=20, help="Copies of the result list in the synthetic page (0 to skip)")
+    args = parser.parse_args()
+
+    parsers = {name: (lambda html, name=name: parse_serp(html, name)) for name in available_backends()}
+    parsers["legacy (find_next)"] = parse_legacy
+
+    table = Table(title="Bing SERP parsing")
+    table.add_column("Fixture", style="cyan")
+    table.add_column("Backend")
+    table.add_column("Parse (ms)", justify="right")
+    table.add_column("Correct", justify="right")
+
+    largest = ""
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        with open(path.replace(".html", ".expected.json"), encoding="utf-8") as f:
+            expected = json.load(f)
+        largest = max(largest, html, key=len)
+        for name, func in parsers.items():
+            elapsed, results = timed(func, html, args.repeat)
+            table.add_row(os.path.basename(path), name, f"{elapsed * 1000:.2f}", score(results, expected))
+
+    if args.scale and largest:
+        body = re.search(r'<ol id="b_results">(.*)</ol>', largest, re.S).group(1)
+        big = largest.replace(body, body * args.scale)
+        for name, func in parsers.items():
+            elapsed, results = timed(func, big, max(1, args.repeat // 10))
+            table.add_row(f"synthetic x{args.scale}", name, f"{elapsed * 1000:.2f}", f"{len(results)} parsed")
+    console.print(table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_serve.py
+"""
+Benchmark for serve mode (modules/server.py)
+
+- Cold start: a fresh interpreter importing main and every stage module, which is
+  what each CLI invocation pays before any recon work (model loads not included)
+- Warm submit: POST /jobs latency against a running job API, and the time until a
+  no-op job's job_finished event comes back on its NDJSON stream
+- The job runner is a no-op, so only the serving overhead is measured
+
+Usage: python benchmarks/bench_serve.py [--jobs 500] [--workers 4]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import subprocess
+import http.client
+from rich.console import Console
+from rich.table import Table
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from modules.server import Handler, JobManager, make_server
+from modules.stages import REGISTRY
+
+console = Console()
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def cold_start() -> float:
+    modules = sorted({m for entry in REGISTRY.values() for m in entry['code']})
+    code = "import importlib, main\n" + "".join(f"importlib.import_module({m!r})\n" for m in modules)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def request(port: int, method: str, path: str, body: dict | None = None):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request(method, path, body=json.dumps(body) if body is not None else None)
+    resp = conn.getresponse()
+    return resp, conn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve mode benchmark")
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    Handler.log_message = lambda *a: None  # no per-request log lines in the results
+    defaults = {'target': None, 'stages': None, 'force': [], 'info': None, 'username': None}
+    manager = JobManager(lambda job_args, selected, on_event, live: {}, defaults, args.workers)
+    server = make_server(manager, port=0)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    colds = [cold_start() for _ in range(3)]
+
+    submits, round_trips = [], []
+    for i in range(args.jobs):
+        start = time.perf_counter()
+        resp, conn = request(port, "POST", "/jobs", {'target': f"bench{i % 50}"})
+        job = json.loads(resp.read())
+        conn.close()
+        submits.append(time.perf_counter() - start)
+        resp, conn = request(port, "GET", job['events'])
+        for line in resp:
+            if line.strip() and json.loads(line)['event'] == 'job_finished':
+                break
+        conn.close()
+        round_trips.append(time.perf_counter() - start)
+    server.shutdown()
+
+    table = Table(title=f"Serve mode, {args.jobs} no-op jobs")
+    table.add_column("Measure")
+    table.add_column("p50 (ms)", justify="right")
+    table.add_column("p95 (ms)", justify="right")
+    table.add_row("Cold start (imports only)", f"{percentile(colds, 0.5) * 1000:.0f}", f"{max(colds) * 1000:.0f}")
+    table.add_row("POST /jobs", f"{percentile(submits, 0.5) * 1000:.2f}", f"{percentile(submits, 0.95) * 1000:.2f}")
+    table.add_row("Submit to job_finished", f"{percentile(round_trips, 0.5) * 1000:.2f}",
+                  f"{percentile(round_trips, 0.95) * 1000:.2f}")
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
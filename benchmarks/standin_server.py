@@ -0,0 +1,157 @@
+# benchmarks/standin_server.py
+"""
+Local stand-in server for the offline benchmark suite
+
+- /media/<name>?size=N     deterministic media bodies (benchmarks/synthetic.py), with Range support
+- /search?q=...&first=N    a synthetic Bing SERP page of 10 results
+- Injects a fixed latency plus jitter into every response, and answers a configurable
+  share of requests with 429 (with Retry-After) or 403, so the downloader's throttling
+  path is measured without touching Instagram or Bing
+- Runs in a background thread on a free port; usable from the command line for manual runs
+
+Usage: python benchmarks/standin_server.py [--port 8765] [--latency 0.02] [--throttle-rate 0.05] [--forbidden-rate 0.01]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic import bing_results, media_body, serp_html
+
+DEFAULT_MEDIA_SIZE = 64 * 1024
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real CDNs
+    disable_nagle_algorithm = True  # headers and body are separate writes; don't wait on delayed ACKs
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers: dict | None = None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        time.sleep(server.delay())
+        injected = server.inject()
+        if injected:
+            server.count(injected)
+            self._send(injected, b"slow down", {"Retry-After": "1"} if injected == 429 else None)
+            return
+
+        if url.path.startswith("/media/"):
+            name = url.path[len("/media/"):]
+            body = media_body(name, int(query.get('size', [server.media_size])[0]))
+            start = 0
+            range_header = self.headers.get("Range", "")
+            if range_header.startswith("bytes="):
+                start = int(range_header[6:].split("-")[0] or 0)
+                if start >= len(body):
+                    server.count(416)
+                    self._send(416)
+                    return
+            status = 206 if start else 200
+            headers = {"Content-Type": "image/jpeg", "ETag": f'"{name}"'}
+            if start:
+                headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            server.count(status)
+            self._send(status, body[start:], headers)
+        elif url.path == "/search":
+            first = int(query.get('first', ['1'])[0])
+            html = serp_html(bing_results(10, seed=first), query.get('q', ['"John Doe"'])[0])
+            server.count(200)
+            self._send(200, html.encode('utf-8'), {"Content-Type": "text/html; charset=utf-8"})
+        else:
+            server.count(404)
+            self._send(404)
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.0, jitter: float = 0.0, throttle_rate: float = 0.0,
+                 forbidden_rate: float = 0.0, media_size: int = DEFAULT_MEDIA_SIZE, seed: int = 3):
+        super().__init__(("127.0.0.1", port), StandinHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.forbidden_rate = forbidden_rate
+        self.media_size = media_size
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.statuses = Counter()
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def delay(self) -> float:
+        with self.lock:
+            return self.latency + self.rng.uniform(0, self.jitter)
+
+    def inject(self) -> int | None:
+        """429, 403 or None for the next request, drawn from the configured rates."""
+        with self.lock:
+            roll = self.rng.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.forbidden_rate:
+            return 403
+        return None
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)  # clients dropping a connection are expected
+
+    def count(self, status: int):
+        with self.lock:
+            self.statuses[status] += 1
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline stand-in for media CDNs and Bing")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--throttle-rate", type=float, default=0.05, help="Share of requests answered with 429")
+    parser.add_argument("--forbidden-rate", type=float, default=0.01, help="Share of requests answered with 403")
+    parser.add_argument("--media-size", type=int, default=DEFAULT_MEDIA_SIZE)
+    args = parser.parse_args()
+    server = StandinServer(args.port, args.latency, args.jitter, args.throttle_rate, args.forbidden_rate,
+                           args.media_size)
+    print(f"Serving on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(dict(server.statuses))
+
+
+if __name__ == "__main__":
+    main()
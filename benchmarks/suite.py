@@ -0,0 +1,245 @@
+# benchmarks/suite.py
+"""
+Offline benchmark suite for ShadowRecon
+
+- Runs without network access: inputs come from benchmarks/synthetic.py and HTTP goes
+  to the local stand-in server (benchmarks/standin_server.py)
+- Measures each stage on its own:
+  * refine_targets[N]  filter_links.refine_targets over a synthetic Maigret report of N records
+  * serp_parse         Bing SERP parsing (modules/serp_parser.py) of the saved and synthetic pages
+  * media_download     MediaDownloader throughput against the stand-in, with latency and
+                       injected 429/403 feeding the adaptive CDN scheduler
+  * classify_bing      ai_correlator.extract_from_bing zero-shot classification (needs transformers)
+- `--save-baseline` writes the results to a JSON baseline. Later runs are compared with it and
+  the suite exits with status 1 when a case is slower than its baseline by more than the
+  threshold (`--threshold`, or a per-case "threshold" edited into the baseline file)
+
+Usage: python benchmarks/suite.py [--only refine_targets,serp_parse] [--maigret-sizes 1000,100000,1000000]
+                                  [--baseline benchmarks/baselines/baseline.json] [--save-baseline]
+                                  [--threshold 0.25] [--quick]
+"""
+import os
+import sys
+import json
+import glob
+import time
+import platform
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+from rich.console import Console
+from rich.table import Table
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from benchmarks import synthetic
+from benchmarks.standin_server import StandinServer
+
+console = Console()
+
+CASES = {}
+BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "baseline.json")
+THRESHOLD = 0.25  # a case may be this much slower than its baseline before it counts as a regression
+SERP_FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "serp")
+
+
+class Skip(Exception):
+    """Raised by a case that cannot run here (e.g. an optional dependency is missing)."""
+
+
+def case(name: str, threshold: float | None = None):
+    """Register a benchmark `func(opts) -> {metric: (value, unit)}`; higher values are better."""
+    def wrap(func):
+        CASES[name] = {'func': func, 'threshold': threshold}
+        return func
+    return wrap
+
+
+def best_of(repeat: int, func) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def quiet(func):
+    """Run func with the modules' rich console output swallowed."""
+    from modules import filter_links, ai_correlator, media_downloader
+    consoles = [filter_links.console, ai_correlator.console, media_downloader.console]
+    files = [c.file for c in consoles]
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for c in consoles:
+            c.file = devnull
+        try:
+            return func()
+        finally:
+            for c, f in zip(consoles, files):
+                c.file = f
+
+
+@case("refine_targets")
+def bench_refine(opts) -> dict:
+    from modules.filter_links import refine_targets
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        bing = synthetic.write_bing_results(os.path.join(tmp, "bing_result.json"), 200)
+        for n in opts.maigret_sizes:
+            report = synthetic.write_maigret_report(os.path.join(tmp, f"report_{n}.ndjson"), n)
+            out = os.path.join(tmp, "out", "refined_targets.json")
+            seconds, _ = best_of(1 if n >= 1_000_000 else opts.repeat,
+                                 lambda: quiet(lambda: refine_targets(report, bing, out)))
+            results[f"refine_targets[{n}]"] = ((n + 200) / seconds, "records/s")
+            os.remove(report)
+    return results
+
+
+@case("serp_parse")
+def bench_serp(opts) -> dict:
+    from modules.serp_parser import parse_serp
+    pages = []
+    for path in sorted(glob.glob(os.path.join(SERP_FIXTURES, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        with open(path.replace(".html", ".expected.json"), encoding="utf-8") as f:
+            pages.append((html, len(json.load(f))))
+    pages += [(synthetic.serp_html(synthetic.bing_results(n, seed=n)), n) for n in (10, 50)]
+    for html, expected in pages:
+        if len(parse_serp(html)) != expected:
+            raise RuntimeError(f"SERP parser returned the wrong number of results (expected {expected})")
+    seconds, _ = best_of(opts.repeat, lambda: [parse_serp(html) for _ in range(20) for html, _ in pages])
+    return {"serp_parse": (20 * len(pages) / seconds, "pages/s")}
+
+
+@case("media_download", threshold=0.5)
+def bench_download(opts) -> dict:
+    from modules.media_downloader import MediaDownloader
+    from modules.insta_scheduler import AdaptiveScheduler
+    files = 50 if opts.quick else 300
+    # the CDN budget scaled down ~100x so a run takes seconds, with the same shape
+    scheduler = AdaptiveScheduler({'cdn': {'interval': 0.002, 'min_interval': 0.0005, 'max_interval': 0.3,
+                                           'backoff_base': 0.05}})
+    with StandinServer(latency=0.02, jitter=0.01, throttle_rate=0.05, forbidden_rate=0.01) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        downloader = MediaDownloader(os.path.join(tmp, "store"), workers=8,
+                                     before_request=lambda: scheduler.wait('cdn'),
+                                     after_response=lambda status: scheduler.record('cdn', status))
+        urls = [f"{server.base_url}/media/{i}.jpg?sig={i * 7}" for i in range(files)]
+        start = time.perf_counter()
+        quiet(lambda: [f.result() for f in [downloader.submit(u, os.path.join(tmp, "dest")) for u in urls]])
+        seconds = time.perf_counter() - start
+        stats = downloader.stats
+        downloader.close()
+    return {"media_download": (stats['downloaded'] / seconds, "files/s"),
+            "media_download_bytes": (stats['bytes'] / seconds / (1 << 20), "MB/s"),
+            "media_download_success": (stats['downloaded'] / files, "ratio")}
+
+
+@case("classify_bing")
+def bench_classify(opts) -> dict:
+    import importlib.util
+    if importlib.util.find_spec("transformers") is None:
+        raise Skip("transformers is not installed")
+    from modules import ai_correlator
+    results = synthetic.bing_results(16 if opts.quick else 64, seed=5)
+    quiet(lambda: ai_correlator.get_classifier())  # model load is not part of the measurement
+    seconds, _ = best_of(1, lambda: quiet(lambda: ai_correlator.extract_from_bing(results, use_cache=False)))
+    return {"classify_bing": (len(results) / seconds, "items/s")}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> dict:
+    """Per-metric change against the baseline; 'regression' when it is worse than the threshold allows."""
+    verdicts = {}
+    for name, value in results.items():
+        base = (baseline.get('cases') or {}).get(name)
+        if not base or not base.get('value'):
+            verdicts[name] = {'status': 'new'}
+            continue
+        change = value / base['value'] - 1
+        limit = base.get('threshold', threshold)
+        verdicts[name] = {'baseline': base['value'], 'change': change,
+                          'status': 'regression' if change < -limit else 'ok'}
+    return verdicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite")
+    parser.add_argument("--only", help=f"Comma separated cases ({', '.join(CASES)})")
+    parser.add_argument("--maigret-sizes", default="1000,100000", help="Synthetic Maigret report sizes (up to 1000000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs is reported")
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs, for a fast check")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="Allowed slowdown against the baseline (0.25 = 25%%)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    opts = parser.parse_args()
+    opts.maigret_sizes = [1000] if opts.quick else [int(s) for s in opts.maigret_sizes.split(',')]
+
+    names = opts.only.split(',') if opts.only else list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        parser.error(f"Unknown case(s): {', '.join(unknown)}")
+
+    results, units, thresholds, skipped = {}, {}, {}, {}
+    for name in names:
+        console.print(f"[cyan]Running {name}...[/]")
+        try:
+            metrics = CASES[name]['func'](opts)
+        except Skip as e:
+            skipped[name] = str(e)
+            console.print(f"[yellow]Skipped {name}: {e}[/]")
+            continue
+        for metric, (value, unit) in metrics.items():
+            results[metric] = value
+            units[metric] = unit
+            if CASES[name]['threshold'] is not None:
+                thresholds[metric] = CASES[name]['threshold']
+
+    baseline = {}
+    if os.path.exists(opts.baseline):
+        with open(opts.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    verdicts = compare(results, baseline, opts.threshold)
+
+    table = Table(title="Offline benchmark suite" + (f" vs {os.path.relpath(opts.baseline)}" if baseline else ""))
+    for column in ("Metric", "Value", "Unit", "Baseline", "Change", "Status"):
+        table.add_column(column, justify="left" if column in ("Metric", "Unit", "Status") else "right",
+                         no_wrap=column == "Metric")
+    for metric, value in results.items():
+        v = verdicts[metric]
+        color = {"ok": "green", "regression": "red"}.get(v['status'], "yellow")
+        table.add_row(metric, f"{value:,.2f}", units[metric], f"{v['baseline']:,.2f}" if 'baseline' in v else "-",
+                      f"{v['change']:+.1%}" if 'change' in v else "-", f"[{color}]{v['status']}[/]")
+    for name, reason in skipped.items():
+        table.add_row(name, "-", "-", "-", "-", "[yellow]skipped[/]")
+    console.print(table)
+
+    report = {'created': time.time(), 'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                                                   'processor': platform.processor() or platform.machine()},
+              'threshold': opts.threshold,
+              'cases': {m: {'value': v, 'unit': units[m],
+                            **({'threshold': thresholds[m]} if m in thresholds else {})} for m, v in results.items()}}
+    if opts.json:
+        from modules.result_store import write_json
+        write_json(opts.json, {**report, 'comparison': verdicts, 'skipped': skipped})
+    if opts.save_baseline:
+        from modules.result_store import write_json
+        # keep thresholds edited into the previous baseline
+        for metric, entry in report['cases'].items():
+            previous = (baseline.get('cases') or {}).get(metric) or {}
+            if 'threshold' in previous:
+                entry['threshold'] = previous['threshold']
+        write_json(opts.baseline, report)
+        console.print(f"[bold green]Baseline saved to {opts.baseline}[/]")
+        return
+
+    regressions = [m for m, v in verdicts.items() if v['status'] == 'regression']
+    if regressions:
+        console.print(f"[bold red]Regression beyond the threshold in: {', '.join(regressions)}[/]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/synthetic.py
+"""
+Synthetic fixtures for the offline benchmark suite
+
+- Maigret NDJSON reports of any size (1k to 1M+ records): "Claimed" sites over a few
+  thousand hosts with www./scheme/case/trailing-slash variants, blocked hosts and
+  "Available" rows mixed in, written record by record
+- Bing search results (bing_result.json) and Bing SERP HTML pages in the markup the
+  saved fixtures use (li.b_algo > h2 > a, .b_caption p), with known-platform, unknown and
+  blocked URLs
+- Deterministic media bodies, so a file's content depends only on its name
+- Everything is seeded: the same arguments always give the same bytes
+"""
+import os
+import sys
+import json
+import random
+import hashlib
+from html import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules import filter_links
+
+TLDS = ['com', 'net', 'org', 'io', 'ru']
+WORDS = ["profile", "photos", "posts", "music", "developer", "travel", "blog", "gaming", "art", "news",
+         "follow", "official", "account", "videos", "reviews", "projects", "team", "about"]
+
+
+def site_hosts(rng: random.Random, n: int = 3000) -> list[str]:
+    hosts = [f"site{i}.{rng.choice(TLDS)}" for i in range(n)]
+    hosts += [h.replace("https://", "").strip("/") for h in filter_links.BLOCKED_DOMAINS]
+    hosts += list(filter_links.PRIMARY_DOMAINS)
+    return hosts
+
+
+def profile_url(rng: random.Random, host: str, user: str) -> str:
+    url = f"{rng.choice(['https', 'http'])}://{rng.choice(['', 'www.'])}{host}/{user}{rng.choice(['', '/'])}"
+    return url.upper() if rng.random() < 0.1 else url
+
+
+def maigret_records(n: int, seed: int = 1, users: int = 50):
+    """Yield n Maigret NDJSON records, about 90% of them "Claimed"."""
+    rng = random.Random(seed)
+    hosts = site_hosts(rng)
+    for i in range(n):
+        host = rng.choice(hosts)
+        user = f"user{rng.randrange(users)}"
+        claimed = rng.random() < 0.9
+        yield {
+            "username": user,
+            "site": {"url_main": f"https://{host}/", "tags": rng.sample(WORDS, 2)},
+            "status": {"status": "Claimed" if claimed else "Available", "site_name": host,
+                       "url": profile_url(rng, host, user),
+                       "ids": {"fullname": f"User {i % users}"} if rng.random() < 0.2 else {}},
+        }
+
+
+def write_maigret_report(path: str, n: int, seed: int = 1) -> str:
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in maigret_records(n, seed):
+            f.write(json.dumps(record) + "\n")
+    return path
+
+
+def bing_results(n: int, seed: int = 2, name: str = "John Doe") -> list[dict]:
+    """Bing results as bing.py saves them: title, url, snippet and query."""
+    rng = random.Random(seed)
+    hosts = site_hosts(rng, 500)
+    results = []
+    for i in range(n):
+        host = rng.choice(hosts)
+        handle = f"jdoe{i % 97}"
+        results.append({
+            "title": f"{name} ({handle}) - {' '.join(rng.sample(WORDS, 3)).title()}",
+            "url": profile_url(rng, host, handle),
+            "snippet": f"{name} {' '.join(rng.sample(WORDS, 8))}. {rng.randrange(10000)} followers on {host}.",
+            "query": f'"{name}"',
+        })
+    return results
+
+
+def write_bing_results(path: str, n: int, seed: int = 2) -> str:
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(bing_results(n, seed), f, indent=4)
+    return path
+
+
+def serp_html(results: list[dict], query: str = '"John Doe"') -> str:
+    """A Bing results page for `results`, with the header, sidebar and scripts a real page carries."""
+    blocks = []
+    for i, r in enumerate(results):
+        url, title, snippet = escape(r['url']), escape(r['title']), escape(r['snippet'])
+        blocks.append(
+            f'<li class="b_algo" data-id="{i}"><div class="b_tpcn"><a class="tilk" href="{url}"><div class="tpic"></div>'
+            f'<div class="tptxt"><div class="tptt">Site {i}</div><cite>{url}</cite></div></a></div>\n'
+            f'<h2><a href="{url}" h="ID=SERP,{5000 + i}.1">{title}</a></h2><div class="b_caption">'
+            f'<p class="b_lineclamp2 b_algoSlug"><span class="algoSlug_icon">WEB</span>{snippet}</p></div></li>')
+    return (f'<!DOCTYPE html><html lang="en"><head><title>{escape(query)} - Search</title>'
+            f'<script>var _G={{}};{"x" * 2000}</script></head>\n<body><header id="b_header"><h2 class="b_hide">Search</h2>'
+            f'<form><input name="q" value="{escape(query)}"></form></header>\n'
+            f'<main aria-label="Search Results"><ol id="b_results">{"".join(blocks)}</ol></main>\n'
+            f'<aside><h2>Related searches</h2><ul><li><a href="/search?q=jdoe">jdoe</a></li></ul></aside>'
+            f'</body></html>')
+
+
+def media_body(name: str, size: int) -> bytes:
+    """`size` deterministic bytes for the media file `name`."""
+    block = hashlib.sha256(name.encode('utf-8')).digest()
+    return (block * (size // len(block) + 1))[:size]
@@ -1,6 +1,6 @@
 import os
-import json
 from rich.console import Console
+from modules.result_store import get_store, write_json
 
 console = Console()
 
@@ -23,9 +23,9 @@ def get_target_info(args):
         console.print("f[bold red]Warning: Image file '{target_info['image_path']}' does not exist. Skipping image analysis.")
         target_info["image_path"] = None
 
-    os.makedirs(f'input/target_info["target"]', exist_ok=True)
-    with open(f"input/{target_info["target"]}", "w") as f:
-        json.dump(target_info, f, indent=4)
+    store = get_store()
+    store.save_target(target_info)
+    write_json(f"input/{target_info['target']}", target_info)
 
     return target_info
 
@@ -1,23 +1,17 @@
 #shadowrecon main
 
 import os
-import json
+import time
 import argparse
-from pygments.styles.dracula import green
-from rich.console import Console
-from rich.panel import Panel
-from rich import box
-from modules.maigret import run_maigret
-from input_handler import get_target_info
-from modules.bing import bing
-from modules.filter_links import refine_targets
-from modules.insta_extractor import run_instagram_extraction
-
-console = Console()
+# Heavy modules (rich, bs4, requests, instaloader, transformers) are imported
+# only when a stage that needs them runs; `--help` stays fast.
 
 
 def banner():
-    console.print(Panel("""[green]
+    from rich.console import Console
+    from rich.panel import Panel
+    from rich import box
+    Console().print(Panel("""[green]
     
     
    _____ _               _               _____                      
@@ -33,39 +27,139 @@ def banner():
 
 
 def main():
-    banner()
-
     praser=argparse.ArgumentParser(description="ShadowRecon - OSINT Recon Framework")
-    praser.add_argument("--target",help="Target name ",required=True)
+    group = praser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--target",help="Target name ")
+    group.add_argument("--serve", help="Run as a daemon accepting recon jobs over a local HTTP API (or --socket)", action="store_true")
+    group.add_argument("--targets-file",help="CSV/NDJSON file of targets (target,username,email,phone,image,info) for batch mode")
     praser.add_argument("--username",help="Target Any Web Site Username(optional)",required=False)
     praser.add_argument("--email",help="Target Email(optional)",required=False)
     praser.add_argument("--phone",help="Target Phone number(optional)",required=False)
     praser.add_argument("--image",help="Target Image Path(optional)",required=False)
+    praser.add_argument("--image-threshold", help="Max average pHash/dHash bit distance counted as an --image match", type=int, default=10)
     praser.add_argument("--info", help="Optional known info about target (bio keywords, workplace, etc.)",required=False)
+    praser.add_argument("--max-variants", help="Username variants generated from the target name for Maigret", type=int, default=6)
+    praser.add_argument("--maigret-procs", help="Maigret processes allowed to run at once", type=int, default=4)
+    praser.add_argument("--maigret-ttl", help="Hours a cached Maigret result is reused as is", type=float, default=24)
+    praser.add_argument("--maigret-revalidate", help="After the TTL, re-check only previously claimed sites", action="store_true")
+    praser.add_argument("--no-maigret-cache", help="Always run a full Maigret check", action="store_true")
+    praser.add_argument("--bing-pages", help="Result pages fetched per Bing query variant", type=int, default=2)
+    praser.add_argument("--stages", help="Comma separated stages to run (maigret,bing,refine,score,instagram,image). Skipped stages reuse the previous run's output")
+    praser.add_argument("--force", help="Comma separated stages to rerun even if their inputs, parameters and code are unchanged ('all' for every stage)", action="append", default=[])
+    praser.add_argument("--workers", help="Number of targets processed in parallel in batch or serve mode", type=int, default=4)
+    praser.add_argument("--host", help="Address the --serve job API listens on", default="127.0.0.1")
+    praser.add_argument("--port", help="Port of the --serve job API", type=int, default=8765)
+    praser.add_argument("--socket", help="Serve the job API on this Unix socket instead of TCP", metavar="PATH")
+    praser.add_argument("--correlate", help="Only list past targets sharing URLs, handles, emails, phones or media with the target(s)", action="store_true")
+    praser.add_argument("--embedding-batch-size", help="Texts per sentence-embedding batch in the score stage", type=int, default=32)
+    praser.add_argument("--no-embedding-cache", help="Recompute every embedding in the score stage", action="store_true")
+    praser.add_argument("--export-json", help="Only rewrite the target's JSON files from the result store, without running any stage", action="store_true")
+    praser.add_argument("--ai", help="Refine links with the AI correlator (zero-shot classifier) instead of the rule filter", action="store_true")
+    praser.add_argument("--classifier-batch-size", help="Items per zero-shot classifier batch (with --ai)", type=int, default=8)
+    praser.add_argument("--classifier-backend", help="Zero-shot backend with --ai: transformers, onnx, int8 or distilled "
+                        "(default: $SHADOWRECON_CLASSIFIER_BACKEND or transformers)")
+    praser.add_argument("--no-classifier-cache", help="Bypass the on-disk classifier cache (with --ai)", action="store_true")
+    praser.add_argument("--no-http-cache", help="Fetch every page from the network instead of the on-disk response cache", action="store_true")
+    praser.add_argument("--record", help="Save every HTTP response of the run into this cassette directory", metavar="DIR")
+    praser.add_argument("--replay", help="Serve every HTTP request from this cassette directory, without network access", metavar="DIR")
+    praser.add_argument("--profile", help="Save the top memory allocations and, for stages not running beside another profiled one, a cProfile dump of every stage under output/<target>/profile/", action="store_true")
 
     args = praser.parse_args()
-    args.target = args.target.strip()
-
-    target_info=get_target_info(args)
-    console.print("[bold cyan]\n[1] Running Maigret...\n")
-    maigret = run_maigret(args.target)
-    # maigret=run_maigret(args.username)
-    console.print("[bold cyan]\n[1] Running Bing Search ...\n")
-    bing(args.target,args.username,args.info)
-
-    refine_targets(
-        f"output/{args.target}/report_{args.target}_ndjson.json",
-        f"output/{args.target}/bing_result.json",
-        f"output/{args.target}/refined_targets.json"
-    )
-    run_instagram_extraction(
-        f"output/{args.target}/refined_targets.json",
-        args.target,
-        f"output/{args.target}/{args.target}_instagram.json"
-    )
-
+    banner()
 
+    from modules.stages import parse_selection, parse_force
+    try:
+        selected = parse_selection(args.stages)
+        args.force = parse_force(args.force)
+    except ValueError as e:
+        praser.error(str(e))
+    if args.serve and (args.correlate or args.export_json):
+        praser.error("--correlate and --export-json need --target or --targets-file, not --serve")
+
+    if args.correlate:
+        from modules.batch import load_targets_file
+        from modules.correlation import get_index, print_correlations
+        targets = [row['target'] for row in load_targets_file(args.targets_file)] if args.targets_file else [args.target.strip()]
+        for target in targets:
+            start = time.perf_counter()
+            overlaps = get_index().correlate(target)
+            print_correlations(target, overlaps, time.perf_counter() - start)
+        return
+
+    if args.export_json:
+        from modules.result_store import get_store
+        from modules.batch import load_targets_file
+        targets = [row['target'] for row in load_targets_file(args.targets_file)] if args.targets_file else [args.target.strip()]
+        for target in targets:
+            for path in get_store().export_target(target):
+                print(f"Exported {path}")
+        return
+
+    if args.ai and args.classifier_backend:
+        from modules.ai_correlator import set_backend
+        try:
+            set_backend(args.classifier_backend)
+        except ValueError as e:
+            praser.error(str(e))
+
+    from modules import http_client
+    try:
+        http_client.configure(cache=not args.no_http_cache, record=args.record, replay=args.replay)
+    except ValueError as e:
+        praser.error(str(e))
+
+    if 'maigret' in selected:
+        from modules.maigret import set_max_processes
+        set_max_processes(args.maigret_procs)
+
+    if args.serve:
+        from modules.server import serve, warm_up
+        if 'instagram' in selected:
+            # the daemon logs in once; every job reuses the session
+            from modules.insta_extractor import login_prompt
+            login_prompt()
+        warm_up(args, selected)
+        serve(lambda job_args, job_selected, on_event, live_results:
+              run_target(job_args, job_selected, prompt_login=False, on_event=on_event, live_results=live_results),
+              vars(args), workers=args.workers, host=args.host, port=args.port, socket_path=args.socket)
+        return
+
+    if args.targets_file:
+        from modules.batch import load_targets_file, run_batch
+        rows = load_targets_file(args.targets_file)
+        if 'instagram' in selected:
+            # one login for the whole batch instead of a prompt per target
+            from modules.insta_extractor import login_prompt
+            login_prompt()
+        run_batch(rows, lambda target_args: run_target(target_args, selected, prompt_login=False),
+                  workers=args.workers, defaults=vars(args))
+        return
 
+    args.target = args.target.strip()
+    run_target(args, selected)
+
+
+def run_target(args, selected, prompt_login=True, on_event=None, live_results=None):
+    """
+    Run the selected stages of the pipeline for a single target. `on_event` receives stage progress
+    and `live_results` the Maigret hits as they are confirmed (both used by serve mode).
+    """
+    from input_handler import get_target_info
+    from modules.pipeline import run_stages
+    from modules.stages import build_stages
+    from modules.correlation import get_index, identifiers_from_target
+    from modules import telemetry
+    target_info=get_target_info(args)
+    run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    get_index().add(args.target, run_id, 'input', identifiers_from_target(target_info))
+    options = {'live_results': live_results} if live_results is not None else {}
+    stages, context = build_stages(args, selected, force=args.force, prompt_login=prompt_login, run_id=run_id, **options)
+    out_dir = f"output/{args.target}"
+    with telemetry.run_scope() as run:
+        report = run_stages(stages, context, report_path=f"{out_dir}/run_report.json", on_event=on_event,
+                            profile_dir=f"{out_dir}/profile" if args.profile else None)
+    telemetry.write_run_files(out_dir, args.target, run)
+    return report
 
 
 
@@ -2,9 +2,13 @@
 """
 AI Correlator Module for ShadowRecon
 
-- Reads maigret.json and bing_scraper.json
+- Streams maigret.json and bing_scraper.json through modules/ingest.py
 - Extracts and scores social profile URLs (Instagram, Twitter, LinkedIn, Facebook, GitHub)
 - Uses Hugging Face transformers ([facebook/bart-large-mnli]) for zero-shot classification
+- The classifier is loaded on first use and unknown-domain Bing results are classified in batches
+- Verdicts are cached on disk (modules/classifier_cache.py), so reruns skip inference for known items
+- The inference backend (PyTorch, ONNX Runtime, int8, distilled) comes from
+  modules/classifier_backends.py; set it with set_backend() before the first classification
 - Builds a refined list of target URLs with related info for downstream scrapers
 - Saves output to refined_targets.json
 
@@ -15,9 +19,13 @@ Model Explanation:
 """
 import os
 import json
-from urllib.parse import urlparse
+from collections.abc import Iterator
+import threading
 from rich.console import Console
-from transformers import pipeline
+from modules import classifier_backends, telemetry
+from modules.classifier_cache import get_cache
+from modules.domain_rules import compile_rules
+from modules.ingest import load_stream
 
 console = Console()
 
@@ -30,66 +38,96 @@ PRIMARY_DOMAINS = {
     "github.com": "GitHub",
     "youtube.com":"Youtube"
 }
-
-# Initialize zero-shot classifier
-classifier = pipeline(
-    "zero-shot-classification",
-    model="facebook/bart-large-mnli"
-)
-
-
-def load_json(path: str) -> list | dict:
-    """Load JSON or NDJSON from file correctly."""
-    try:
-        with open(path, 'r', encoding='utf-8') as f:
-            content = f.read().strip()
-        # Try to parse full JSON
-        try:
-            data = json.loads(content)
-            return data
-        except json.JSONDecodeError:
-            # Fallback to NDJSON
-            results = []
-            for line in content.splitlines():
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    results.append(json.loads(line))
-                except json.JSONDecodeError:
-                    console.print(f"[red]Invalid NDJSON line, skipping: {line}[/]")
-            return results
-    except Exception as e:
-        console.print(f"[bold red]Failed to load {path}:[/] {e}")
+# platform lookup by host suffix; each URL is parsed once through RULES.check
+RULES = compile_rules(platforms=PRIMARY_DOMAINS)
+
+MODEL_NAME = classifier_backends.REFERENCE_MODEL
+BACKEND = classifier_backends.configured_backend()
+LABELS = ["social media profile", "news article", "company website", "blog post"]
+BATCH_SIZE = 8
+
+# Zero-shot classifier, loaded on first use by get_classifier()
+classifier = None
+_load_lock = threading.Lock()
+# The pipeline is shared by every worker thread in batch mode; one inference at a time
+classifier_lock = threading.Lock()
+
+
+def set_backend(name: str):
+    """Choose the inference backend; takes effect if the classifier is not loaded yet."""
+    global BACKEND
+    if name not in classifier_backends.BACKENDS:
+        raise ValueError(f"Unknown classifier backend '{name}'. Available: {', '.join(classifier_backends.BACKENDS)}")
+    BACKEND = name
+
+
+def get_classifier() -> classifier_backends.Classifier:
+    """Load the configured backend the first time it is needed."""
+    global classifier
+    with _load_lock:
+        if classifier is None:
+            classifier = classifier_backends.Classifier(BACKEND)
+    return classifier
+
+
+def run_classifier(texts: list[str], batch_size: int = BATCH_SIZE) -> list[tuple[str, float]]:
+    """Run the model over texts in batches and return the (top label, score) of each."""
+    model = get_classifier()
+    predictions = []
+    for i in range(0, len(texts), batch_size):
+        chunk = texts[i:i + batch_size]
+        with classifier_lock, telemetry.timer('model_inference_seconds', model=BACKEND):
+            predictions.extend(model.predict(chunk, LABELS, batch_size))
+        telemetry.inc('model_items_total', len(chunk), model=BACKEND)
+    return predictions
+
+
+def classify_profiles(items: list[tuple[str, str]], batch_size: int = BATCH_SIZE, use_cache: bool = True) -> list[bool]:
+    """Classify (title, snippet) pairs in batches; results come back in input order."""
+    if not items:
         return []
+    # verdicts of different backends are cached apart; the reference one keeps its old keys
+    model_id = classifier_backends.cache_id(BACKEND)
+    keys = [get_cache().make_key(model_id, LABELS, title, snippet) for title, snippet in items]
+    known = get_cache().get_many(keys) if use_cache else {}
+
+    # only items missing from the cache reach the model, each distinct key once
+    missing = list(dict.fromkeys(k for k in keys if k not in known))
+    if missing:
+        text_for = {k: f"Title: {title}. Snippet: {snippet}" for k, (title, snippet) in zip(keys, items)}
+        fresh = dict(zip(missing, run_classifier([text_for[k] for k in missing], batch_size)))
+        if use_cache:
+            get_cache().put_many(fresh)
+        known.update(fresh)
+
+    return [known[k][0] == "social media profile" and known[k][1] > 0.8 for k in keys]
 
 
-def is_social_profile(url: str, title: str, snippet: str) -> bool:
+def is_social_profile(url: str, title: str, snippet: str, use_cache: bool = True) -> bool:
     """Use zero-shot classification to check if a link corresponds to a social profile."""
-    labels = ["social media profile", "news article", "company website", "blog post"]
-    text = f"Title: {title}. Snippet: {snippet}"
-    result = classifier(text, candidate_labels=labels, multi_label=False)
-    top_label = result['labels'][0]
-    score = result['scores'][0]
-    return top_label == "social media profile" and score > 0.8
+    return classify_profiles([(title, snippet)], batch_size=1, use_cache=use_cache)[0]
 
 
-def extract_from_maigret(data: list | dict) -> list[dict]:
+def extract_from_maigret(data: list | Iterator | dict) -> list[dict]:
     """Extract found sites with details from Maigret output."""
     results = []
-    if isinstance(data, list):
+    if isinstance(data, dict) and 'sites' not in data and 'status' in data:
+        data = [data]  # a one-record NDJSON report
+    if isinstance(data, (list, Iterator)):
         for entry in data:
             site = entry.get("site", {})
             status = entry.get("status", {})
             url = status.get("url")
             if status.get("status") == "Claimed" and url:
+                rule = RULES.check(url)
                 # important_keys = ['url', 'username', 'site_name', 'ids', 'tags']
                 # info_fields = sum(1 for k in important_keys if info.get(k))
 
                 # info_fields = sum(1 for v in entry.values() if v)
                 results.append({
-                    'platform': PRIMARY_DOMAINS.get(urlparse(url).netloc, status.get("site_name", "Unknown")),
+                    'platform': rule['platform'] or status.get("site_name", "Unknown"),
                     'url': url,
+                    'canonical_url': rule['canonical'],
                     'info': entry,
                     'score': 0.8
                 })
@@ -105,12 +143,14 @@ def extract_from_maigret(data: list | dict) -> list[dict]:
         for site, info in sites.items():
             if info.get('status') == 'found':
                 url = info.get('url')
+                rule = RULES.check(url or '')
                 # important_keys = ['url', 'username', 'site_name', 'ids', 'tags']
                 # info_fields = sum(1 for k in important_keys if info.get(k))
                 info_fields = sum(1 for v in info.values() if v)
                 results.append({
-                    'platform': PRIMARY_DOMAINS.get(urlparse(url).netloc, site),
+                    'platform': rule['platform'] or site,
                     'url': url,
+                    'canonical_url': rule['canonical'],
                     'info': info,
                     'score': 0.8
                 })
@@ -128,49 +168,64 @@ def extract_from_maigret(data: list | dict) -> list[dict]:
 
 
 
-def extract_from_bing(results: list) -> list[dict]:
+def extract_from_bing(results: list, batch_size: int = BATCH_SIZE, use_cache: bool = True) -> list[dict]:
     """Extract and classify URLs from Bing search results."""
-    extracted = []
+    slots = []
+    unknown = []
     for item in results:
         url = item.get('url', '')
         title = item.get('title', '')
         snippet = item.get('snippet', '')
-        domain = urlparse(url).netloc.replace('www.', '')
-        platform = PRIMARY_DOMAINS.get(domain)
-        if platform:
-            extracted.append({
-                'platform': platform,
+        rule = RULES.check(url)
+        if rule['platform']:
+            slots.append({
+                'platform': rule['platform'],
                 'url': url,
+                'canonical_url': rule['canonical'],
                 'title': title,
                 'snippet': snippet,
                 'score': 1.0  # default high for known domains
             })
         else:
-            # classify unknown domains
-            if is_social_profile(url, title, snippet):
-                extracted.append({
-                    'platform': 'Other',
-                    'url': url,
-                    'title': title,
-                    'snippet': snippet,
-                    'score': 0.9
-                })
+            # unknown domains are classified together below, keeping their position
+            slots.append(len(unknown))
+            unknown.append({
+                'platform': 'Other',
+                'url': url,
+                'canonical_url': rule['canonical'],
+                'title': title,
+                'snippet': snippet,
+                'score': 0.9
+            })
+
+    verdicts = classify_profiles([(u['title'], u['snippet']) for u in unknown], batch_size, use_cache)
+    extracted = []
+    for slot in slots:
+        if isinstance(slot, dict):
+            extracted.append(slot)
+        elif verdicts[slot]:
+            extracted.append(unknown[slot])
     return extracted
 
 
-def refine_targets(maigret_path: str, bing_path: str, output_path: str):
+def refine_targets(maigret_path: str, bing_path: str, output_path: str, batch_size: int = BATCH_SIZE,
+                   use_cache: bool = True):
     """Main entry: load JSONs, extract, merge, dedupe, and save refined targets."""
-    maigret_data = load_json(maigret_path)
-    bing_data = load_json(bing_path)
+    # both reports are streamed record by record
+    maigret_data = load_stream(maigret_path)
+    bing_data = load_stream(bing_path)
 
     console.print("[bold cyan]Extracting from Maigret...[/]")
     maigret_results = extract_from_maigret(maigret_data)
 
     console.print("[bold cyan]Extracting from Bing...[/]")
-    bing_results = extract_from_bing(bing_data)
+    bing_results = extract_from_bing(bing_data, batch_size, use_cache)
+    if use_cache:
+        stats = get_cache().stats()
+        console.print(f"[cyan]Classifier cache: {stats['hits']} hits, {stats['misses']} misses[/]")
 
-    # merge and dedupe by URL
-    merged = {item['url']: item for item in maigret_results + bing_results}
+    # merge and dedupe by canonical URL
+    merged = {item['canonical_url']: item for item in maigret_results + bing_results}
     refined = list(merged.values())
 
     # sort by score descending
@@ -181,5 +236,6 @@ def refine_targets(maigret_path: str, bing_path: str, output_path: str):
         json.dump(refined, f, indent=4)
 
     console.print(f"[bold green]Refined targets saved to {output_path}[/]")
+    return refined
 
 
@@ -0,0 +1,78 @@
+# modules/batch.py
+"""
+Batch Mode for ShadowRecon
+
+- Reads a targets file (CSV with a header row, or NDJSON) with
+  target/username/email/phone/image/info columns
+- Runs every target through a bounded worker pool inside one process, so the
+  HTTP session pool, the classifier and the per-host rate limiters are shared
+- A failing target is reported and skipped; the other workers keep going
+"""
+import csv
+import json
+import time
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+FIELDS = ("target", "username", "email", "phone", "image", "info")
+
+
+def load_targets_file(path: str) -> list[dict]:
+    """Load target rows from a CSV or NDJSON file, detected from the first non-blank character."""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if content.lstrip().startswith('{'):
+        rows = [json.loads(line) for line in content.splitlines() if line.strip()]
+    else:
+        rows = list(csv.DictReader(content.splitlines()))
+
+    targets = []
+    for i, row in enumerate(rows, 1):
+        target = (row.get('target') or '').strip()
+        if not target:
+            console.print(f"[yellow]Row {i} in {path} has no target, skipping.[/]")
+            continue
+        entry = {k: (row.get(k) or None) for k in FIELDS}
+        entry['target'] = target
+        targets.append(entry)
+    return targets
+
+
+def run_batch(rows: list[dict], run_target, workers: int = 4, defaults: dict | None = None) -> dict:
+    """Run `run_target(args)` for every row on a worker pool and return {target: status}."""
+    statuses = {}
+    durations = {}
+
+    def work(row):
+        args = Namespace(**{**(defaults or {}), **row})
+        start = time.perf_counter()
+        try:
+            run_target(args)
+        finally:
+            durations[row['target']] = time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(work, row): row['target'] for row in rows}
+        for fut in as_completed(futures):
+            target = futures[fut]
+            try:
+                fut.result()
+                statuses[target] = 'ok'
+            except Exception as e:
+                statuses[target] = 'failed'
+                console.print(f"[bold red]Target '{target}' failed:[/] {e}")
+
+    table = Table(title="Batch Summary")
+    table.add_column("Target", style="cyan")
+    table.add_column("Status")
+    table.add_column("Time (s)", justify="right")
+    for row in rows:
+        status = statuses.get(row['target'], 'failed')
+        color = "green" if status == 'ok' else "red"
+        table.add_row(row['target'], f"[{color}]{status}[/]", f"{durations.get(row['target'], 0):.2f}")
+    console.print(table)
+    return statuses
@@ -1,76 +1,83 @@
 import os
-import json
 import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 from rich.console import Console
 from urllib.parse import quote
-import time
+from modules import http_client
+from modules.urls import normalize_url
+from modules.serp_parser import parse_serp
+from modules.result_store import get_store, write_json
 
 console = Console()
 
-HEADERS={
-"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                  "AppleWebKit/537.36 (KHTML, like Gecko) "
-                  "Chrome/114.0.0.0 Safari/537.36"
-}
+# per-platform `site:` queries sent alongside the plain name queries
+PLATFORM_SITES = ["instagram.com", "facebook.com", "linkedin.com", "github.com", "twitter.com", "youtube.com"]
 
-def bing(name,username=None,info=None,max_results=10):
-    query=f'"{name}"'
+
+def build_queries(name, username=None, info=None):
+    """Query variants: name alone, name+username, name+info and one `site:` query per platform."""
+    queries = [f'"{name}"']
     if username:
-        query += f'"{username} "'
+        queries.append(f'"{name}" "{username}"')
     if info:
-        query += f'" {info}"'
-
-    # query += " site:facebook.com OR site:instagram.com OR site:linkedin.com OR site:github.com
-
-    encoded_query=quote(query)
-    search_url = f"https://www.bing.com/search?q={encoded_query}&count={max_results}"
-    console.print(f"[bold cyan]Bing Search URL:[/] {search_url}")
-
-
+        queries.append(f'"{name}" {info}')
+    for site in PLATFORM_SITES:
+        queries.append(f'"{name}" site:{site}')
+    return queries
+
+
+def fetch_page(query, page=0, count=10, parser=None):
+    """
+    Fetch and parse one results page; waits on the shared bing.com limiter instead of sleeping.
+    Returns None when the request failed.
+    """
+    search_url = f"https://www.bing.com/search?q={quote(query)}&count={count}&first={page * count + 1}"
     try:
-        time.sleep(3)
-        response = requests.get(search_url, headers=HEADERS,timeout=20)
+        response = http_client.get(search_url, timeout=20)
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
-        console.print(f"[bold red]Request failed:[/] {e}")
-        return []
-
-    soup = BeautifulSoup(response.text, "html.parser")
+        console.print(f"[bold red]Request failed:[/] {search_url} {e}")
+        return None
+    results = parse_serp(response.text, parser)
+    for r in results:
+        r["query"] = query
+    return results
+
+
+def bing(name,username=None,info=None,max_results=10,pages=2,workers=4,parser=None,with_failures=False):
+    """
+    Search every query variant and save the deduplicated results to output/<name>/bing_result.json.
+    When every request fails, nothing is saved (an earlier result file is kept). Returns the
+    results, or (results, failed pages, total pages) with `with_failures`.
+    """
+    queries = build_queries(name, username, info)
+    jobs = [(q, p) for q in queries for p in range(pages)]
+    console.print(f"[bold cyan]Bing Search:[/] {len(queries)} queries x {pages} pages")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pages_results = list(pool.map(lambda job: fetch_page(job[0], job[1], max_results, parser), jobs))
+
+    # dedupe across pages and queries on the normalized URL, keeping the first hit
+    seen = set()
     results = []
-
-    for h2 in soup.find_all("h2"):
-        a = h2.find("a")
-        if not a or not a.get("href"):
-            continue
-        title = a.get_text(strip=True)
-        url = a["href"].strip()
-
-        # Try to find the next <p> sibling or parent <li> with a <p>
-        snippet_tag = h2.find_next("p")
-        snippet = snippet_tag.get_text(strip=True) if snippet_tag else ""
-
-        results.append({
-            "title": title,
-            "url": url,
-            "snippet": snippet
-        })
-
-    console.print(f"[bold green]Retrieved {len(results)} results from Bing.")
-
-    os.makedirs(f"output/{name}", exist_ok=True)
+    failed = sum(1 for page_results in pages_results if page_results is None)
+    for page_results in pages_results:
+        for r in page_results or []:
+            key = normalize_url(r["url"])
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append(r)
+
+    if failed == len(jobs):
+        console.print("[bold red]Every Bing request failed; keeping the previous results.[/]")
+        return (results, failed, len(jobs)) if with_failures else results
+    if failed:
+        console.print(f"[yellow]{failed} of {len(jobs)} Bing pages failed; results are incomplete.[/]")
+    console.print(f"[bold green]Retrieved {len(results)} unique results from Bing.")
+
+    get_store().add_source_records(name, 'bing', results)
     bing_output = os.path.join(f"output/{name}/bing_result.json")
-    with open(bing_output,"w") as f:
-        json.dump(results, f,indent=4)
+    write_json(bing_output, results)
     console.print(f"[bold yellow]Saved results to:[/] {name}")
-
-
-
-
-
-
-
-
-
-
-
+    return (results, failed, len(jobs)) if with_failures else results
@@ -0,0 +1,103 @@
+# modules/classifier_backends.py
+"""
+Zero-Shot Classifier Backends for ShadowRecon
+
+- "transformers": the reference facebook/bart-large-mnli pipeline (PyTorch, fp32)
+- "onnx":         the same model exported once to ONNX (optimum) and run by ONNX Runtime
+- "int8":         bart-large-mnli with its Linear layers dynamically quantized to int8 (PyTorch)
+- "distilled":    valhalla/distilbart-mnli-12-1, a distilled MNLI model about half the size
+- Every backend wraps a Hugging Face zero-shot pipeline, so all of them return the
+  (top label, score) pairs that ai_correlator.classify_profiles expects
+- The backend is chosen with --classifier-backend or SHADOWRECON_CLASSIFIER_BACKEND
+"""
+import os
+import importlib.util
+from rich.console import Console
+
+console = Console()
+
+BACKENDS = {}
+DEFAULT_BACKEND = "transformers"
+REFERENCE_MODEL = "facebook/bart-large-mnli"
+ONNX_DIR = "output/.cache/onnx"
+
+
+def backend(name: str, model: str, modules: tuple = ("transformers",)):
+    """Register a backend loader `func(model) -> pipeline`; `modules` are the packages it needs."""
+    def wrap(func):
+        BACKENDS[name] = {'func': func, 'model': model, 'modules': modules}
+        return func
+    return wrap
+
+
+def available_backends() -> list[str]:
+    return [n for n, b in BACKENDS.items() if all(importlib.util.find_spec(m) for m in b['modules'])]
+
+
+def cache_id(name: str) -> str:
+    """Key prefix for cached verdicts; the reference backend keeps the plain model name."""
+    model = BACKENDS[name]['model']
+    return model if name == DEFAULT_BACKEND else f"{name}:{model}"
+
+
+def configured_backend() -> str:
+    return os.environ.get("SHADOWRECON_CLASSIFIER_BACKEND", DEFAULT_BACKEND)
+
+
+@backend("transformers", REFERENCE_MODEL)
+def load_transformers(model: str):
+    from transformers import pipeline
+    return pipeline("zero-shot-classification", model=model)
+
+
+@backend("distilled", "valhalla/distilbart-mnli-12-1")
+def load_distilled(model: str):
+    from transformers import pipeline
+    return pipeline("zero-shot-classification", model=model)
+
+
+@backend("int8", REFERENCE_MODEL, ("transformers", "torch"))
+def load_int8(model: str):
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+    fp32 = AutoModelForSequenceClassification.from_pretrained(model)
+    quantized = torch.ao.quantization.quantize_dynamic(fp32, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("zero-shot-classification", model=quantized, tokenizer=AutoTokenizer.from_pretrained(model))
+
+
+@backend("onnx", REFERENCE_MODEL, ("transformers", "optimum", "onnxruntime"))
+def load_onnx(model: str):
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer, pipeline
+    export_dir = os.path.join(ONNX_DIR, model.replace("/", "__"))
+    if os.path.exists(os.path.join(export_dir, "model.onnx")):
+        ort_model = ORTModelForSequenceClassification.from_pretrained(export_dir)
+        tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    else:
+        # exported once, then reused from disk
+        console.print(f"[cyan]Exporting {model} to ONNX in {export_dir}...[/]")
+        ort_model = ORTModelForSequenceClassification.from_pretrained(model, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model)
+        ort_model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+    return pipeline("zero-shot-classification", model=ort_model, tokenizer=tokenizer)
+
+
+class Classifier:
+    """A loaded backend with the predict() interface ai_correlator uses."""
+
+    def __init__(self, name: str):
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown classifier backend '{name}'. Available: {', '.join(BACKENDS)}")
+        self.name = name
+        self.model = BACKENDS[name]['model']
+        self.cache_id = cache_id(name)
+        console.print(f"[cyan]Loading zero-shot classifier {self.model} ({name} backend)...[/]")
+        self.pipe = BACKENDS[name]['func'](self.model)
+
+    def predict(self, texts: list[str], labels: list[str], batch_size: int) -> list[tuple[str, float]]:
+        """(top label, score) of each text."""
+        results = self.pipe(texts, candidate_labels=labels, multi_label=False, batch_size=batch_size)
+        if isinstance(results, dict):
+            results = [results]
+        return [(r['labels'][0], float(r['scores'][0])) for r in results]
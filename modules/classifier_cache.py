@@ -0,0 +1,98 @@
+# modules/classifier_cache.py
+"""
+Persistent Classification Cache for ShadowRecon
+
+- SQLite file keyed by sha256(model name, label set, title, snippet)
+- Stores the top label and score, so the social-profile threshold can change without invalidating entries
+- Size-bounded: least recently used entries are evicted past `max_entries`
+- Keeps hit/miss counters for the current process
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+CACHE_PATH = "output/.cache/classifier.sqlite"
+MAX_ENTRIES = 100_000
+
+
+class ClassifierCache:
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = MAX_ENTRIES):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS classifications ("
+            "key TEXT PRIMARY KEY, label TEXT NOT NULL, score REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON classifications(last_used)")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(model: str, labels: list[str], title: str, snippet: str) -> str:
+        raw = json.dumps([model, sorted(labels), title, snippet], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict:
+        """Return {key: (label, score)} for the keys present, bumping their LRU timestamp."""
+        found = {}
+        with self.lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT key, label, score FROM classifications WHERE key IN ({marks})", chunk
+                ).fetchall()
+                found.update({k: (label, score) for k, label, score in rows})
+            if found:
+                now = time.time()
+                self.conn.executemany("UPDATE classifications SET last_used=? WHERE key=?",
+                                      [(now, k) for k in found])
+                self.conn.commit()
+            hits = sum(1 for k in keys if k in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, entries: dict):
+        """Store {key: (label, score)} and evict the least recently used entries past the size bound."""
+        if not entries:
+            return
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO classifications (key, label, score, last_used) VALUES (?, ?, ?, ?)",
+                [(k, label, score, now) for k, (label, score) in entries.items()]
+            )
+            count = self.conn.execute("SELECT COUNT(*) FROM classifications").fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute(
+                    "DELETE FROM classifications WHERE key IN "
+                    "(SELECT key FROM classifications ORDER BY last_used ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self.conn.commit()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ClassifierCache:
+    """Return the process-wide cache, opening it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ClassifierCache()
+        return _cache
@@ -0,0 +1,257 @@
+# modules/correlation.py
+"""
+Cross-Target Correlation Index for ShadowRecon
+
+- Persistent inverted index (output/correlation.sqlite) from normalized identifiers
+  (canonical URLs, handles, emails, phone numbers, media hashes) to the targets that
+  produced them, with the first/last run and how many runs saw each one
+- Updated incrementally: every stage indexes what it found as soon as it finishes
+- One row per (identifier, target), however many runs there were, so `--correlate`
+  stays a couple of indexed lookups with tens of thousands of past runs
+"""
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from rich.console import Console
+from modules.urls import canonicalize
+
+console = Console()
+
+INDEX_PATH = "output/correlation.sqlite"
+
+HANDLE = re.compile(r'(?<![\w.])@([A-Za-z0-9_.]{2,30})')
+EMAIL = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
+
+# first path segment that is not a handle on these hosts (linkedin.com/in/<handle>, ...)
+NOT_HANDLES = {'p', 'in', 'pub', 'reel', 'reels', 'explore', 'watch', 'channel', 'c', 'user', 'search',
+               'hashtag', 'groups', 'pages', 'people', 'profile.php', 'share', 'status', 'stories', 'company'}
+HANDLE_HOSTS = {'instagram.com', 'twitter.com', 'x.com', 'github.com', 'facebook.com', 'linkedin.com',
+                'tiktok.com', 'youtube.com', 'reddit.com', 'medium.com', 'pinterest.com', 'threads.net'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS identifiers (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    UNIQUE (kind, value)
+);
+CREATE TABLE IF NOT EXISTS sightings (
+    identifier_id INTEGER NOT NULL REFERENCES identifiers(id),
+    target TEXT NOT NULL,
+    sources TEXT NOT NULL,
+    first_run TEXT NOT NULL,
+    last_run TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (identifier_id, target)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_sightings_target ON sightings(target, identifier_id);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT NOT NULL,
+    target TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    PRIMARY KEY (run_id, target)
+);
+"""
+
+
+def normalize(kind: str, value: str) -> str | None:
+    """Normalized form of an identifier, or None if it is not usable."""
+    value = (value or '').strip()
+    if not value:
+        return None
+    if kind == 'url':
+        # canonicalize() already lowercases the scheme and host; path and query are case-sensitive
+        host, canonical = canonicalize(value if '://' in value else f"https://{value}")
+        return canonical if host else None
+    if kind == 'handle':
+        value = value.lstrip('@').lower().rstrip('.')
+        return value if len(value) > 1 else None
+    if kind == 'email':
+        return value.lower() if EMAIL.fullmatch(value) else None
+    if kind == 'phone':
+        digits = re.sub(r'\D', '', value)
+        return ('+' if value.startswith('+') else '') + digits if len(digits) >= 7 else None
+    if kind == 'media':
+        return value.lower()
+    raise ValueError(f"Unknown identifier kind: {kind}")
+
+
+def handle_from_url(url: str) -> str | None:
+    """The account name in a profile URL on a known platform (instagram.com/johndoe -> johndoe)."""
+    host, canonical = canonicalize(url)
+    if host.startswith('m.'):
+        host = host[2:]
+    if host not in HANDLE_HOSTS:
+        return None
+    path = canonical.split('://', 1)[1].partition('?')[0]
+    segments = [s for s in path.split('/')[1:] if s]
+    if host == 'linkedin.com' and len(segments) > 1 and segments[0] == 'in':
+        return segments[1]
+    if segments and segments[0].lower() not in NOT_HANDLES:
+        return segments[0].lstrip('@')
+    return None
+
+
+def identifiers_from_text(text: str) -> list[tuple[str, str]]:
+    """@handles and emails mentioned in a title or snippet."""
+    found = [('email', m) for m in EMAIL.findall(text or '')]
+    emails = {v for _, v in found}
+    found += [('handle', m) for m in HANDLE.findall(text or '') if not any(m in e for e in emails)]
+    return found
+
+
+def identifiers_from_link(item: dict) -> list[tuple[str, str]]:
+    """Identifiers in a Maigret record, Bing result or refined link."""
+    status = item.get('status') or {}
+    url = item.get('url') or status.get('url')
+    found = []
+    if url:
+        found.append(('url', url))
+        handle = handle_from_url(url)
+        if handle:
+            found.append(('handle', handle))
+    for username in [status.get('username')] + list(item.get('found_by') or []):
+        if username:
+            found.append(('handle', username))
+    for key in ('title', 'snippet'):
+        found += identifiers_from_text(item.get(key, ''))
+    return found
+
+
+def identifiers_from_target(info: dict) -> list[tuple[str, str]]:
+    found = []
+    if info.get('username'):
+        found.append(('handle', info['username']))
+    if info.get('email'):
+        found.append(('email', info['email']))
+    if info.get('phone'):
+        found.append(('phone', info['phone']))
+    return found
+
+
+def identifiers_from_profile(data: dict) -> list[tuple[str, str]]:
+    """Identifiers in an Instagram profile: username, external URL, bio mentions and media hashes."""
+    found = [('handle', data.get('username', ''))]
+    if data.get('external_url'):
+        found.append(('url', data['external_url']))
+    found += identifiers_from_text(data.get('bio') or '')
+    paths = [data.get('profile_pic_path')]
+    for section in ('posts', 'stories', 'tagged_posts'):
+        paths += [e.get('media_path') for e in data.get(section, [])]
+    for hl in data.get('highlights', []):
+        paths += [e.get('media_path') for e in hl.get('items', [])]
+    for path in paths:
+        digest = media_hash(path)
+        if digest:
+            found.append(('media', digest))
+    return found
+
+
+def media_hash(path: str | None) -> str | None:
+    """SHA-256 of a downloaded file (the same key the media store uses), None if it is missing."""
+    if not path or not os.path.isfile(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CorrelationIndex:
+    def __init__(self, path: str = INDEX_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def add(self, target: str, run_id: str, source: str, identifiers: list[tuple[str, str]]) -> int:
+        """Index (kind, value) pairs seen for `target` in run `run_id`. Returns how many were usable."""
+        pairs = {(kind, v) for kind, value in identifiers if (v := normalize(kind, value))}
+        if not pairs:
+            return 0
+        now = time.time()
+        with self.lock:
+            self.conn.execute("INSERT OR IGNORE INTO runs (run_id, target, started_at) VALUES (?, ?, ?)",
+                              (run_id, target, now))
+            self.conn.executemany("INSERT OR IGNORE INTO identifiers (kind, value) VALUES (?, ?)", pairs)
+            ids = []
+            for kind, value in pairs:
+                ids.append(self.conn.execute("SELECT id FROM identifiers WHERE kind=? AND value=?",
+                                             (kind, value)).fetchone()[0])
+            self.conn.executemany(
+                "INSERT INTO sightings (identifier_id, target, sources, first_run, last_run, runs, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, 1, ?, ?) ON CONFLICT (identifier_id, target) DO UPDATE SET "
+                "runs = runs + (last_run != excluded.last_run), last_run = excluded.last_run, "
+                "last_seen = excluded.last_seen, "
+                "sources = CASE WHEN instr(',' || sources || ',', ',' || excluded.sources || ',') "
+                "THEN sources ELSE sources || ',' || excluded.sources END",
+                [(i, target, source, run_id, run_id, now, now) for i in ids])
+            self.conn.commit()
+        return len(pairs)
+
+    def correlate(self, target: str, limit: int = 50) -> list[dict]:
+        """Other targets sharing identifiers with `target`, most shared first."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT other.target, i.kind, i.value, other.runs, other.last_run "
+                "FROM sightings mine "
+                "JOIN sightings other ON other.identifier_id = mine.identifier_id AND other.target != mine.target "
+                "JOIN identifiers i ON i.id = mine.identifier_id "
+                "WHERE mine.target = ?", (target,)).fetchall()
+        overlaps = {}
+        for other, kind, value, runs, last_run in rows:
+            entry = overlaps.setdefault(other, {'target': other, 'shared': [], 'runs': 0, 'last_run': ''})
+            entry['shared'].append({'kind': kind, 'value': value})
+            entry['runs'] = max(entry['runs'], runs)
+            entry['last_run'] = max(entry['last_run'], last_run)
+        return sorted(overlaps.values(), key=lambda e: len(e['shared']), reverse=True)[:limit]
+
+    def lookup(self, kind: str, value: str) -> list[dict]:
+        """Targets an identifier was seen for."""
+        value = normalize(kind, value)
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT s.target, s.sources, s.first_run, s.last_run, s.runs FROM identifiers i "
+                "JOIN sightings s ON s.identifier_id = i.id WHERE i.kind=? AND i.value=?", (kind, value)).fetchall()
+        return [dict(zip(('target', 'sources', 'first_run', 'last_run', 'runs'), r)) for r in rows]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> CorrelationIndex:
+    """Return the process-wide correlation index, opening it on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CorrelationIndex()
+        return _index
+
+
+def print_correlations(target: str, overlaps: list[dict], elapsed: float):
+    from rich.table import Table
+    if not overlaps:
+        console.print(f"[yellow]No other target shares an identifier with {target}.[/] ({elapsed * 1000:.1f} ms)")
+        return
+    table = Table(title=f"Targets overlapping {target}")
+    table.add_column("Target", style="cyan")
+    table.add_column("Shared", justify="right")
+    table.add_column("Identifiers")
+    table.add_column("Last run")
+    for entry in overlaps:
+        shown = ", ".join(f"{s['kind']}:{s['value']}" for s in entry['shared'][:5])
+        if len(entry['shared']) > 5:
+            shown += f" (+{len(entry['shared']) - 5})"
+        table.add_row(entry['target'], str(len(entry['shared'])), shown, entry['last_run'])
+    console.print(table)
+    console.print(f"[cyan]Query took {elapsed * 1000:.1f} ms[/]")
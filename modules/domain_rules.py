@@ -0,0 +1,74 @@
+# modules/domain_rules.py
+"""
+Domain Rule Engine for ShadowRecon
+
+- Block list, allow list and platform mapping are compiled once into
+  reversed-label suffix tries: "fandom.com" is stored as com -> fandom and
+  matches fandom.com and any subdomain of it, never "notfandom.com"
+- Rule entries may be bare hosts or full URLs ("https://3ddd.ru"); both compile to the host
+- check() parses and normalizes a URL exactly once and returns its host,
+  canonical URL (the dedup key), platform and block verdict
+- An allow-list match wins over a block-list match
+"""
+from modules.urls import canonicalize
+
+_VALUE = ''  # trie key holding a node's value; labels are never empty
+
+
+def rule_host(entry: str) -> str:
+    """Host part of a rule entry, whether it is written as a host or a URL."""
+    entry = entry.strip().lower()
+    if '://' in entry:
+        return canonicalize(entry)[0]
+    entry = entry.strip('/').split('/')[0]
+    return entry[4:] if entry.startswith('www.') else entry
+
+
+class SuffixTrie:
+    def __init__(self, entries: dict | None = None):
+        self.root = {}
+        for host, value in (entries or {}).items():
+            self.insert(host, value)
+
+    def insert(self, host: str, value):
+        node = self.root
+        for label in reversed(rule_host(host).split('.')):
+            node = node.setdefault(label, {})
+        node[_VALUE] = value
+
+    def match(self, host: str):
+        """Value of the longest rule that `host` equals or is a subdomain of, else None."""
+        node = self.root
+        found = None
+        for label in reversed(host.split('.')):
+            node = node.get(label)
+            if node is None:
+                break
+            if _VALUE in node:
+                found = node[_VALUE]
+        return found
+
+
+class DomainRules:
+    def __init__(self, blocked=(), allowed=(), platforms: dict | None = None):
+        self.blocked = SuffixTrie({h: True for h in blocked})
+        self.allowed = SuffixTrie({h: True for h in allowed})
+        self.platforms = SuffixTrie(platforms)
+
+    def check(self, url: str) -> dict:
+        """Parse `url` once: {'host', 'canonical', 'platform', 'blocked'}."""
+        host, canonical = canonicalize(url)
+        return {
+            'host': host,
+            'canonical': canonical,
+            'platform': self.platforms.match(host),
+            'blocked': bool(self.blocked.match(host)) and not self.allowed.match(host),
+        }
+
+    def is_blocked(self, url: str) -> bool:
+        return self.check(url)['blocked']
+
+
+def compile_rules(blocked=(), allowed=(), platforms: dict | None = None) -> DomainRules:
+    """Compile block/allow lists and a host -> platform mapping into a rule engine."""
+    return DomainRules(blocked, allowed, platforms)
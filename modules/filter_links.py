@@ -1,8 +1,10 @@
 
 import os
 import json
-from urllib.parse import urlparse
+from collections.abc import Iterator
 from rich.console import Console
+from modules.domain_rules import compile_rules
+from modules.ingest import load_stream
 
 console = Console()
 
@@ -21,34 +23,33 @@ BLOCKED_DOMAINS = [
     "scratch.mit.edu", "twitchtracker.com", "socialblade.com","https://opensea.io"
 ]
 
-def load_json(path: str) -> list | dict:
-    try:
-        with open(path, 'r', encoding='utf-8') as f:
-            content = f.read().strip()
-        try:
-            return json.loads(content)
-        except json.JSONDecodeError:
-            return [json.loads(line) for line in content.splitlines() if line.strip()]
-    except Exception as e:
-        console.print(f"[red]Failed to load {path}: {e}[/]")
-        return []
+# Hosts that stay in even when a blocked rule covers them
+ALLOWED_DOMAINS = []
+
+# compiled once; every URL is parsed and normalized a single time through RULES.check
+RULES = compile_rules(BLOCKED_DOMAINS, ALLOWED_DOMAINS, PRIMARY_DOMAINS)
 
 def is_blocked(url:str) -> bool:
-    domain = urlparse(url).netloc.replace("www.", "")
-    return any(blocked in domain for blocked in BLOCKED_DOMAINS)
+    return RULES.is_blocked(url)
 
-def extract_from_maigret(data: list | dict) -> list[dict]:
+def extract_from_maigret(data: list | Iterator | dict) -> list[dict]:
     """Extract found sites with details from Maigret output."""
     results = []
-    if isinstance(data, list):
+    if isinstance(data, dict) and 'sites' not in data and 'status' in data:
+        data = [data]  # a one-record NDJSON report
+    if isinstance(data, (list, Iterator)):
         for entry in data:
             site = entry.get("site", {})
             status = entry.get("status", {})
             url = status.get("url")
-            if status.get("status") == "Claimed" and url and not is_blocked(url):
+            if status.get("status") != "Claimed" or not url:
+                continue
+            rule = RULES.check(url)
+            if not rule['blocked']:
                 results.append({
-                    'platform': PRIMARY_DOMAINS.get(urlparse(url).netloc, status.get("site_name", "Unknown")),
+                    'platform': rule['platform'] or status.get("site_name", "Unknown"),
                     'url': url,
+                    'canonical_url': rule['canonical'],
                     'info': entry,
                     'score': 0.8
                 })
@@ -57,10 +58,14 @@ def extract_from_maigret(data: list | dict) -> list[dict]:
         for site, info in sites.items():
             if info.get('status') == 'found':
                 url = info.get('url')
-                if url and not is_blocked(url):
+                if not url:
+                    continue
+                rule = RULES.check(url)
+                if not rule['blocked']:
                     results.append({
-                        'platform': PRIMARY_DOMAINS.get(urlparse(url).netloc, site),
+                        'platform': rule['platform'] or site,
                         'url': url,
+                        'canonical_url': rule['canonical'],
                         'info': info,
                         'score': 0.8
                     })
@@ -77,13 +82,15 @@ def extract_from_bing(data: list) -> list[dict]:
         url = entry.get('url', '')
         title = entry.get('title', '')
         snippet = entry.get('snippet', '')
-        if not url or is_blocked(url):
+        if not url:
+            continue
+        rule = RULES.check(url)
+        if rule['blocked']:
             continue
-        domain = urlparse(url).netloc.replace('www.', '')
-        platform = PRIMARY_DOMAINS.get(domain, 'Other')
         results.append({
-            'platform': platform,
+            'platform': rule['platform'] or 'Other',
             'url': url,
+            'canonical_url': rule['canonical'],
             'title': title,
             'snippet': snippet,
             'score': 0.9,
@@ -92,8 +99,9 @@ def extract_from_bing(data: list) -> list[dict]:
     return results
 
 def refine_targets(maigret_path: str, bing_path: str, output_path: str):
-    maigret_data = load_json(maigret_path)
-    bing_data = load_json(bing_path)
+    # both reports are streamed record by record
+    maigret_data = load_stream(maigret_path)
+    bing_data = load_stream(bing_path)
 
     console.print("[bold cyan]Extracting Maigret links...[/]")
     maigret_results = extract_from_maigret(maigret_data)
@@ -102,11 +110,13 @@ def refine_targets(maigret_path: str, bing_path: str, output_path: str):
     bing_results = extract_from_bing(bing_data)
 
     combined = maigret_results + bing_results
-    unique = {entry['url']: entry for entry in combined}.values()
+    # dedupe on the canonical URL so www./scheme/case/trailing-slash variants collapse
+    unique = {entry['canonical_url']: entry for entry in combined}.values()
     sorted_links = sorted(unique, key=lambda x: x.get('score', 0), reverse=True)
 
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(list(sorted_links), f, indent=4)
+        json.dump(sorted_links, f, indent=4)
 
-    console.print(f"[bold green]Refined targets saved to {output_path}[/]")
\ No newline at end of file
+    console.print(f"[bold green]Refined targets saved to {output_path}[/]")
+    return sorted_links
\ No newline at end of file
@@ -0,0 +1,278 @@
+# modules/http_client.py
+"""
+Shared HTTP layer for ShadowRecon
+
+- One requests.Session per process with a keep-alive connection pool,
+  shared by every module and every worker thread in batch mode
+- One token-bucket rate limiter per host, so concurrent targets never
+  hammer the same site harder than a single run would
+- One retry/timeout policy for every request: connection errors and 5xx are
+  retried with exponential backoff; 429/403 are left to the callers' schedulers
+- Non-streamed GETs go through an on-disk response cache (output/.cache/http):
+  bodies are stored once by SHA-256, entries are fresh for a per-host TTL and then
+  revalidated with If-None-Match / If-Modified-Since
+- Every GET is counted in modules/telemetry.py by host, status and source (network,
+  cache, revalidated, replay), with network latency, body bytes and rate-limiter waits
+- Record/replay: `configure(record=dir)` captures every response into a cassette
+  directory, `configure(replay=dir)` serves the pipeline from it without any network
+"""
+import io
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+from modules import telemetry
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                  "AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/114.0.0.0 Safari/537.36"
+}
+
+# requests per second and burst size per host; hosts not listed are not throttled
+HOST_RATES = {
+    "www.bing.com": (3.0, 6),
+}
+
+
+class _Retry(Retry):
+    # urllib3 would also retry 429 whenever it carries Retry-After; 429 is left to the per-host schedulers
+    RETRY_AFTER_STATUS_CODES = frozenset({503})
+
+
+# (connect, read) seconds, used when a caller does not pass its own timeout
+DEFAULT_TIMEOUT = (10, 30)
+RETRIES = _Retry(total=3, connect=3, read=2, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504),
+                 allowed_methods=frozenset({"GET", "HEAD"}), respect_retry_after_header=True,
+                 raise_on_status=False)
+
+CACHE_DIR = "output/.cache/http"
+# seconds a cached response is served without revalidation; other hosts use DEFAULT_CACHE_TTL
+CACHE_TTLS = {
+    "www.bing.com": 6 * 3600,
+}
+DEFAULT_CACHE_TTL = 3600
+
+_session = None
+_session_lock = threading.Lock()
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+# set by configure()
+_cache_enabled = True
+_cache = None
+_cassette = None
+_mode = "live"
+_config_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `capacity` stored."""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns the time waited."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+def get_session(pool_size: int = 32) -> requests.Session:
+    """Return the process-wide session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=RETRIES)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(HEADERS)
+            _session = session
+        return _session
+
+
+def get_limiter(host: str) -> TokenBucket | None:
+    """Return the shared limiter for `host`, or None if the host is not throttled."""
+    if host not in HOST_RATES:
+        return None
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = TokenBucket(*HOST_RATES[host])
+        return _limiters[host]
+
+
+class ResponseStore:
+    """SQLite index of responses by request key, with bodies stored once by SHA-256."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, "bodies"), exist_ok=True)
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stored': 0}
+        self.conn = sqlite3.connect(os.path.join(directory, "index.sqlite"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, url TEXT NOT NULL, "
+                          "status INTEGER NOT NULL, headers TEXT NOT NULL, body_sha256 TEXT NOT NULL, "
+                          "stored_at REAL NOT NULL)")
+        self.conn.commit()
+
+    def _body_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "bodies", digest[:2], digest)
+
+    def lookup(self, key: str) -> dict | None:
+        with self.lock:
+            row = self.conn.execute("SELECT url, status, headers, body_sha256, stored_at FROM responses "
+                                    "WHERE key=?", (key,)).fetchone()
+        if not row or not os.path.exists(self._body_path(row[3])):
+            return None
+        return {'url': row[0], 'status': row[1], 'headers': json.loads(row[2]), 'body_sha256': row[3],
+                'stored_at': row[4]}
+
+    def store(self, key: str, url: str, resp: requests.Response):
+        body = resp.content  # reads streamed bodies too; iter_content then serves from memory
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._body_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", 'wb') as f:
+                f.write(body)
+            os.replace(path + ".tmp", path)
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO responses (key, url, status, headers, body_sha256, stored_at) "
+                              "VALUES (?, ?, ?, ?, ?, ?)",
+                              (key, url, resp.status_code, json.dumps(dict(resp.headers)), digest, time.time()))
+            self.conn.commit()
+            self.stats['stored'] += 1
+
+    def touch(self, key: str):
+        with self.lock:
+            self.conn.execute("UPDATE responses SET stored_at=? WHERE key=?", (time.time(), key))
+            self.conn.commit()
+
+    def response(self, entry: dict) -> requests.Response:
+        """Rebuild a requests.Response from a stored entry."""
+        with open(self._body_path(entry['body_sha256']), 'rb') as f:
+            body = f.read()
+        resp = requests.Response()
+        resp.status_code = entry['status']
+        resp.headers = CaseInsensitiveDict(entry['headers'])
+        resp.url = entry['url']
+        resp.reason = "OK" if entry['status'] < 400 else ""
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        resp.raw = io.BytesIO(body)
+        resp._content = body
+        resp._content_consumed = True
+        resp.from_cache = True
+        return resp
+
+
+def configure(cache: bool = True, record: str | None = None, replay: str | None = None):
+    """Turn the response cache on/off and pick live, record (into a cassette dir) or replay mode."""
+    global _cache_enabled, _cassette, _mode
+    if record and replay:
+        raise ValueError("record and replay cannot be used together")
+    with _config_lock:
+        _cache_enabled = cache
+        _mode = "record" if record else "replay" if replay else "live"
+        _cassette = ResponseStore(record or replay) if (record or replay) else None
+
+
+def get_cache() -> ResponseStore:
+    global _cache
+    with _config_lock:
+        if _cache is None:
+            _cache = ResponseStore(CACHE_DIR)
+        return _cache
+
+
+def cache_stats() -> dict:
+    return dict(_cache.stats) if _cache else {}
+
+
+def request_key(url: str, headers: dict | None = None) -> str:
+    """Cache key of a GET: the full URL plus the headers that change the body (Range)."""
+    range_header = (headers or {}).get('Range', '')
+    return hashlib.sha256(f"GET {url}\n{range_header}".encode('utf-8')).hexdigest()
+
+
+def cache_ttl(url: str) -> int:
+    return CACHE_TTLS.get(urlparse(url).netloc, DEFAULT_CACHE_TTL)
+
+
+def get(url: str, cache_ttl_seconds: int | None = None, **kwargs) -> requests.Response:
+    """
+    GET through the shared session with the default timeout, the response cache and the
+    record/replay cassette, waiting on the host's rate limiter before going to the network.
+    """
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    full_url = requests.Request('GET', url, params=kwargs.pop('params', None)).prepare().url
+    headers = dict(kwargs.pop('headers', None) or {})
+    key = request_key(full_url, headers)
+    host = urlparse(full_url).netloc
+
+    if _mode == "replay":
+        entry = _cassette.lookup(key)
+        if entry is None:
+            raise requests.exceptions.ConnectionError(f"Not in the replay cassette: {full_url}")
+        _cassette.stats['hits'] += 1
+        telemetry.inc('http_requests_total', host=host, status=entry['status'], source='replay')
+        return _cassette.response(entry)
+
+    ttl = cache_ttl(full_url) if cache_ttl_seconds is None else cache_ttl_seconds
+    cache = get_cache() if _cache_enabled and ttl > 0 and not kwargs.get('stream') else None
+    entry = cache.lookup(key) if cache else None
+    if entry and time.time() - entry['stored_at'] < ttl:
+        cache.stats['hits'] += 1
+        resp = cache.response(entry)
+        source = 'cache'
+    else:
+        if entry:
+            # stale: ask the server whether our copy is still current
+            etag = entry['headers'].get('ETag') or entry['headers'].get('etag')
+            modified = entry['headers'].get('Last-Modified') or entry['headers'].get('last-modified')
+            if etag:
+                headers['If-None-Match'] = etag
+            if modified:
+                headers['If-Modified-Since'] = modified
+        limiter = get_limiter(host)
+        if limiter:
+            telemetry.inc('rate_limit_wait_seconds_total', limiter.acquire(), limiter=host)
+        with telemetry.timer('http_request_seconds', host=host):
+            resp = get_session().get(full_url, headers=headers, **kwargs)
+        source = 'network'
+        if not kwargs.get('stream'):
+            telemetry.inc('http_response_bytes_total', len(resp.content), host=host)
+        if cache:
+            if resp.status_code == 304 and entry:
+                cache.stats['revalidated'] += 1
+                cache.touch(key)
+                resp = cache.response(entry)
+                source = 'revalidated'
+            else:
+                cache.stats['misses'] += 1
+                if resp.status_code == 200 and 'no-store' not in resp.headers.get('Cache-Control', ''):
+                    cache.store(key, full_url, resp)
+
+    telemetry.inc('http_requests_total', host=host, status=resp.status_code, source=source)
+    if _mode == "record":
+        _cassette.store(key, full_url, resp)
+    return resp
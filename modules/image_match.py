@@ -0,0 +1,229 @@
+# modules/image_match.py
+"""
+Perceptual Image Matching for ShadowRecon
+
+- Computes a 64-bit pHash (DCT of a 32x32 grayscale thumbnail) and dHash
+  (horizontal gradient of a 9x8 thumbnail) for every downloaded profile picture and post media
+- Hashes live in a packed (2, N) uint64 NumPy index under output/.index/images/
+  (row 0 pHash, row 1 dHash, each contiguous), appended incrementally and saved with
+  np.save; labels (target, profile, section, path) sit next to it as NDJSON, one line per row
+- search() XORs the --image hashes against the whole index and popcounts in one
+  vectorized pass, then keeps rows under a Hamming threshold
+- rank_profiles() groups matches into candidate profiles, best match first
+- Needs Pillow to decode images
+"""
+import os
+import json
+import threading
+import numpy as np
+from rich.console import Console
+
+console = Console()
+
+INDEX_DIR = "output/.index/images"
+THRESHOLD = 10  # average pHash/dHash bit distance still counted as the same picture
+IMAGE_EXTS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp'}
+
+if hasattr(np, 'bitwise_count'):
+    popcount = np.bitwise_count
+else:
+    _BYTE_BITS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def popcount(values: np.ndarray) -> np.ndarray:
+        as_bytes = values.view(np.uint8).reshape(values.shape + (8,))
+        return _BYTE_BITS[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    m[0] /= np.sqrt(2)
+    return m
+
+
+_DCT32 = _dct_matrix(32)
+
+
+def pack_bits(bits: np.ndarray) -> np.uint64:
+    """64 booleans (row-major) -> one uint64."""
+    return np.packbits(bits.astype(np.uint8).ravel()).view('>u8').astype(np.uint64)[0]
+
+
+def phash_pixels(pixels: np.ndarray) -> np.uint64:
+    """pHash of a 32x32 grayscale array: low 8x8 DCT frequencies compared to their median."""
+    coeffs = _DCT32 @ pixels.astype(np.float64) @ _DCT32.T
+    low = coeffs[:8, :8]
+    median = np.median(low.ravel()[1:])  # the DC term would dominate the median
+    return pack_bits(low > median)
+
+
+def dhash_pixels(pixels: np.ndarray) -> np.uint64:
+    """dHash of a 8-row x 9-column grayscale array: is each pixel brighter than its left neighbour."""
+    pixels = pixels.astype(np.int16)
+    return pack_bits(pixels[:, 1:] > pixels[:, :-1])
+
+
+def image_hashes(path: str) -> tuple[np.uint64, np.uint64]:
+    """(pHash, dHash) of an image file."""
+    from PIL import Image
+    with Image.open(path) as img:
+        gray = img.convert('L')
+        big = np.asarray(gray.resize((32, 32), Image.Resampling.LANCZOS))
+        small = np.asarray(gray.resize((9, 8), Image.Resampling.LANCZOS))
+    return phash_pixels(big), dhash_pixels(small)
+
+
+def hamming(hashes: np.ndarray, query: np.uint64) -> np.ndarray:
+    """Bit distance (uint8) of every hash in a contiguous uint64 row to the query hash."""
+    return popcount(hashes ^ query)
+
+
+class HashIndex:
+    def __init__(self, index_dir: str = INDEX_DIR):
+        self.index_dir = index_dir
+        self.lock = threading.Lock()
+        self.hashes_path = os.path.join(index_dir, "hashes.npy")
+        self.labels_path = os.path.join(index_dir, "labels.ndjson")
+        self.labels = []
+        self.hashes = np.empty((2, 0), dtype=np.uint64)
+        if os.path.exists(self.hashes_path) and os.path.exists(self.labels_path):
+            self.hashes = np.load(self.hashes_path)
+            with open(self.labels_path, 'r', encoding='utf-8') as f:
+                self.labels = [json.loads(line) for line in f if line.strip()]
+            # a crash between the two writes leaves them out of step; keep the common prefix
+            n = min(len(self.labels), self.hashes.shape[1])
+            self.hashes, self.labels = np.ascontiguousarray(self.hashes[:, :n]), self.labels[:n]
+        self.known = {self._file_key(label['path'], label['size'], label['mtime']) for label in self.labels}
+
+    @staticmethod
+    def _file_key(path: str, size: int, mtime: float) -> tuple:
+        return os.path.abspath(path), size, int(mtime)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def add(self, items: list[dict]) -> int:
+        """
+        Hash and index image files. Each item needs 'path' and may carry any labels
+        ('target', 'profile', 'section', 'url'). Files already indexed are skipped.
+        Returns how many were added.
+        """
+        rows, labels = [], []
+        for item in items:
+            path = item.get('path')
+            if not path or os.path.splitext(path)[1].lower() not in IMAGE_EXTS or not os.path.isfile(path):
+                continue
+            st = os.stat(path)
+            key = self._file_key(path, st.st_size, st.st_mtime)
+            if key in self.known:
+                continue
+            try:
+                rows.append(image_hashes(path))
+            except ImportError:
+                raise
+            except Exception as e:
+                console.print(f"[yellow]Could not hash {path}: {e}[/]")
+                continue
+            self.known.add(key)
+            labels.append({**item, 'size': st.st_size, 'mtime': st.st_mtime})
+        if not rows:
+            return 0
+        with self.lock:
+            self.hashes = np.concatenate([self.hashes, np.array(rows, dtype=np.uint64).T], axis=1)
+            self.labels += labels
+            self._save(labels)
+        return len(rows)
+
+    def _save(self, new_labels: list[dict]):
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(self.labels_path, 'a', encoding='utf-8') as f:
+            for label in new_labels:
+                f.write(json.dumps(label, ensure_ascii=False) + "\n")
+        tmp = self.hashes_path + ".tmp.npy"
+        np.save(tmp, self.hashes)
+        os.replace(tmp, self.hashes_path)
+
+    def search(self, phash: np.uint64, dhash: np.uint64, threshold: int = THRESHOLD, limit: int = 50) -> list[dict]:
+        """Indexed images within `threshold` average bit distance of the query hashes, closest first."""
+        with self.lock:
+            hashes, labels = self.hashes, self.labels
+        if not hashes.shape[1]:
+            return []
+        p_dist = hamming(hashes[0], np.uint64(phash))
+        d_dist = hamming(hashes[1], np.uint64(dhash))
+        total = p_dist + d_dist  # at most 128, fits in uint8
+        hits = np.flatnonzero(total <= 2 * threshold)
+        hits = hits[np.argsort(total[hits], kind='stable')][:limit]
+        return [{**labels[i], 'distance': int(total[i]) / 2, 'phash_distance': int(p_dist[i]),
+                 'dhash_distance': int(d_dist[i])} for i in hits]
+
+
+def rank_profiles(matches: list[dict]) -> list[dict]:
+    """Candidate profiles ordered by their closest matching image, then by how many images matched."""
+    profiles = {}
+    for m in matches:
+        key = (m.get('target'), m.get('profile'))
+        entry = profiles.setdefault(key, {'target': key[0], 'profile': key[1], 'best_distance': m['distance'],
+                                          'matches': 0, 'best_path': m['path']})
+        entry['matches'] += 1
+        if m['distance'] < entry['best_distance']:
+            entry['best_distance'], entry['best_path'] = m['distance'], m['path']
+    return sorted(profiles.values(), key=lambda p: (p['best_distance'], -p['matches']))
+
+
+def media_items(data: dict, target: str) -> list[dict]:
+    """Index items for the images referenced by an Instagram data file."""
+    profile = data.get('username')
+    items = [{'path': data.get('profile_pic_path'), 'target': target, 'profile': profile,
+              'section': 'profile_pic', 'url': data.get('profile_pic_url')}]
+    for section in ('posts', 'stories', 'tagged_posts'):
+        items += [{'path': e.get('media_path'), 'target': target, 'profile': profile,
+                   'section': section, 'url': e.get('url')} for e in data.get(section, [])]
+    for hl in data.get('highlights', []):
+        items += [{'path': e.get('media_path'), 'target': target, 'profile': profile,
+                   'section': 'highlights', 'url': e.get('url')} for e in hl.get('items', [])]
+    return items
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> HashIndex:
+    """Return the process-wide image hash index, loading it on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = HashIndex()
+        return _index
+
+
+def match_image(image_path: str, instagram_path: str | None, target: str, output_path: str,
+                threshold: int = THRESHOLD) -> list[dict]:
+    """
+    Index the target's downloaded media, then rank indexed profiles by visual match to `image_path`.
+    Without a query image an empty result file is written. Returns None when matching failed.
+    """
+    index = get_index()
+    try:
+        if instagram_path and os.path.exists(instagram_path):
+            with open(instagram_path, 'r', encoding='utf-8') as f:
+                added = index.add(media_items(json.load(f), target))
+            console.print(f"[cyan]Image index: {added} new images, {len(index)} total[/]")
+        if image_path:
+            phash, dhash = image_hashes(image_path)
+    except ImportError:
+        console.print("[bold red]Error: Pillow is not installed; image matching skipped.[/bold red]")
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        console.print(f"[bold red]Image matching failed:[/] {e}")
+        return None
+
+    matches = index.search(phash, dhash, threshold) if image_path else []
+    ranked = rank_profiles(matches)
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({'image': image_path, 'threshold': threshold, 'profiles': ranked, 'matches': matches}, f, indent=4)
+    console.print(f"[bold green]{len(matches)} matching images across {len(ranked)} profiles saved to {output_path}[/]")
+    return ranked
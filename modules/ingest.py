@@ -0,0 +1,138 @@
+# modules/ingest.py
+"""
+Streaming JSON / NDJSON Ingestion for ShadowRecon
+
+- Detects the format from the first bytes of the file instead of trying a full
+  json.loads and re-parsing line by line when that fails
+- NDJSON (Maigret reports) and JSON arrays (bing_result.json) are yielded record
+  by record from a generator, so memory stays flat however large the report is
+- Uses orjson for NDJSON lines when it is installed
+- A single top-level object (old Maigret dict reports) is returned as a dict;
+  iter_records() treats it as one record (a one-line NDJSON report)
+"""
+import json
+from rich.console import Console
+
+try:
+    import orjson
+    _loads = orjson.loads
+    _DecodeError = orjson.JSONDecodeError
+except ImportError:
+    orjson = None
+    _loads = json.loads
+    _DecodeError = json.JSONDecodeError
+
+console = Console()
+
+CHUNK_SIZE = 1 << 16
+
+
+def detect_format(path: str) -> str:
+    """'ndjson', 'array', 'object' or 'empty', from the first non-blank bytes of the file."""
+    with open(path, 'rb') as f:
+        head = f.read(CHUNK_SIZE)
+        while head and not head.strip():
+            head = f.read(CHUNK_SIZE)
+        head = head.lstrip()
+        if not head:
+            return 'empty'
+        if head[:1] == b'[':
+            return 'array'
+        if head[:1] != b'{':
+            return 'ndjson'
+        # an object that is complete on its first line and followed by another line is the
+        # first NDJSON record; a lone object (even a compact one-line report) is an object
+        while b'\n' not in head:
+            more = f.read(CHUNK_SIZE)
+            if not more:
+                break
+            head += more
+        line, _, rest = head.partition(b'\n')
+        try:
+            _loads(line)
+        except (_DecodeError, ValueError):
+            return 'object'
+        while not rest.strip():
+            rest = f.read(CHUNK_SIZE)
+            if not rest:
+                return 'object'
+        return 'ndjson'
+
+
+def iter_ndjson(path: str):
+    with open(path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield _loads(line)
+            except (_DecodeError, ValueError):
+                console.print(f"[red]Invalid NDJSON line, skipping: {line[:200]!r}[/]")
+
+
+def iter_array(path: str):
+    """Yield the elements of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = f.read(CHUNK_SIZE).lstrip()[1:]  # drop the opening '['
+        pos = 0
+        eof = False
+        while True:
+            # skip separators between elements
+            while True:
+                while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(buf) or eof:
+                    break
+                buf, pos = f.read(CHUNK_SIZE), 0
+                eof = not buf
+            if pos >= len(buf) or buf[pos] == ']':
+                return
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    console.print("[red]Truncated JSON array, stopping early.[/]")
+                    return
+                more = f.read(CHUNK_SIZE)
+                eof = not more
+                buf, pos = buf[pos:] + more, 0
+                continue
+            # a number at the end of the buffer may continue in the next chunk
+            if end == len(buf) and not eof and not isinstance(record, (dict, list, str)):
+                more = f.read(CHUNK_SIZE)
+                eof = not more
+                buf, pos = buf[pos:] + more, 0
+                continue
+            yield record
+            pos = end
+            if pos > CHUNK_SIZE:
+                buf, pos = buf[pos:], 0
+
+
+def load_stream(path: str):
+    """
+    Open a JSON/NDJSON report lazily: a generator of records for NDJSON and arrays,
+    a dict for a single top-level object, [] when the file is missing, empty or unreadable.
+    """
+    try:
+        fmt = detect_format(path)
+        if fmt == 'ndjson':
+            return iter_ndjson(path)
+        if fmt == 'array':
+            return iter_array(path)
+        if fmt == 'object':
+            with open(path, 'rb') as f:
+                return _loads(f.read())
+    except Exception as e:
+        console.print(f"[bold red]Failed to load {path}:[/] {e}")
+    return []
+
+
+def iter_records(path: str):
+    """Records of an NDJSON/array report; a lone top-level object counts as one record."""
+    data = load_stream(path)
+    if isinstance(data, dict):
+        return iter([data])
+    return data
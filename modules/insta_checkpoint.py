@@ -0,0 +1,111 @@
+# modules/insta_checkpoint.py
+"""
+Instagram Checkpoint Store for ShadowRecon
+
+- One checkpoint file per username: output/insta/<username>/checkpoint.json
+- Records per section the newest shortcode/timestamp seen and the frozen
+  Instaloader cursors of walks that were interrupted
+- walk_section() walks a newest-first NodeIterator and stops at the first item
+  already collected, then finishes any interrupted walk from its saved cursor
+- A crash mid-walk saves the current cursor, so the next run resumes instead of starting over
+"""
+import os
+import re
+import json
+import time
+
+CHECKPOINT_EVERY = 10
+
+SHORTCODE = re.compile(r'/p/([^/?#]+)')
+
+
+def checkpoint_path(username: str) -> str:
+    return f"output/insta/{username}/checkpoint.json"
+
+
+def load_checkpoint(username: str) -> dict:
+    try:
+        with open(checkpoint_path(username), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_checkpoint(username: str, state: dict):
+    """Write the checkpoint atomically so a crash never leaves half a file."""
+    path = checkpoint_path(username)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    state['updated'] = time.time()
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=4)
+    os.replace(path + '.tmp', path)
+
+
+def load_previous(output_file: str, username: str) -> dict | None:
+    """Output of an earlier run for the same username, to merge new items into."""
+    try:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return data if data.get('username') == username else None
+
+
+def entry_shortcode(entry: dict) -> str | None:
+    if entry.get('shortcode'):
+        return entry['shortcode']
+    match = SHORTCODE.search(entry.get('url', ''))
+    return match.group(1) if match else None
+
+
+def walk_section(state: dict, make_iterator, known: set, handle, save):
+    """
+    Collect the unknown items of a newest-first NodeIterator section.
+
+    state        - this section's checkpoint dict (cursors, newest_shortcode, newest_timestamp)
+    make_iterator- returns a fresh NodeIterator (e.g. profile.get_posts)
+    known        - shortcodes already collected; updated in place
+    handle(post) - processes a new item
+    save()       - persists data and checkpoint; called every CHECKPOINT_EVERY items
+    """
+    from instaloader import FrozenNodeIterator
+
+    # None is a fresh walk from the top; the rest are interrupted walks to finish
+    remaining = [None] + state.get('cursors', [])
+    while remaining:
+        cursor = remaining.pop(0)
+        iterator = make_iterator()
+        resumed = False
+        if cursor is not None:
+            try:
+                iterator.thaw(FrozenNodeIterator(**cursor))
+                resumed = True
+            except Exception:
+                # stale cursor: walk from the top again, stepping over known items
+                iterator = make_iterator()
+        seen_new = False
+        count = 0
+        try:
+            for post in iterator:
+                if post.shortcode in known:
+                    # a resumed walk re-yields the item it stopped on; only stop after new items
+                    if cursor is None or (resumed and seen_new):
+                        break
+                    continue
+                seen_new = True
+                handle(post)
+                known.add(post.shortcode)
+                timestamp = str(post.date_utc)
+                if timestamp > state.get('newest_timestamp', ''):
+                    state['newest_timestamp'] = timestamp
+                    state['newest_shortcode'] = post.shortcode
+                count += 1
+                if count % CHECKPOINT_EVERY == 0:
+                    state['cursors'] = [iterator.freeze()._asdict()] + remaining
+                    save()
+        except BaseException:
+            state['cursors'] = [iterator.freeze()._asdict()] + remaining
+            save()
+            raise
+        state['cursors'] = list(remaining)
+        save()
@@ -11,26 +11,43 @@ Instaloader Extractor Module for ShadowRecon
   * Story highlights media (login only)
   * Stories media (login only)
   * Tagged posts media (login only)
-- Sleeps between requests to avoid rate limits
-- Saves all data and file paths to JSON
+- Media is downloaded in the background by modules/media_downloader.py
+  (pooled, content-addressed, resumable) while metadata is walked
+- Incremental: reruns stop at already collected posts and merge new items into the
+  existing output; progress is checkpointed (modules/insta_checkpoint.py) so a crash resumes
+- Requests are paced by the adaptive scheduler in modules/insta_scheduler.py
+  (separate API and CDN budgets, backoff on 429/403) instead of fixed sleeps
+- Checkpoints upsert rows in the SQLite result store (modules/result_store.py);
+  the JSON output file is written once at the end
 """
-import os
 import re
 import json
-import time
 from getpass import getpass
 from urllib.parse import urlparse
-import requests
 import instaloader
-from IPython.utils.timing import timings_out
 from rich.prompt import Prompt
 from rich.console import Console
-import random
+import threading
+from modules.media_downloader import MediaDownloader
+from modules.insta_scheduler import get_scheduler, rate_controller_factory
+from modules.insta_checkpoint import load_checkpoint, save_checkpoint, load_previous, entry_shortcode, walk_section
+from modules.result_store import get_store, write_json
 
 
 
 console = Console()
-L = instaloader.Instaloader(sleep=True)
+# Instaloader instance, created on first use by get_loader()
+L = None
+# Shared media downloader, created on first use by get_downloader()
+downloader = None
+_downloader_lock = threading.Lock()
+
+
+def get_loader() -> instaloader.Instaloader:
+    global L
+    if L is None:
+        L = instaloader.Instaloader(sleep=True, rate_controller=rate_controller_factory(get_scheduler()))
+    return L
 
 
 def login_prompt():
@@ -39,7 +56,7 @@ def login_prompt():
         user = Prompt.ask("Enter your IG login username")
         pwd = getpass("Enter your IG password: ")
         try:
-            L.login(user, pwd)
+            get_loader().login(user, pwd)
             console.print("[green]Logged in successfully.[/]")
         except Exception as e:
             console.print(f"[red]Login failed: {e}[/]")
@@ -70,33 +87,64 @@ def load_refined_targets(path: str) -> dict:
     return {}
 
 
+def get_downloader() -> MediaDownloader:
+    global downloader
+    with _downloader_lock:
+        if downloader is None:
+            scheduler = get_scheduler()
+            downloader = MediaDownloader(before_request=lambda: scheduler.wait('cdn'),
+                                         after_response=lambda status: scheduler.record('cdn', status))
+    return downloader
+
+
 def download_url(url: str, dest_folder: str) -> str:
     """Download a media URL to dest_folder and return file path."""
-    try:
-        os.makedirs(dest_folder, exist_ok=True)
-        resp = requests.get(url, stream=True)
-        if resp.status_code == 200:
-            filename = os.path.join(dest_folder, os.path.basename(urlparse(url).path))
-            with open(filename, 'wb') as f:
-                for chunk in resp.iter_content(1024):
-                    f.write(chunk)
-            return filename
+    return get_downloader().download(url, dest_folder)
+
+
+def queue_download(entry: dict, url: str, dest_folder: str, pending: list):
+    """Start downloading in the background; `entry['media_path']` is filled in by finish_downloads."""
+    pending.append((entry, get_downloader().submit(url, dest_folder)))
+
+
+def finish_downloads(pending: list):
+    """Wait for queued downloads and write their paths into the entries."""
+    for entry, future in pending:
+        entry['media_path'] = future.result()
+    pending.clear()
+
+
+def collect_downloads(pending: list):
+    """Write the paths of finished downloads into their entries without waiting for the rest."""
+    running = []
+    for entry, future in pending:
+        if future.done():
+            entry['media_path'] = future.result()
         else:
-            console.print(f"[yellow]Warning: {resp.status_code} downloading {url}[/]")
-    except Exception as e:
-        console.print(f"[red]Failed to download {url}: {e}[/]")
-    return ''
+            running.append((entry, future))
+    pending[:] = running
 
 
-def extract_instagram_data(target_username: str, output_file: str):
+def note_api_error(e: Exception):
+    """Let the scheduler back off when Instagram refuses a query (403/401 surface as exceptions)."""
+    if isinstance(e, (instaloader.exceptions.QueryReturnedForbiddenException,
+                      instaloader.exceptions.TooManyRequestsException)) or '403' in str(e):
+        get_scheduler().record('api', 403)
+
+
+def extract_instagram_data(target_username: str, output_file: str, target: str | None = None) -> dict:
+    """Collect a profile's data and media, save it and return it ({} if the profile is unavailable)."""
+    target = target or target_username
 
     try:
-        profile = instaloader.Profile.from_username(L.context, target_username)
+        profile = instaloader.Profile.from_username(get_loader().context, target_username)
     except Exception:
         console.print(f"[red]Profile '{target_username}' not found or inaccessible.[/]")
-        return
+        return {}
 
     console.print(f"[bold cyan]Extracting Instagram data for {target_username}[/]")
+    previous = get_store().load_profile(target, 'instagram', profile.username) or \
+        load_previous(output_file, profile.username) or {}
     data = {
         'username': profile.username,
         'full_name': profile.full_name,
@@ -108,98 +156,151 @@ def extract_instagram_data(target_username: str, output_file: str):
         'is_private': profile.is_private,
         'is_verified': profile.is_verified,
         'profile_pic_url': profile.profile_pic_url,
-        'profile_pic_path': '',
-        'posts': [],
-        'stories': [],
-        'highlights': [],
-        'tagged_posts': []
+        'profile_pic_path': previous.get('profile_pic_path', ''),
+        'posts': previous.get('posts', []),
+        'stories': previous.get('stories', []),
+        'highlights': previous.get('highlights', []),
+        'tagged_posts': previous.get('tagged_posts', [])
     }
+    if previous:
+        console.print(f"[cyan]Resuming from earlier run: {len(data['posts'])} posts, "
+                      f"{len(data['tagged_posts'])} tagged posts already collected.[/]")
+    checkpoint = load_checkpoint(target_username)
 
+    pending = []
     # Download profile pic
-    data['profile_pic_path'] = download_url(profile.profile_pic_url,
-                                         f"output/insta/{target_username}/profile_pic")
+    profile_pic = get_downloader().submit(profile.profile_pic_url,
+                                          f"output/insta/{target_username}/profile_pic")
+
+    def save(final=False):
+        """
+        Persist everything collected so far together with the checkpoint. Downloads still
+        running are left in the background (their media_path is filled in later); only the
+        final save waits for them.
+        """
+        if final:
+            finish_downloads(pending)
+        else:
+            collect_downloads(pending)
+        for key in ('posts', 'tagged_posts'):
+            data[key].sort(key=lambda e: e.get('timestamp', ''), reverse=True)
+        get_store().save_profile(target, 'instagram', data)
+        save_checkpoint(target_username, checkpoint)
+
     if profile.is_private:
-        if not L.context.is_logged_in:
+        if not get_loader().context.is_logged_in:
             console.print("[red]Error: Login required to extract Instagram posts and media. Aborting.[/]")
+            data['profile_pic_path'] = profile_pic.result()
+            get_store().save_profile(target, 'instagram', data)
             save_data(data, output_file)
-            return
+            return data
 
-    # Posts metadata + media
+    # Posts metadata + media, newest first, stopping at the first post already collected
     try:
         console.print("[yellow]Fetching posts...[/]")
-        for post in profile.get_posts():
+        known = {entry_shortcode(e) for e in data['posts']}
+
+        def handle_post(post):
             entry = {'url': f"https://www.instagram.com/p/{post.shortcode}/",
+                     'shortcode': post.shortcode,
                      'timestamp': str(post.date_utc),
                      'media_path': ''}
             # Download media
             media_url = getattr(post, 'url', None) or getattr(post, 'pic_url', None)
             if media_url:
-                entry['media_path'] = download_url(media_url,
-                                                   f"output/insta/{target_username}/posts")
+                queue_download(entry, media_url, f"output/insta/{target_username}/posts", pending)
             data['posts'].append(entry)
-            time.sleep(random.uniform(5, 15))
+
+        walk_section(checkpoint.setdefault('posts', {}), profile.get_posts, known, handle_post, save)
     except Exception as e:
+        note_api_error(e)
         console.print(f"[red]Failed to fetch posts: {e}[/]")
 
     # Stories
     try:
         console.print("[yellow]Fetching stories...[/]")
-        for story in L.get_stories(userids=[profile.userid]):
+        known = {e.get('mediaid') for e in data['stories']}
+        for story in get_loader().get_stories(userids=[profile.userid]):
             for item in story.get_items():
-                path = download_url(item.url,
-                                    f"output/insta/{target_username}/stories")
-                data['stories'].append({'url': item.url,
-                                         'timestamp': str(item.date_utc),
-                                         'media_path': path})
-                time.sleep(random.uniform(5, 15))
+                if item.mediaid in known:
+                    continue
+                entry = {'url': item.url,
+                         'mediaid': item.mediaid,
+                         'timestamp': str(item.date_utc),
+                         'media_path': ''}
+                queue_download(entry, item.url, f"output/insta/{target_username}/stories", pending)
+                data['stories'].append(entry)
+            save()
     except Exception as e:
+        note_api_error(e)
         console.print(f"[red]Failed to fetch stories: {e}[/]")
 
     # Highlights
     try:
         console.print("[yellow]Fetching highlights...[/]")
+        by_title = {hl['title']: hl for hl in data['highlights']}
         for hl in profile.get_highlights():
-            hl_entry = {'title': hl.title, 'items': []}
+            hl_entry = by_title.get(hl.title)
+            if hl_entry is None:
+                hl_entry = by_title[hl.title] = {'title': hl.title, 'items': []}
+                data['highlights'].append(hl_entry)
+            known = {e.get('mediaid') for e in hl_entry['items']}
             for item in hl.get_items():
-                path = download_url(item.url,
-                                    f"output/insta/{target_username}/highlights/{hl.title}")
-                hl_entry['items'].append({'url': item.url,
-                                          'timestamp': str(item.date_utc),
-                                          'media_path': path})
-                time.sleep(random.uniform(5, 15))
-            data['highlights'].append(hl_entry)
+                if item.mediaid in known:
+                    continue
+                entry = {'url': item.url,
+                         'mediaid': item.mediaid,
+                         'timestamp': str(item.date_utc),
+                         'media_path': ''}
+                queue_download(entry, item.url, f"output/insta/{target_username}/highlights/{hl.title}", pending)
+                hl_entry['items'].append(entry)
+            save()
     except Exception as e:
+        note_api_error(e)
         console.print(f"[red]Failed to fetch Highlights: {e}[/]")
 
     # Tagged posts
     try:
         console.print("[yellow]Fetching tagged posts...[/]")
-        for tagged in profile.get_tagged_posts():
-            post_url = f"https://www.instagram.com/p/{tagged.shortcode}/"
-            path = download_url(tagged.url,
-                                f"output/insta/{target_username}/tagged_posts")
-            data['tagged_posts'].append({'url': post_url,
-                                          'timestamp': str(tagged.date_utc),
-                                          'media_path': path})
-            time.sleep(random.uniform(5, 15))
-        save_data(data,output_file)
+        known = {entry_shortcode(e) for e in data['tagged_posts']}
+
+        def handle_tagged(tagged):
+            entry = {'url': f"https://www.instagram.com/p/{tagged.shortcode}/",
+                     'shortcode': tagged.shortcode,
+                     'timestamp': str(tagged.date_utc),
+                     'media_path': ''}
+            queue_download(entry, tagged.url, f"output/insta/{target_username}/tagged_posts", pending)
+            data['tagged_posts'].append(entry)
+
+        walk_section(checkpoint.setdefault('tagged_posts', {}), profile.get_tagged_posts, known, handle_tagged, save)
     except Exception as e:
+        note_api_error(e)
         console.print(f"[red]Failed to fetch Tagged posts: {e}[/]")
 
     # Save to JSON
-def save_data(data,output_file:str):
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4)
-    console.print(f"[green]Saved Instagram data and media paths to {output_file}[/]")
+    data['profile_pic_path'] = profile_pic.result() or data['profile_pic_path']
+    save(final=True)
+    save_data(data, output_file)
+    for budget, st in get_scheduler().stats().items():
+        console.print(f"[cyan]Instagram {budget}: {st['rate']:.2f} req/s now, {st['requests']} requests, "
+                      f"{st['throttled']} throttled, {st['total_wait']:.1f}s waited[/]")
+    return data
+
+
+def save_data(data,output_file:str,quiet=False):
+    write_json(output_file, data)
+    if not quiet:
+        console.print(f"[green]Saved Instagram data and media paths to {output_file}[/]")
 
 
-def run_instagram_extraction(refined_json='output/target/refined_targets.json', username=None, output_file=None):
-    login_prompt()
+def run_instagram_extraction(refined_json='output/target/refined_targets.json', username=None, output_file=None, prompt_login=True):
+    if prompt_login:
+        login_prompt()
     refined = load_refined_targets(refined_json)
     target =  refined.get('username') or  username or Prompt.ask("Instagram username (fallback to target)")
     out_file = output_file or f"output/insta/{target}_insta.json"
-    extract_instagram_data(target, out_file)
+    # results are stored under the recon target the username was found for
+    return extract_instagram_data(target, out_file, target=username)
 
 # CLI mode
 if __name__ == '__main__':
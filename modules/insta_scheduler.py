@@ -0,0 +1,116 @@
+# modules/insta_scheduler.py
+"""
+Adaptive Instagram Rate-Limit Scheduler for ShadowRecon
+
+- One scheduler shared by every Instagram call, with separate budgets for
+  API queries ("api") and CDN media downloads ("cdn")
+- Each budget spaces requests by an interval that shrinks gradually after
+  successes and doubles on 429/403, with an exponential, jittered pause
+- Hooks into Instaloader through a custom RateController, and into the media
+  downloader through before_request/after_response
+- stats() exposes the current rate, total time waited and throttle counts; waits and
+  throttles are also counted in modules/telemetry.py
+"""
+import time
+import random
+import threading
+from modules import telemetry
+
+# seconds between requests: start, floor, ceiling; and the base pause after a 429/403
+DEFAULT_BUDGETS = {
+    'api': {'interval': 4.0, 'min_interval': 1.5, 'max_interval': 120.0, 'backoff_base': 30.0},
+    'cdn': {'interval': 0.2, 'min_interval': 0.05, 'max_interval': 30.0, 'backoff_base': 5.0},
+}
+RECOVERY = 0.95        # interval multiplier after a success
+CALM_STREAK = 10       # successes in a row before the backoff level drops by one
+MAX_BACKOFF = 15 * 60  # longest single pause
+THROTTLE_STATUSES = (429, 403)
+
+
+class AdaptiveScheduler:
+    def __init__(self, budgets: dict | None = None):
+        self.lock = threading.Lock()
+        self.budgets = {}
+        for name, cfg in (budgets or DEFAULT_BUDGETS).items():
+            self.budgets[name] = {**cfg, 'next_time': 0.0, 'level': 0, 'streak': 0,
+                                  'total_wait': 0.0, 'requests': 0, 'throttled': 0}
+
+    def wait(self, budget: str) -> float:
+        """Block until the budget allows another request; returns the time slept."""
+        b = self.budgets[budget]
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, b['next_time'])
+            b['next_time'] = start + b['interval']
+            b['requests'] += 1
+            delay = start - now
+            b['total_wait'] += delay
+        if delay > 0:
+            telemetry.inc('rate_limit_wait_seconds_total', delay, limiter=f"instagram_{budget}")
+            time.sleep(delay)
+        return delay
+
+    def record(self, budget: str, status: int):
+        """Feed back a response status: speed up gradually on success, back off on 429/403."""
+        b = self.budgets[budget]
+        with self.lock:
+            if status in THROTTLE_STATUSES:
+                telemetry.inc('throttled_total', budget=budget, status=status)
+                b['throttled'] += 1
+                b['streak'] = 0
+                b['level'] += 1
+                b['interval'] = min(b['max_interval'], b['interval'] * 2)
+                pause = min(MAX_BACKOFF, b['backoff_base'] * 2 ** (b['level'] - 1))
+                pause *= random.uniform(0.5, 1.5)
+                b['next_time'] = max(b['next_time'], time.monotonic() + pause)
+            elif 200 <= status < 400:
+                b['interval'] = max(b['min_interval'], b['interval'] * RECOVERY)
+                b['streak'] += 1
+                if b['streak'] >= CALM_STREAK and b['level']:
+                    b['level'] -= 1
+                    b['streak'] = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {name: {'rate': 1 / b['interval'], 'interval': b['interval'],
+                           'total_wait': b['total_wait'], 'requests': b['requests'],
+                           'throttled': b['throttled']}
+                    for name, b in self.budgets.items()}
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> AdaptiveScheduler:
+    """Return the process-wide scheduler shared by all Instagram calls."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = AdaptiveScheduler()
+        return _scheduler
+
+
+def rate_controller_factory(scheduler: AdaptiveScheduler):
+    """Factory for Instaloader's `rate_controller` argument that routes API queries through `scheduler`."""
+    import instaloader
+
+    class SchedulerRateController(instaloader.RateController):
+        def __init__(self, context):
+            super().__init__(context)
+            self.queried = False
+            self.throttled = False
+
+        def wait_before_query(self, query_type: str) -> None:
+            # no 429 since the previous query means it went through
+            if self.queried and not self.throttled:
+                scheduler.record('api', 200)
+            self.queried = True
+            self.throttled = False
+            scheduler.wait('api')
+
+        def handle_429(self, query_type: str) -> None:
+            self.throttled = True
+            scheduler.record('api', 429)
+
+    return SchedulerRateController
@@ -1,37 +1,260 @@
-
-
 import os
+import re
+import time
 import subprocess
 import json
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from rich.console import Console
+from modules import maigret_cache, telemetry
 
 console = Console()
 
-def run_maigret(username):
-    os.makedirs(f"output/{username}", exist_ok=True)
+# "[+] Instagram: https://www.instagram.com/johndoe" printed by Maigret as each site is confirmed
+CLAIMED_LINE = re.compile(r'^\[\+\]\s+([^:]+?):\s+(\S+)')
 
+# Maigret child processes allowed at once across all targets and usernames
+MAX_PROCESSES = 4
+_process_slots = threading.BoundedSemaphore(MAX_PROCESSES)
 
-    console.print(f"[yellow]Running Maigret for username: [bold]{username}[/bold]...\n")
 
-    try:
-        result=subprocess.run([
-            "maigret",username,"-J","ndjson","-fo",f"output/{username}","--timeout","20"
-        ],capture_output=True,text=True)
+def set_max_processes(count: int):
+    """Resize the process budget. Call before any Maigret run starts."""
+    global MAX_PROCESSES, _process_slots
+    MAX_PROCESSES = max(1, count)
+    _process_slots = threading.BoundedSemaphore(MAX_PROCESSES)
+
+
+def parse_claimed_line(line: str, username: str) -> dict | None:
+    """Turn a Maigret progress line into a record shaped like its NDJSON report entries."""
+    match = CLAIMED_LINE.match(line.strip())
+    if not match:
+        return None
+    site, url = match.groups()
+    return {
+        'username': username,
+        'site': {'name': site},
+        'status': {'username': username, 'site_name': site, 'status': 'Claimed', 'url': url},
+    }
+
 
-        if result.returncode != 0:
-            console.print(f"[bold red]Maigret failed:[/bold red] {result.stderr}")
-            return {}
+def emit(record: dict, rules, on_record=None, live_results=None) -> bool:
+    """Filter a claimed record and hand it to the live consumers. Returns False if it was blocked."""
+    rule = rules.check(record['status']['url'])
+    if rule['blocked']:
+        return False
+    record['platform'] = rule['platform'] or record['status']['site_name']
+    record['canonical_url'] = rule['canonical']
+    console.print(f"[green]\\[live][/] {record['platform']}: {record['status']['url']}")
+    if on_record:
+        on_record(record)
+    if live_results is not None:
+        live_results.put(record)
+    return True
 
 
+def run_maigret(username, on_record=None, live_results=None, extra_args=(), output_dir=None):
+    """
+    Run Maigret as a streamed child process.
 
-        # return maigret_data
+    Every claimed site is parsed from Maigret's output as soon as it is printed, passed
+    through the link filter and handed to `on_record(record)` and `live_results.put(record)`.
+    Maigret still writes report_<username>_ndjson.json itself when it finishes.
+    `extra_args` are appended to the Maigret command line (e.g. --site filters).
+    The report goes to `output_dir` (output/<username> by default).
+    Returns the streamed records, or [] when Maigret is missing or exits with an error
+    (records already streamed to `on_record`/`live_results` stay delivered).
+    """
+    output_dir = output_dir or f"output/{username}"
+    os.makedirs(output_dir, exist_ok=True)
+    from modules.filter_links import RULES
 
+    console.print(f"[yellow]Running Maigret for username: [bold]{username}[/bold]...\n")
+
+    records = []
+    tail = deque(maxlen=20)
+    slots = _process_slots
+    slots.acquire()
+    start = time.perf_counter()
+    try:
+        proc = subprocess.Popen([
+            "maigret",username,"-J","ndjson","-fo",output_dir,"--timeout","20",
+            "--no-color","--no-progressbar",*extra_args
+        ],stdout=subprocess.PIPE,stderr=subprocess.STDOUT,text=True,bufsize=1)
+
+        with proc.stdout:
+            for line in proc.stdout:
+                tail.append(line.rstrip())
+                record = parse_claimed_line(line, username)
+                if record and emit(record, RULES, on_record, live_results):
+                    records.append(record)
+
+        if proc.wait() != 0:
+            console.print("[bold red]Maigret failed:[/bold red] " + "\n".join(tail))
+            return []
     except FileNotFoundError:
         console.print("[bold red]Error: Maigret is not installed or not in PATH.[/bold red]")
-        return {}
-    except json.decoder.JSONDecodeError:
-        console.print("[bold red]Error: Failed to decode Maigret JSON output.[/bold red]")
-        return {}
+        return []
+    finally:
+        slots.release()
+        telemetry.observe('maigret_seconds', time.perf_counter() - start)
+        if live_results is not None:
+            live_results.put(None)  # end of stream
+    return records
+
+
+def run_maigret_cached(username, ttl=maigret_cache.DEFAULT_TTL, revalidate=False, use_cache=True,
+                       on_record=None, live_results=None, output_dir=None) -> dict:
+    """
+    Run Maigret through the per-username result cache and return what happened:
+    {'cache': 'hit' | 'revalidated' | 'miss' | 'off', 'age': seconds, 'saved_seconds': seconds,
+     'failed': bool, 'records': [...]}. A run is failed when Maigret wrote no report.
+    """
+    from modules.filter_links import RULES
+    from modules.ingest import iter_records
+    output_dir = output_dir or f"output/{username}"
+    report_path = f"{output_dir}/report_{username}_ndjson.json"
+    meta = maigret_cache.load_meta(username) if use_cache else None
 
+    if meta and meta['age'] < ttl:
+        console.print(f"[cyan]Maigret cache hit for {username} ({meta['age'] / 3600:.1f}h old)[/]")
+        maigret_cache.restore(username, report_path)
+        records = []
+        try:
+            for record in iter_records(report_path):
+                status = record.get('status') or {}
+                if status.get('status') == 'Claimed' and status.get('url') and \
+                        emit(record, RULES, on_record, live_results):
+                    records.append(record)
+        finally:
+            if live_results is not None:
+                live_results.put(None)
+        telemetry.inc('maigret_cache_total', result='hit')
+        return {'cache': 'hit', 'age': meta['age'], 'saved_seconds': meta['full_duration'], 'failed': False,
+                'records': records}
 
+    start = time.perf_counter()
+    previous_mtime = os.path.getmtime(report_path) if os.path.exists(report_path) else None
+
+    def fresh_report():
+        # file timestamps are too coarse to compare against the start time
+        return os.path.exists(report_path) and os.path.getmtime(report_path) != previous_mtime
+
+    if meta and revalidate:
+        sites = maigret_cache.claimed_sites(username)
+        console.print(f"[cyan]Maigret cache for {username} expired; re-checking {len(sites)} claimed sites[/]")
+        if sites:
+            extra = [arg for site in sites for arg in ("--site", site)]
+            records = run_maigret(username, on_record, live_results, extra_args=extra, output_dir=output_dir)
+        else:
+            records = []
+            if live_results is not None:
+                live_results.put(None)
+        duration = time.perf_counter() - start
+        failed = bool(sites) and not fresh_report()
+        if fresh_report():
+            maigret_cache.store(username, report_path, duration, full_run=False)
+        else:
+            # nothing to re-check or Maigret failed: keep serving the cached report; the
+            # cache meta is left as it is, so a failed re-check is retried next run
+            maigret_cache.restore(username, report_path)
+        telemetry.inc('maigret_cache_total', result='revalidated')
+        return {'cache': 'revalidated', 'age': meta['age'],
+                'saved_seconds': max(0.0, meta['full_duration'] - duration), 'failed': failed, 'records': records}
+
+    records = run_maigret(username, on_record, live_results, output_dir=output_dir)
+    duration = time.perf_counter() - start
+    failed = not fresh_report()
+    if use_cache and not failed:
+        maigret_cache.store(username, report_path, duration, full_run=True)
+    telemetry.inc('maigret_cache_total', result='miss' if use_cache else 'off')
+    return {'cache': 'miss' if use_cache else 'off', 'age': 0.0, 'saved_seconds': 0.0, 'failed': failed,
+            'records': records}
+
+
+def merge_reports(reports: list[tuple[str, str]], output_path: str) -> list[dict]:
+    """
+    Merge the NDJSON reports of several usernames into one report of Claimed, non-blocked
+    sites, deduplicated on the canonical URL. Every record gets `found_by`, the usernames
+    that found it, in the order `reports` lists them.
+    """
+    from modules.filter_links import RULES
+    from modules.ingest import iter_records
+    merged = {}
+    for username, path in reports:
+        if not os.path.exists(path):
+            continue
+        for record in iter_records(path):
+            status = record.get('status') or {}
+            url = status.get('url')
+            if status.get('status') != 'Claimed' or not url:
+                continue
+            rule = RULES.check(url)
+            if rule['blocked']:
+                continue
+            if rule['canonical'] in merged:
+                found_by = merged[rule['canonical']]['found_by']
+                if username not in found_by:
+                    found_by.append(username)
+                continue
+            record['canonical_url'] = rule['canonical']
+            record['found_by'] = [username]
+            merged[rule['canonical']] = record
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    tmp = output_path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for record in merged.values():
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp, output_path)
+    return list(merged.values())
+
+
+def run_maigret_multi(target, usernames, ttl=maigret_cache.DEFAULT_TTL, revalidate=False, use_cache=True,
+                      live_results=None) -> dict:
+    """
+    Run Maigret for every username concurrently (within the process budget) and merge the
+    results into output/<target>/report_<target>_ndjson.json.
+
+    Each site is streamed to `live_results` once, the first time any username finds it,
+    with `found_by` set to that username. Returns
+    {'usernames': {username: cache status}, 'ages': {username: cache age in seconds},
+     'found': {username: claimed count}, 'saved_seconds': seconds, 'failed': [usernames Maigret failed for],
+     'records': [...]}.
+    """
+    out_dir = f"output/{target}"
+    seen = set()
+    lock = threading.Lock()
+
+    def forward(username):
+        def on_record(record):
+            with lock:
+                if record['canonical_url'] in seen:
+                    return
+                seen.add(record['canonical_url'])
+            record['found_by'] = [username]
+            if live_results is not None:
+                live_results.put(record)
+        return on_record
+
+    def run(username):
+        return run_maigret_cached(username, ttl=ttl, revalidate=revalidate, use_cache=use_cache,
+                                  on_record=forward(username), output_dir=f"{out_dir}/maigret/{username}")
+
+    console.print(f"[yellow]Checking {len(usernames)} username(s) for {target}: [bold]{', '.join(usernames)}[/bold][/]")
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(len(usernames), MAX_PROCESSES))) as pool:
+            results = dict(zip(usernames, pool.map(run, usernames)))
+    finally:
+        if live_results is not None:
+            live_results.put(None)  # end of stream
 
+    reports = [(u, f"{out_dir}/maigret/{u}/report_{u}_ndjson.json") for u in usernames]
+    records = merge_reports(reports, f"{out_dir}/report_{target}_ndjson.json")
+    found = {u: sum(1 for r in records if u in r['found_by']) for u in usernames}
+    console.print(f"[green]Maigret found {len(records)} unique sites across {len(usernames)} username(s)[/]")
+    return {'usernames': {u: r['cache'] for u, r in results.items()},
+            'ages': {u: r['age'] for u, r in results.items()}, 'found': found, 'records': records,
+            'failed': [u for u, r in results.items() if r['failed']],
+            'saved_seconds': sum(r['saved_seconds'] for r in results.values())}
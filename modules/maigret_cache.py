@@ -0,0 +1,68 @@
+# modules/maigret_cache.py
+"""
+Maigret Result Cache for ShadowRecon
+
+- One entry per username under output/.cache/maigret/<username>/: a copy of
+  the NDJSON report plus meta.json (when it was checked, how long the full run took)
+- Within the TTL the cached report is reused as is
+- After the TTL a revalidation can re-check only the sites that were Claimed
+"""
+import os
+import json
+import time
+import shutil
+
+CACHE_DIR = "output/.cache/maigret"
+DEFAULT_TTL = 24 * 3600
+
+
+def entry_dir(username: str) -> str:
+    return os.path.join(CACHE_DIR, username)
+
+
+def load_meta(username: str) -> dict | None:
+    """Cache metadata for `username`, or None when there is no usable entry."""
+    try:
+        with open(os.path.join(entry_dir(username), "meta.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not os.path.exists(os.path.join(entry_dir(username), "report.json")):
+        return None
+    meta['age'] = time.time() - meta['checked_at']
+    return meta
+
+
+def claimed_sites(username: str) -> list[str]:
+    """Names of the sites the cached report lists as Claimed."""
+    from modules.ingest import iter_records
+    sites = []
+    for record in iter_records(os.path.join(entry_dir(username), "report.json")):
+        status = record.get('status') or {}
+        if status.get('status') == 'Claimed':
+            name = status.get('site_name') or (record.get('site') or {}).get('name')
+            if name:
+                sites.append(name)
+    return sites
+
+
+def store(username: str, report_path: str, duration: float, full_run: bool):
+    """Save a fresh report. `full_duration` is only replaced by full (all-sites) runs."""
+    previous = load_meta(username) or {}
+    os.makedirs(entry_dir(username), exist_ok=True)
+    shutil.copyfile(report_path, os.path.join(entry_dir(username), "report.json"))
+    meta = {
+        'username': username,
+        'checked_at': time.time(),
+        'duration': duration,
+        'full_duration': duration if full_run else previous.get('full_duration', duration),
+        'revalidated': not full_run,
+    }
+    with open(os.path.join(entry_dir(username), "meta.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=4)
+
+
+def restore(username: str, report_path: str):
+    """Copy the cached report to where the pipeline expects Maigret's output."""
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    shutil.copyfile(os.path.join(entry_dir(username), "report.json"), report_path)
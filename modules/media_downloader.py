@@ -0,0 +1,163 @@
+# modules/media_downloader.py
+"""
+Media Downloader for ShadowRecon
+
+- Media URLs are queued and fetched by a thread pool over the shared pooled session,
+  so metadata walking never waits on a transfer
+- Files are stored once by SHA-256 under output/media/<aa>/<sha256><ext>; an SQLite
+  URL -> hash index lets repeated and cross-target media skip the network entirely
+- Each download goes to a `.part` file first and resumes with a Range request if interrupted
+- The requested folder gets a hard link to the stored file so the per-target layout stays browsable
+"""
+import os
+import shutil
+import sqlite3
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from urllib.parse import urlsplit
+from rich.console import Console
+from modules import http_client, telemetry
+
+console = Console()
+
+STORE_DIR = "output/media"
+CHUNK_SIZE = 1 << 20
+TIMEOUT = (10, 60)
+
+
+def url_key(url: str) -> str:
+    """Index key for a media URL: host + path. CDN query strings are per-request signatures."""
+    parts = urlsplit(url)
+    return f"{parts.netloc.lower()}{parts.path}"
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MediaDownloader:
+    def __init__(self, store_dir: str = STORE_DIR, workers: int = 8, before_request=None, after_response=None):
+        """`before_request()` is called before every transfer and `after_response(status)` after it."""
+        self.store_dir = store_dir
+        self.before_request = before_request
+        self.after_response = after_response
+        os.makedirs(os.path.join(store_dir, "partial"), exist_ok=True)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="media")
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.stats = {'downloaded': 0, 'reused': 0, 'failed': 0, 'bytes': 0}
+        self.conn = sqlite3.connect(os.path.join(store_dir, "index.sqlite"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS media (url_key TEXT PRIMARY KEY, sha256 TEXT NOT NULL, "
+                          "path TEXT NOT NULL, size INTEGER NOT NULL)")
+        self.conn.commit()
+
+    def submit(self, url: str, dest_folder: str) -> Future:
+        """Queue a download; the future resolves to the file path in dest_folder ('' on failure)."""
+        return self.pool.submit(self._download, url, dest_folder)
+
+    def download(self, url: str, dest_folder: str) -> str:
+        return self.submit(url, dest_folder).result()
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        self.conn.close()
+
+    def _lookup(self, key: str) -> str | None:
+        with self.lock:
+            row = self.conn.execute("SELECT path FROM media WHERE url_key=?", (key,)).fetchone()
+        if row and os.path.exists(row[0]):
+            return row[0]
+        return None
+
+    def _download(self, url: str, dest_folder: str) -> str:
+        key = url_key(url)
+        # one transfer per URL even when two entries point at the same media
+        with self.lock:
+            event = self.inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self.inflight[key] = threading.Event()
+        if not owner:
+            event.wait()
+        try:
+            blob = self._lookup(key)
+            if blob:
+                with self.lock:
+                    self.stats['reused'] += 1
+                telemetry.inc('media_files_total', result='reused')
+            elif owner:
+                blob = self._fetch(url, key)
+            if not blob:
+                return ''
+            return self._place(blob, dest_folder, os.path.basename(urlsplit(url).path))
+        finally:
+            if owner:
+                with self.lock:
+                    self.inflight.pop(key, None)
+                event.set()
+
+    def _fetch(self, url: str, key: str) -> str:
+        part = os.path.join(self.store_dir, "partial", hashlib.sha256(key.encode()).hexdigest() + ".part")
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        headers = {'Range': f"bytes={offset}-"} if offset else {}
+        try:
+            if self.before_request:
+                self.before_request()
+            with http_client.get(url, stream=True, timeout=TIMEOUT, headers=headers) as resp:
+                if self.after_response:
+                    self.after_response(resp.status_code)
+                if resp.status_code == 416:
+                    pass  # the .part file already holds the whole body
+                elif resp.status_code in (200, 206):
+                    mode = 'ab' if resp.status_code == 206 else 'wb'
+                    with open(part, mode) as f:
+                        for chunk in resp.iter_content(CHUNK_SIZE):
+                            f.write(chunk)
+                            with self.lock:
+                                self.stats['bytes'] += len(chunk)
+                            telemetry.inc('media_bytes_total', len(chunk))
+                else:
+                    console.print(f"[yellow]Warning: {resp.status_code} downloading {url}[/]")
+                    with self.lock:
+                        self.stats['failed'] += 1
+                    telemetry.inc('media_files_total', result='failed')
+                    return ''
+        except Exception as e:
+            console.print(f"[red]Failed to download {url}: {e}[/]")
+            with self.lock:
+                self.stats['failed'] += 1
+            telemetry.inc('media_files_total', result='failed')
+            return ''
+
+        digest = sha256_file(part)
+        ext = os.path.splitext(urlsplit(url).path)[1]
+        blob = os.path.join(self.store_dir, digest[:2], digest + ext)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        if os.path.exists(blob):
+            os.remove(part)
+        else:
+            os.replace(part, blob)
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO media (url_key, sha256, path, size) VALUES (?, ?, ?, ?)",
+                              (key, digest, blob, os.path.getsize(blob)))
+            self.conn.commit()
+            self.stats['downloaded'] += 1
+        telemetry.inc('media_files_total', result='downloaded')
+        return blob
+
+    def _place(self, blob: str, dest_folder: str, name: str) -> str:
+        os.makedirs(dest_folder, exist_ok=True)
+        dest = os.path.join(dest_folder, name or os.path.basename(blob))
+        if os.path.exists(dest):
+            return dest
+        try:
+            os.link(blob, dest)
+        except OSError:
+            shutil.copyfile(blob, dest)
+        return dest
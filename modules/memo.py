@@ -0,0 +1,117 @@
+# modules/memo.py
+"""
+Stage Memoization for ShadowRecon
+
+- When a stage succeeds, a manifest is written to output/<target>/.manifests/<stage>.json.
+  It records a fingerprint of the stage's inputs (SHA-256 of the input files by default),
+  the parameters that affect its output, a hash of its code, and the outputs it produced
+- Before a stage runs, the last manifest is compared with the current one. If they match,
+  every output still exists and the manifest is younger than the stage's TTL (for stages
+  that fetch from the network), the stage is skipped and its outputs are reused
+- As with make, a stage that reruns but writes identical outputs does not invalidate later stages
+- Outputs are only checked for existence, not content: score rewrites refine's output in place,
+  so comparing output digests would make refine stale after every score run
+- A stage that fails, or reports its outputs as incomplete (notes['incomplete']), gets no
+  manifest and its previous one is discarded, so the next run fetches again
+- File digests are cached per (path, size, mtime), so an unchanged file is hashed once per process
+"""
+import os
+import json
+import time
+import inspect
+import hashlib
+import threading
+import importlib.util
+from rich.console import Console
+
+console = Console()
+
+MANIFEST_DIR = ".manifests"
+
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(path: str | None) -> str | None:
+    """SHA-256 of a file, or None if it does not exist."""
+    if not path or not os.path.isfile(path):
+        return None
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _digests_lock:
+        if key in _digests:
+            return _digests[key]
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    with _digests_lock:
+        _digests[key] = h.hexdigest()
+    return _digests[key]
+
+
+def code_digest(func, modules=()) -> str:
+    """Hash of a stage function's source and of the source files of the modules it relies on."""
+    h = hashlib.sha256(inspect.getsource(func).encode('utf-8'))
+    for name in modules:
+        spec = importlib.util.find_spec(name)
+        if spec and spec.origin and os.path.isfile(spec.origin):
+            h.update(name.encode('utf-8'))
+            with open(spec.origin, 'rb') as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+
+def _plain(value):
+    """JSON round trip, so tuples, paths and other values compare the same as after loading."""
+    return json.loads(json.dumps(value, sort_keys=True, default=str))
+
+
+def manifest_path(target: str, stage: str) -> str:
+    return os.path.join("output", target, MANIFEST_DIR, f"{stage}.json")
+
+
+def load(target: str, stage: str) -> dict | None:
+    try:
+        with open(manifest_path(target, stage), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def current(fingerprint: dict, params: dict, code: str) -> dict:
+    return {'fingerprint': _plain(fingerprint), 'params': _plain(params), 'code': code}
+
+
+def stale_reason(saved: dict | None, now: dict, ttl: float | None = None) -> str | None:
+    """Why the saved manifest cannot be reused for `now`, or None if its outputs can be."""
+    if not saved:
+        return "no previous run"
+    if saved.get('code') != now['code']:
+        return "code changed"
+    if saved.get('params') != now['params']:
+        return "parameters changed"
+    if saved.get('fingerprint') != now['fingerprint']:
+        return "inputs changed"
+    if ttl is not None and time.time() - saved.get('finished_at', 0) >= ttl:
+        return "expired"
+    for name, path in (saved.get('outputs') or {}).items():
+        if isinstance(path, str) and not os.path.exists(path):
+            return f"output '{name}' missing"
+    return None
+
+
+def discard(target: str, stage: str):
+    """Forget the stage's manifest, so it runs again next time."""
+    try:
+        os.remove(manifest_path(target, stage))
+    except FileNotFoundError:
+        pass
+
+
+def save(target: str, stage: str, manifest: dict, outputs: dict, notes: dict | None = None):
+    from modules.result_store import write_json
+    entry = dict(manifest, outputs=_plain(outputs), finished_at=time.time())
+    if notes:
+        entry['notes'] = _plain(notes)
+    write_json(manifest_path(target, stage), entry)
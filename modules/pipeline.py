@@ -0,0 +1,170 @@
+# modules/pipeline.py
+"""
+Stage Scheduler for ShadowRecon
+
+- Every stage declares the artifacts it needs (inputs) and the ones it produces (outputs)
+- A stage starts as soon as all of its inputs exist, so independent stages
+  (e.g. Maigret and Bing) run in parallel on a thread pool
+- A failed stage does not produce its outputs; stages depending on it are skipped
+- Stage durations and statuses also go to modules/telemetry.py; with `profile_dir`
+  every stage is run under tracemalloc, and under cProfile unless another stage holds the
+  process's one profiler
+- Prints a per-stage timing summary (stages skipped by memoization show as "reused")
+  and the critical path at the end, and can write them with any stage notes to a JSON run report
+"""
+import os
+import json
+import time
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from rich.console import Console
+from rich.table import Table
+from modules import telemetry
+
+console = Console()
+
+
+def stage(name: str, func, inputs=(), outputs=()) -> dict:
+    """
+    Describe a pipeline stage. `func(ctx)` gets the artifacts produced so far and returns a dict of
+    its outputs; an optional 'notes' entry in that dict goes to the run report instead.
+    """
+    return {'name': name, 'func': func, 'inputs': list(inputs), 'outputs': list(outputs)}
+
+
+def _run_stage(s: dict, ctx: dict, t0: float, on_event=None, profile_dir: str | None = None) -> dict:
+    started = time.perf_counter() - t0
+    if on_event:
+        on_event({'event': 'stage_started', 'stage': s['name'], 'start': started})
+    profiling = telemetry.profile_stage(s['name'], profile_dir) if profile_dir else nullcontext()
+    with profiling, telemetry.timer('stage_seconds', stage=s['name']):
+        result = dict(s['func'](ctx) or {})
+    finished = time.perf_counter() - t0
+    return {'start': started, 'end': finished, 'notes': result.pop('notes', None), 'outputs': result}
+
+
+def run_stages(stages: list[dict], context: dict | None = None, max_workers: int = 4,
+               report_path: str | None = None, on_event=None, profile_dir: str | None = None) -> dict:
+    """
+    Run stages as a DAG and return the final artifact context. Writes a JSON run report to
+    `report_path` if given. `on_event(dict)` is called as stages start, finish, fail or are skipped.
+    With `profile_dir`, an allocation summary of every stage (and a cProfile dump of those not
+    overlapping another profiled stage) is saved there.
+    """
+    context = dict(context or {})
+    producers = {out: s['name'] for s in stages for out in s['outputs']}
+    for s in stages:
+        for inp in s['inputs']:
+            if inp not in producers and inp not in context:
+                raise ValueError(f"Stage '{s['name']}' needs '{inp}' but no stage produces it")
+
+    pending = list(stages)
+    running = {}
+    timings = {}
+    t0 = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for s in [s for s in pending if all(i in context for i in s['inputs'])]:
+                pending.remove(s)
+                running[pool.submit(_run_stage, s, dict(context), t0, on_event, profile_dir)] = s
+
+            if not running:
+                # Whatever is left waits on a stage that failed
+                for s in pending:
+                    timings[s['name']] = {'status': 'skipped'}
+                    telemetry.inc('stage_runs_total', stage=s['name'], status='skipped')
+                    console.print(f"[yellow]Skipping stage '{s['name']}': missing inputs.[/]")
+                    if on_event:
+                        on_event({'event': 'stage_skipped', 'stage': s['name']})
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                s = running.pop(fut)
+                try:
+                    res = fut.result()
+                except Exception as e:
+                    timings[s['name']] = {'status': 'failed', 'end': time.perf_counter() - t0}
+                    telemetry.inc('stage_runs_total', stage=s['name'], status='failed')
+                    console.print(f"[bold red]Stage '{s['name']}' failed:[/] {e}")
+                    if on_event:
+                        on_event({'event': 'stage_failed', 'stage': s['name'], 'error': str(e)})
+                    continue
+                for out in s['outputs']:
+                    context[out] = res['outputs'].get(out)
+                timings[s['name']] = {'status': 'ok', 'start': res['start'], 'end': res['end']}
+                if res['notes']:
+                    timings[s['name']]['notes'] = res['notes']
+                reused = bool((res['notes'] or {}).get('reused'))
+                telemetry.inc('stage_runs_total', stage=s['name'], status='reused' if reused else 'ok')
+                if on_event:
+                    on_event({'event': 'stage_finished', 'stage': s['name'], **timings[s['name']],
+                              'outputs': {out: context[out] for out in s['outputs']}})
+
+    total = time.perf_counter() - t0
+    print_timings(stages, timings, producers, total)
+    if report_path:
+        write_report(report_path, stages, timings, producers, total)
+    return context
+
+
+def write_report(path: str, stages: list[dict], timings: dict, producers: dict, total: float):
+    """Save stage timings, statuses, notes and the critical path as JSON."""
+    report = {
+        'finished_at': time.time(),
+        'total_seconds': total,
+        'critical_path': critical_path(stages, timings, producers),
+        'stages': {},
+    }
+    for s in stages:
+        t = timings.get(s['name'], {'status': 'skipped'})
+        entry = {'status': t['status']}
+        if t['status'] == 'ok':
+            entry.update(start=t['start'], end=t['end'], duration=t['end'] - t['start'])
+        if t.get('notes'):
+            entry['notes'] = t['notes']
+        report['stages'][s['name']] = entry
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+
+
+def critical_path(stages: list[dict], timings: dict, producers: dict) -> list[str]:
+    """Walk back from the last finishing stage through the input producer that finished last."""
+    by_name = {s['name']: s for s in stages}
+    finished = [n for n, t in timings.items() if t.get('status') == 'ok']
+    if not finished:
+        return []
+    path = [max(finished, key=lambda n: timings[n]['end'])]
+    while True:
+        deps = {producers[i] for i in by_name[path[-1]]['inputs'] if i in producers}
+        deps = [d for d in deps if timings.get(d, {}).get('status') == 'ok']
+        if not deps:
+            break
+        path.append(max(deps, key=lambda n: timings[n]['end']))
+    return list(reversed(path))
+
+
+def print_timings(stages: list[dict], timings: dict, producers: dict, total: float):
+    """Print the per-stage timing summary."""
+    table = Table(title="Stage Timings")
+    table.add_column("Stage", style="cyan")
+    table.add_column("Status")
+    table.add_column("Start (s)", justify="right")
+    table.add_column("Duration (s)", justify="right")
+    table.add_column("End (s)", justify="right")
+    for s in stages:
+        t = timings.get(s['name'], {'status': 'skipped'})
+        if t['status'] == 'ok':
+            status = "reused" if (t.get('notes') or {}).get('reused') else "ok"
+            table.add_row(s['name'], f"[green]{status}[/]", f"{t['start']:.2f}",
+                          f"{t['end'] - t['start']:.2f}", f"{t['end']:.2f}")
+        else:
+            color = "red" if t['status'] == 'failed' else "yellow"
+            table.add_row(s['name'], f"[{color}]{t['status']}[/]", "-", "-", "-")
+    console.print(table)
+    path = critical_path(stages, timings, producers)
+    if path:
+        console.print(f"[bold cyan]Critical path:[/] {' -> '.join(path)}")
+    console.print(f"[bold cyan]Total wall-clock:[/] {total:.2f}s")
@@ -0,0 +1,180 @@
+# modules/relevance.py
+"""
+Embedding Relevance Scoring for ShadowRecon
+
+- Embeds "target name + --info + --username" and the text of every refined link
+  (platform, handle, title, snippet, and the profile fields Maigret extracted such as
+  full name and bio) with a small sentence-embedding model (all-MiniLM-L6-v2)
+- Texts are embedded in batches and mean-pooled over their real tokens only (the
+  attention mask leaves out padding), so a text's vector does not depend on which
+  texts share its batch
+- The unit vectors are cached in SQLite by sha256(model, pooling, text), so reruns
+  only embed links they have not seen
+- Relevance is the cosine similarity of each link to the target, computed for all
+  links at once as one matrix-vector product in NumPy
+- Replaces the fixed 0.8 / 0.9 / 1.0 source scores (kept as `source_score`) and
+  re-sorts refined_targets.json; one MiniLM pass costs a fraction of a BART-MNLI call
+"""
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from rich.console import Console
+from modules import telemetry
+
+console = Console()
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+BATCH_SIZE = 32
+CACHE_PATH = "output/.cache/embeddings.sqlite"
+# fields Maigret fills from a profile page (status.ids) that describe the person
+PROFILE_FIELDS = ("fullname", "name", "bio", "about", "description", "location", "company", "occupation")
+
+# vectors cached before pooling used the attention mask carry the old key and are not reused
+POOLING = "masked-mean"
+MAX_LENGTH = 256
+
+# (tokenizer, model), loaded on first use by get_model()
+model = None
+_load_lock = threading.Lock()
+model_lock = threading.Lock()
+
+
+def get_model():
+    global model
+    with _load_lock:
+        if model is None:
+            from transformers import AutoModel, AutoTokenizer
+            console.print(f"[cyan]Loading sentence embedding model {MODEL_NAME}...[/]")
+            tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+            encoder = AutoModel.from_pretrained(MODEL_NAME)
+            encoder.eval()
+            model = (tokenizer, encoder)
+    return model
+
+
+class EmbeddingCache:
+    def __init__(self, path: str = CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        return hashlib.sha256(f"{MODEL_NAME}:{POOLING}\n{text}".encode('utf-8')).hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict:
+        found = {}
+        with self.lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self.conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", chunk)
+                found.update({k: np.frombuffer(v, dtype=np.float32) for k, v in rows})
+        return found
+
+    def put_many(self, entries: dict):
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                                  [(k, v.astype(np.float32).tobytes()) for k, v in entries.items()])
+            self.conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> EmbeddingCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache()
+        return _cache
+
+
+def run_model(texts: list[str], batch_size: int = BATCH_SIZE) -> np.ndarray:
+    """Mean-pooled (over the attention mask), L2-normalized embeddings of texts, shape (len(texts), dim)."""
+    import torch
+    tokenizer, encoder = get_model()
+    chunks = []
+    for i in range(0, len(texts), batch_size):
+        batch = tokenizer(texts[i:i + batch_size], padding=True, truncation=True, max_length=MAX_LENGTH,
+                          return_tensors="pt")
+        with model_lock, telemetry.timer('model_inference_seconds', model=MODEL_NAME), torch.no_grad():
+            hidden = encoder(**batch).last_hidden_state
+        mask = batch['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        chunks.append(pooled.numpy().astype(np.float32))
+        telemetry.inc('model_items_total', len(batch['input_ids']), model=MODEL_NAME)
+    vectors = np.concatenate(chunks)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def embed(texts: list[str], batch_size: int = BATCH_SIZE, use_cache: bool = True) -> np.ndarray:
+    """Embeddings of texts in input order; only texts missing from the cache reach the model."""
+    keys = [EmbeddingCache.make_key(t) for t in texts]
+    known = get_cache().get_many(keys) if use_cache else {}
+    missing = list(dict.fromkeys(k for k in keys if k not in known))
+    if missing:
+        text_for = dict(zip(keys, texts))
+        fresh = dict(zip(missing, run_model([text_for[k] for k in missing], batch_size)))
+        if use_cache:
+            get_cache().put_many(fresh)
+        known.update(fresh)
+    console.print(f"[cyan]Embeddings: {len(set(keys)) - len(missing)} cached, {len(missing)} computed[/]")
+    return np.stack([known[k] for k in keys])
+
+
+def query_text(name: str, info: str | None = None, username: str | None = None) -> str:
+    return " ".join(p for p in (name, username, info) if p)
+
+
+def link_text(link: dict) -> str:
+    """Text describing a refined link: platform, handle, title, snippet and profile fields."""
+    from modules.correlation import handle_from_url
+    parts = [link.get('platform', ''), handle_from_url(link.get('url', '')) or '',
+             link.get('title', ''), link.get('snippet', '')]
+    ids = ((link.get('info') or {}).get('status') or {}).get('ids') or {}
+    parts += [str(ids[f]) for f in PROFILE_FIELDS if ids.get(f)]
+    return " ".join(p for p in parts if p) or link.get('url', '')
+
+
+def score_links(links: list[dict], name: str, info: str | None = None, username: str | None = None,
+                batch_size: int = BATCH_SIZE, use_cache: bool = True) -> list[dict]:
+    """Set `relevance` and `score` on every link and return them sorted by relevance."""
+    if not links:
+        return []
+    vectors = embed([query_text(name, info, username)] + [link_text(l) for l in links], batch_size, use_cache)
+    similarity = vectors[1:] @ vectors[0]
+    for link, sim in zip(links, similarity.tolist()):
+        link.setdefault('source_score', link.get('score'))
+        link['relevance'] = round(sim, 4)
+        link['score'] = link['relevance']
+    return sorted(links, key=lambda l: l['relevance'], reverse=True)
+
+
+def rank_refined_targets(path: str, name: str, info: str | None = None, username: str | None = None,
+                         batch_size: int = BATCH_SIZE, use_cache: bool = True) -> list[dict]:
+    """Score refined_targets.json by relevance to the target and rewrite it in that order."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            links = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        console.print(f"[bold red]Failed to load {path}:[/] {e}")
+        return []
+    try:
+        ranked = score_links(links, name, info, username, batch_size, use_cache)
+    except (ImportError, OSError) as e:
+        # transformers missing or the model could not be loaded
+        console.print(f"[bold red]Relevance scoring unavailable ({e}); keeping the current order.[/bold red]")
+        return links
+    from modules.result_store import write_json
+    write_json(path, ranked)
+    console.print(f"[bold green]Ranked {len(ranked)} links by relevance in {path}[/]")
+    return ranked
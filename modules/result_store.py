@@ -0,0 +1,331 @@
+# modules/result_store.py
+"""
+Result Store for ShadowRecon
+
+- One embedded SQLite database (WAL mode) for every target: output/shadowrecon.sqlite
+- Tables: targets, source_records (raw Maigret / Bing hits), links (refined targets),
+  profiles (Instagram profile fields) and media (posts, stories, highlights, tagged posts)
+- Indexed on URL, platform, username and target, so cross-target queries do not
+  need to load every JSON file
+- Each call writes its rows in one transaction with executemany; Instagram checkpoints
+  only upsert rows instead of rewriting the whole output file
+- export_target() writes the usual per-target JSON files back out from the store
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from rich.console import Console
+
+console = Console()
+
+DB_PATH = "output/shadowrecon.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS targets (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    username TEXT, email TEXT, phone TEXT, info TEXT, image_path TEXT,
+    created_at REAL NOT NULL, updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS source_records (
+    id INTEGER PRIMARY KEY,
+    target_id INTEGER NOT NULL REFERENCES targets(id),
+    source TEXT NOT NULL,
+    url TEXT NOT NULL,
+    canonical_url TEXT NOT NULL,
+    platform TEXT,
+    username TEXT,
+    data TEXT NOT NULL,
+    seen_at REAL NOT NULL,
+    UNIQUE (target_id, source, canonical_url)
+);
+CREATE TABLE IF NOT EXISTS links (
+    id INTEGER PRIMARY KEY,
+    target_id INTEGER NOT NULL REFERENCES targets(id),
+    rank INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    canonical_url TEXT NOT NULL,
+    platform TEXT,
+    score REAL,
+    data TEXT NOT NULL,
+    UNIQUE (target_id, canonical_url)
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    target_id INTEGER NOT NULL REFERENCES targets(id),
+    platform TEXT NOT NULL,
+    username TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (target_id, platform, username)
+);
+CREATE TABLE IF NOT EXISTS media (
+    id INTEGER PRIMARY KEY,
+    profile_id INTEGER NOT NULL REFERENCES profiles(id),
+    section TEXT NOT NULL,
+    item_key TEXT NOT NULL,
+    album TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL,
+    timestamp TEXT,
+    media_path TEXT,
+    data TEXT NOT NULL,
+    UNIQUE (profile_id, section, album, item_key)
+);
+CREATE INDEX IF NOT EXISTS idx_source_target ON source_records(target_id);
+CREATE INDEX IF NOT EXISTS idx_source_url ON source_records(canonical_url);
+CREATE INDEX IF NOT EXISTS idx_source_platform ON source_records(platform);
+CREATE INDEX IF NOT EXISTS idx_source_username ON source_records(username);
+CREATE INDEX IF NOT EXISTS idx_links_url ON links(canonical_url);
+CREATE INDEX IF NOT EXISTS idx_links_platform ON links(platform);
+CREATE INDEX IF NOT EXISTS idx_profiles_username ON profiles(username);
+CREATE INDEX IF NOT EXISTS idx_media_url ON media(url);
+"""
+
+PROFILE_SECTIONS = ('posts', 'stories', 'tagged_posts')
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def record_fields(record: dict) -> tuple[str, str, str | None, str | None]:
+    """(url, canonical_url, platform, username) of a Maigret, Bing or refined record."""
+    from modules.urls import canonicalize
+    status = record.get('status') or {}
+    url = record.get('url') or status.get('url') or ''
+    canonical = record.get('canonical_url') or canonicalize(url)[1]
+    platform = record.get('platform') or status.get('site_name')
+    username = record.get('username') or status.get('username')
+    return url, canonical, platform, username
+
+
+def _media_key(entry: dict) -> str:
+    from modules.insta_checkpoint import entry_shortcode
+    return str(entry.get('mediaid') or entry_shortcode(entry) or entry.get('url', ''))
+
+
+class ResultStore:
+    def __init__(self, path: str = DB_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    @contextmanager
+    def transaction(self):
+        """Run a group of writes as one transaction (nested calls join the outer one)."""
+        with self.lock:
+            if self.conn.in_transaction:
+                yield self.conn
+                return
+            self.conn.execute("BEGIN")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # --- writes ---
+
+    def target_id(self, name: str) -> int:
+        """Id of a target, creating a bare row for it if needed."""
+        with self.transaction() as conn:
+            row = conn.execute("SELECT id FROM targets WHERE name=?", (name,)).fetchone()
+            if row:
+                return row[0]
+            now = time.time()
+            return conn.execute("INSERT INTO targets (name, created_at, updated_at) VALUES (?, ?, ?)",
+                                (name, now, now)).lastrowid
+
+    def save_target(self, info: dict) -> int:
+        """Insert or update a target from the target_info dict built by input_handler."""
+        with self.transaction() as conn:
+            tid = self.target_id(info['target'])
+            conn.execute("UPDATE targets SET username=?, email=?, phone=?, info=?, image_path=?, updated_at=? "
+                         "WHERE id=?", (info.get('username'), info.get('email'), info.get('phone'),
+                                        info.get('info'), info.get('image_path'), time.time(), tid))
+            return tid
+
+    def add_source_records(self, target: str, source: str, records: list[dict]) -> int:
+        """Upsert raw records of one source ('maigret', 'bing') for a target. Returns the row count."""
+        now = time.time()
+        rows = []
+        for record in records:
+            url, canonical, platform, username = record_fields(record)
+            if url:
+                rows.append((source, url, canonical, platform, username, _dumps(record), now))
+        with self.transaction() as conn:
+            tid = self.target_id(target)
+            conn.executemany(
+                "INSERT INTO source_records (target_id, source, url, canonical_url, platform, username, data, seen_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (target_id, source, canonical_url) DO UPDATE SET "
+                "url=excluded.url, platform=excluded.platform, username=excluded.username, "
+                "data=excluded.data, seen_at=excluded.seen_at",
+                [(tid, *row) for row in rows])
+        return len(rows)
+
+    def save_links(self, target: str, links: list[dict]):
+        """Replace the refined links of a target, keeping their order as the rank."""
+        with self.transaction() as conn:
+            tid = self.target_id(target)
+            conn.execute("DELETE FROM links WHERE target_id=?", (tid,))
+            rows = []
+            for rank, link in enumerate(links):
+                url, canonical, platform, _ = record_fields(link)
+                rows.append((tid, rank, url, canonical, platform, link.get('score'), _dumps(link)))
+            conn.executemany("INSERT OR REPLACE INTO links (target_id, rank, url, canonical_url, platform, score, data) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def save_profile(self, target: str, platform: str, data: dict) -> int:
+        """
+        Upsert a profile and its media. Lists under PROFILE_SECTIONS and 'highlights'
+        (title + items) go to the media table; everything else is kept as the profile row.
+        """
+        fields = {k: v for k, v in data.items() if k not in PROFILE_SECTIONS and k != 'highlights'}
+        rows = []
+        for section in PROFILE_SECTIONS:
+            for entry in data.get(section, []):
+                rows.append((section, _media_key(entry), '', entry))
+        for hl in data.get('highlights', []):
+            # an empty placeholder row keeps highlights without items (and their order)
+            rows.append(('highlights', '', hl['title'], {}))
+            for entry in hl.get('items', []):
+                rows.append(('highlights', _media_key(entry), hl['title'], entry))
+
+        with self.transaction() as conn:
+            tid = self.target_id(target)
+            conn.execute("INSERT INTO profiles (target_id, platform, username, data, updated_at) VALUES (?, ?, ?, ?, ?) "
+                         "ON CONFLICT (target_id, platform, username) DO UPDATE SET "
+                         "data=excluded.data, updated_at=excluded.updated_at",
+                         (tid, platform, data['username'], _dumps(fields), time.time()))
+            pid = conn.execute("SELECT id FROM profiles WHERE target_id=? AND platform=? AND username=?",
+                               (tid, platform, data['username'])).fetchone()[0]
+            conn.executemany(
+                "INSERT INTO media (profile_id, section, item_key, album, url, timestamp, media_path, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (profile_id, section, album, item_key) DO UPDATE SET "
+                "url=excluded.url, timestamp=excluded.timestamp, media_path=excluded.media_path, data=excluded.data",
+                [(pid, section, key, album, entry.get('url', ''), entry.get('timestamp'),
+                  entry.get('media_path'), _dumps(entry)) for section, key, album, entry in rows])
+        return pid
+
+    # --- reads ---
+
+    def source_records(self, target: str, source: str, latest_run: bool = False) -> list[dict]:
+        """
+        Every record a source ever returned for the target, or with `latest_run` only those of its
+        last add_source_records() call (one call per run, so they share its seen_at).
+        """
+        latest = ("AND s.seen_at = (SELECT MAX(seen_at) FROM source_records "
+                  "WHERE target_id = s.target_id AND source = s.source) ") if latest_run else ""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT s.data FROM source_records s JOIN targets t ON t.id = s.target_id "
+                f"WHERE t.name=? AND s.source=? {latest}ORDER BY s.id", (target, source)).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def links(self, target: str) -> list[dict]:
+        with self.lock:
+            rows = self.conn.execute("SELECT l.data FROM links l JOIN targets t ON t.id = l.target_id "
+                                     "WHERE t.name=? ORDER BY l.rank", (target,)).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def load_profile(self, target: str, platform: str, username: str) -> dict | None:
+        """Rebuild a profile dict in the shape insta_extractor writes, or None if it is unknown."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT p.id, p.data FROM profiles p JOIN targets t ON t.id = p.target_id "
+                "WHERE t.name=? AND p.platform=? AND p.username=?", (target, platform, username)).fetchone()
+            if not row:
+                return None
+            media = self.conn.execute("SELECT section, album, data FROM media WHERE profile_id=? ORDER BY id",
+                                      (row[0],)).fetchall()
+        data = json.loads(row[1])
+        for section in PROFILE_SECTIONS:
+            data[section] = []
+        highlights = {}
+        for section, album, entry in media:
+            entry = json.loads(entry)
+            if section == 'highlights':
+                items = highlights.setdefault(album, {'title': album, 'items': []})['items']
+                if entry:
+                    items.append(entry)
+            else:
+                data[section].append(entry)
+        for section in ('posts', 'tagged_posts'):
+            data[section].sort(key=lambda e: e.get('timestamp', ''), reverse=True)
+        data['highlights'] = list(highlights.values())
+        return data
+
+    def target_info(self, target: str) -> dict | None:
+        with self.lock:
+            row = self.conn.execute("SELECT name, phone, email, username, info, image_path FROM targets "
+                                    "WHERE name=?", (target,)).fetchone()
+        if not row:
+            return None
+        return dict(zip(("target", "phone", "email", "username", "info", "image_path"), row))
+
+    def profiles(self, target: str, platform: str) -> list[str]:
+        with self.lock:
+            rows = self.conn.execute("SELECT p.username FROM profiles p JOIN targets t ON t.id = p.target_id "
+                                     "WHERE t.name=? AND p.platform=? ORDER BY p.updated_at DESC",
+                                     (target, platform)).fetchall()
+        return [r[0] for r in rows]
+
+    # --- JSON export ---
+
+    def export_target(self, target: str, out_dir: str | None = None) -> list[str]:
+        """
+        Write a target's data out in the usual file layout (input/<target>, bing_result.json,
+        refined_targets.json, <target>_instagram.json) and return the files written.
+        Maigret's own NDJSON report is left as Maigret wrote it. bing_result.json holds the
+        results of the latest Bing run only, as the run wrote it; older runs stay in the store.
+        """
+        out_dir = out_dir or f"output/{target}"
+        written = []
+        info = self.target_info(target)
+        if info:
+            written.append(write_json(f"input/{target}", info))
+        bing = self.source_records(target, 'bing', latest_run=True)
+        if bing:
+            written.append(write_json(f"{out_dir}/bing_result.json", bing))
+        links = self.links(target)
+        if links:
+            written.append(write_json(f"{out_dir}/refined_targets.json", links))
+        usernames = self.profiles(target, 'instagram')
+        if usernames:
+            written.append(write_json(f"{out_dir}/{target}_instagram.json",
+                                      self.load_profile(target, 'instagram', usernames[0])))
+        return written
+
+
+def write_json(path: str, data) -> str:
+    """Atomically write one JSON export file."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ResultStore:
+    """Return the process-wide store, opening it on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore()
+        return _store
@@ -0,0 +1,90 @@
+# modules/serp_parser.py
+"""
+Bing SERP Parser for ShadowRecon
+
+- Every backend walks the document once and reads title/url/snippet from
+  inside each result block (`li.b_algo`), so a snippet can never be taken from a later result
+- Backends: "bs4" (BeautifulSoup + html.parser, always available),
+  "lxml" and "selectolax" (faster, used when installed)
+- parse_serp(html) picks the fastest installed backend unless one is named
+"""
+import importlib.util
+
+BACKENDS = {}
+
+
+def backend(name: str, module: str | None = None):
+    """Register a parser backend; `module` is the optional dependency it needs."""
+    def wrap(func):
+        BACKENDS[name] = {'func': func, 'module': module}
+        return func
+    return wrap
+
+
+def available_backends() -> list[str]:
+    """Installed backends, fastest first."""
+    order = ["selectolax", "lxml", "bs4"]
+    return [n for n in order
+            if BACKENDS[n]['module'] is None or importlib.util.find_spec(BACKENDS[n]['module'])]
+
+
+def _result(title: str, url: str, snippet: str) -> dict:
+    # collapse whitespace so every backend returns identical text
+    return {"title": " ".join(title.split()), "url": url.strip(), "snippet": " ".join(snippet.split())}
+
+
+@backend("bs4")
+def parse_bs4(html: str) -> list[dict]:
+    from bs4 import BeautifulSoup, SoupStrainer
+    # only result blocks are turned into a tree
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("li", class_="b_algo"))
+    results = []
+    for block in soup.find_all("li", class_="b_algo"):
+        h2 = block.find("h2")
+        a = h2.find("a", href=True) if h2 else None
+        if not a:
+            continue
+        p = block.find("p")
+        results.append(_result(a.get_text(), a["href"], p.get_text() if p else ""))
+    return results
+
+
+@backend("lxml", "lxml")
+def parse_lxml(html: str) -> list[dict]:
+    import lxml.html
+    if not html.strip():
+        return []
+    doc = lxml.html.fromstring(html)
+    results = []
+    for block in doc.xpath("//li[contains(concat(' ', normalize-space(@class), ' '), ' b_algo ')]"):
+        links = block.xpath(".//h2//a[@href]")
+        if not links:
+            continue
+        a = links[0]
+        paragraphs = block.xpath(".//p")
+        snippet = "".join(paragraphs[0].itertext()) if paragraphs else ""
+        results.append(_result("".join(a.itertext()), a.get("href"), snippet))
+    return results
+
+
+@backend("selectolax", "selectolax")
+def parse_selectolax(html: str) -> list[dict]:
+    from selectolax.lexbor import LexborHTMLParser
+    tree = LexborHTMLParser(html)
+    results = []
+    for block in tree.css("li.b_algo"):
+        a = block.css_first("h2 a[href]")
+        if not a:
+            continue
+        p = block.css_first("p")
+        results.append(_result(a.text(), a.attributes.get("href") or "", p.text() if p else ""))
+    return results
+
+
+def parse_serp(html: str, backend_name: str | None = None) -> list[dict]:
+    """Parse a Bing results page into title/url/snippet dicts."""
+    if backend_name is None:
+        backend_name = available_backends()[0]
+    if backend_name not in BACKENDS:
+        raise ValueError(f"Unknown SERP parser backend '{backend_name}'. Available: {', '.join(BACKENDS)}")
+    return BACKENDS[backend_name]['func'](html)
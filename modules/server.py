@@ -0,0 +1,394 @@
+# modules/server.py
+"""
+Serve Mode for ShadowRecon
+
+- `main.py --serve` keeps one process running with its resources warm: the shared HTTP
+  session, the imported stage modules, the zero-shot classifier (with --ai), the
+  sentence-embedding model and a logged-in Instaloader context
+- Recon jobs are submitted over a localhost HTTP API, or over a Unix socket with --socket:
+    POST   /jobs              {"target": ..., "username": ..., "priority": 0, "stages": "...", ...}
+    GET    /jobs              every known job
+    GET    /jobs/<id>         status, timings and result of one job
+    GET    /jobs/<id>/events  NDJSON stream of the job's progress until it finishes (?after=<seq>)
+    DELETE /jobs/<id>         cancel a queued job
+    GET    /health
+    GET    /metrics           process-wide telemetry in the Prometheus text format
+- Jobs wait in a priority queue (higher priority first, then oldest first) and run on
+  `--workers` threads; two jobs for the same target never run at the same time
+- A job may override any per-target option of the command line (bing_pages, ai, info, ...);
+  process-wide settings (workers, Maigret processes, classifier backend, HTTP cache) are fixed at startup
+"""
+import os
+import json
+import time
+import queue
+import itertools
+import threading
+import importlib
+import socketserver
+from argparse import Namespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from rich.console import Console
+from modules import telemetry
+
+console = Console()
+
+DEFAULT_PORT = 8765
+MAX_JOBS = 1000  # finished jobs kept for GET /jobs before the oldest are dropped
+HEARTBEAT = 15  # seconds between keep-alive lines on an idle event stream
+_END = object()  # put on a job's Maigret hit queue when the job ends
+# command line options a job cannot override
+SERVER_ONLY = {"serve", "host", "port", "socket", "workers", "targets_file", "correlate", "export_json",
+               "maigret_procs", "classifier_backend", "no_http_cache", "record", "replay"}
+
+
+class Job:
+    def __init__(self, job_id: str, options: dict, priority: int = 0):
+        self.id = job_id
+        self.options = options
+        self.priority = priority
+        self.status = 'queued'
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.events = []
+        self.cond = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('done', 'failed', 'cancelled')
+
+    def emit(self, event: dict, status: str | None = None):
+        """Add a progress event; `status` also moves the job to a final status in the same step."""
+        with self.cond:
+            if status:
+                self.status, self.finished = status, time.time()
+            self.events.append({'seq': len(self.events), 'time': time.time(), 'job': self.id, **event})
+            self.cond.notify_all()
+
+    def events_after(self, after: int, timeout: float) -> list[dict]:
+        """Events with seq >= after, waiting up to `timeout` seconds for one if there are none yet."""
+        with self.cond:
+            if len(self.events) <= after and not self.done:
+                self.cond.wait(timeout)
+            return self.events[after:]
+
+    def summary(self) -> dict:
+        return {'id': self.id, 'target': self.options.get('target'), 'status': self.status,
+                'priority': self.priority, 'created': self.created, 'started': self.started,
+                'finished': self.finished, 'error': self.error, 'result': self.result}
+
+
+def check_option(key: str, value, default):
+    """Raise ValueError unless `value` has the type of the command line option it overrides."""
+    if value is None:
+        return
+    if key == 'force':
+        if not isinstance(value, str) and not (isinstance(value, list) and all(isinstance(v, str) for v in value)):
+            raise ValueError("'force' must be a string or a list of strings")
+        return
+    # options without a default (username, info, stages, ...) take strings on the command line
+    expected = str if default is None else type(default)
+    if isinstance(value, bool) and expected is not bool:
+        raise ValueError(f"'{key}' must be of type {expected.__name__}")
+    if not isinstance(value, expected) and not (expected is float and isinstance(value, int)):
+        raise ValueError(f"'{key}' must be of type {expected.__name__}")
+
+
+class JobManager:
+    """Priority queue of recon jobs run by `run_job(args, selected, on_event, live_results)` on worker threads."""
+
+    def __init__(self, run_job, defaults: dict, workers: int = 2):
+        from modules.stages import parse_selection
+        self.run_job = run_job
+        self.defaults = dict(defaults)
+        self.default_stages = parse_selection(defaults.get('stages'))
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.queue = queue.PriorityQueue()
+        self.seq = itertools.count()
+        self.target_locks = {}
+        self.threads = [threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+                        for i in range(max(1, workers))]
+        for t in self.threads:
+            t.start()
+
+    def submit(self, fields: dict) -> Job:
+        """Validate a job request and queue it. Raises ValueError for a bad request."""
+        from modules.stages import parse_selection, parse_force
+        if not isinstance(fields, dict):
+            raise ValueError("Job must be a JSON object")
+        fields = dict(fields)
+        target = fields.get('target')
+        if not isinstance(target, str) or not target.strip():
+            raise ValueError("'target' is required")
+        fields['target'] = target.strip()
+        priority = fields.pop('priority', 0)
+        if not isinstance(priority, int) or isinstance(priority, bool):
+            raise ValueError("'priority' must be an integer")
+        for key, value in fields.items():
+            if key not in self.defaults or key in SERVER_ONLY:
+                raise ValueError(f"Unknown or server-wide option '{key}'")
+            check_option(key, value, self.defaults[key])
+        parse_selection(fields.get('stages'))
+        fields['force'] = parse_force(fields.get('force', self.defaults.get('force')))
+
+        job = Job(f"{int(time.time() * 1000):x}-{next(self.seq)}", fields, priority)
+        with self.lock:
+            self.jobs[job.id] = job
+            self._trim()
+        job.emit({'event': 'job_queued', 'target': fields['target'], 'priority': priority})
+        self.queue.put((-priority, next(self.seq), job))
+        return job
+
+    def _trim(self):
+        finished = [j for j in self.jobs.values() if j.done]
+        for job in sorted(finished, key=lambda j: j.finished)[:max(0, len(self.jobs) - MAX_JOBS)]:
+            del self.jobs[job.id]
+
+    def get(self, job_id: str) -> Job | None:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self) -> list[dict]:
+        with self.lock:
+            jobs = list(self.jobs.values())
+        return [j.summary() for j in jobs]
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job; running and finished jobs are left alone."""
+        job = self.get(job_id)
+        with self.lock:
+            if not job or job.status != 'queued':
+                return False
+            job.emit({'event': 'job_cancelled'}, status='cancelled')
+        return True
+
+    def _target_lock(self, target: str) -> threading.Lock:
+        with self.lock:
+            return self.target_locks.setdefault(target, threading.Lock())
+
+    def _worker(self):
+        while True:
+            _, _, job = self.queue.get()
+            with self.lock:
+                if job.status != 'queued':
+                    continue
+                job.status = 'running'
+            with self._target_lock(job.options['target']):
+                self._run(job)
+
+    def _run(self, job: Job):
+        from modules.stages import parse_selection
+        job.started = time.time()
+        job.emit({'event': 'job_started'})
+        args = Namespace(**{**self.defaults, **job.options})
+        selected = parse_selection(args.stages) if 'stages' in job.options else self.default_stages
+        live = queue.Queue()
+        forwarder = threading.Thread(target=self._forward_hits, args=(job, live), daemon=True)
+        forwarder.start()
+        status = 'failed'
+        try:
+            context = self.run_job(args, selected, job.emit, live)
+            report_path = f"output/{args.target}/run_report.json"
+            report = None
+            if os.path.exists(report_path):
+                with open(report_path, 'r', encoding='utf-8') as f:
+                    report = json.load(f)
+            job.result = {'artifacts': context, 'report': report}
+            status = 'done'
+        except Exception as e:
+            job.error = str(e)
+            console.print(f"[bold red]Job {job.id} ({args.target}) failed:[/] {e}")
+        finally:
+            live.put(_END)
+            forwarder.join(timeout=5)
+            job.emit({'event': 'job_finished', 'status': status, 'error': job.error, 'result': job.result,
+                      'seconds': time.time() - job.started}, status=status)
+
+    @staticmethod
+    def _forward_hits(job: Job, live: queue.Queue):
+        while True:
+            record = live.get()
+            if record is _END:
+                return
+            if record is None:
+                continue  # end of one Maigret username stream
+            status = record.get('status') or {}
+            job.emit({'event': 'maigret_hit', 'site': record.get('sitename') or status.get('site_name'),
+                      'url': status.get('url')})
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "ShadowRecon"
+
+    @property
+    def manager(self) -> JobManager:
+        return self.server.manager
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        console.print(f"[dim]{self.address_string()} {format % args}[/]")
+
+    def _send_json(self, status: int, data):
+        body = json.dumps(data, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self) -> tuple[list[str], dict]:
+        url = urlparse(self.path)
+        return [p for p in url.path.split('/') if p], parse_qs(url.query)
+
+    def do_GET(self):
+        parts, query = self._route()
+        if parts == ['health']:
+            self._send_json(200, {'status': 'ok', 'jobs': len(self.manager.jobs),
+                                  'queued': self.manager.queue.qsize()})
+        elif parts == ['metrics']:
+            body = telemetry.to_prometheus(telemetry.snapshot()).encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif parts == ['jobs']:
+            self._send_json(200, self.manager.list())
+        elif len(parts) in (2, 3) and parts[0] == 'jobs':
+            job = self.manager.get(parts[1])
+            if not job:
+                self._send_json(404, {'error': f"No job {parts[1]}"})
+            elif len(parts) == 2:
+                self._send_json(200, job.summary())
+            elif parts[2] == 'events':
+                after = query.get('after', ['0'])[0]
+                if not after.isdigit():
+                    self._send_json(400, {'error': "'after' must be a non-negative integer"})
+                else:
+                    self._stream(job, int(after))
+            else:
+                self._send_json(404, {'error': "Not found"})
+        else:
+            self._send_json(404, {'error': "Not found"})
+
+    def do_POST(self):
+        parts, _ = self._route()
+        if parts != ['jobs']:
+            self._send_json(404, {'error': "Not found"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            job = self.manager.submit(json.loads(self.rfile.read(length) or b'{}'))
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        self._send_json(202, {'id': job.id, 'status': job.status, 'events': f"/jobs/{job.id}/events"})
+
+    def do_DELETE(self):
+        parts, _ = self._route()
+        if len(parts) != 2 or parts[0] != 'jobs':
+            self._send_json(404, {'error': "Not found"})
+        elif self.manager.cancel(parts[1]):
+            self._send_json(200, {'id': parts[1], 'status': 'cancelled'})
+        else:
+            self._send_json(409, {'error': f"Job {parts[1]} is not queued"})
+
+    def _stream(self, job: Job, after: int):
+        """Write the job's events as NDJSON lines until it finishes; the connection closes at the end."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        try:
+            while True:
+                events = job.events_after(after, HEARTBEAT)
+                for event in events:
+                    self.wfile.write((json.dumps(event, default=str) + "\n").encode('utf-8'))
+                after += len(events)
+                if not events:
+                    self.wfile.write(b"\n")  # heartbeat, also detects a client that went away
+                self.wfile.flush()
+                if job.done and after >= len(job.events):
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+def make_server(manager: JobManager, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                socket_path: str | None = None):
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # left over from a previous daemon
+        server = UnixHTTPServer(socket_path, Handler)
+        os.chmod(socket_path, 0o600)
+    else:
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+    server.manager = manager
+    return server
+
+
+def warm_up(args, selected: list[str]):
+    """Load what the selected stages need once, so the first job does not pay for it."""
+    from modules import http_client
+    from modules.stages import REGISTRY
+    start = time.perf_counter()
+    http_client.get_session()
+    for name in selected:
+        for module in REGISTRY[name]['code']:
+            try:
+                importlib.import_module(module)
+            except ImportError as e:
+                console.print(f"[yellow]Could not preload {module}: {e}[/]")
+    if args.ai and 'refine' in selected:
+        from modules.ai_correlator import get_classifier
+        try:
+            get_classifier()
+        except (ImportError, OSError) as e:
+            console.print(f"[yellow]Zero-shot classifier not preloaded: {e}[/]")
+    if 'score' in selected:
+        from modules.relevance import get_model
+        try:
+            get_model()
+        except (ImportError, OSError) as e:
+            console.print(f"[yellow]Embedding model not preloaded: {e}[/]")
+    if 'instagram' in selected:
+        from modules.insta_extractor import get_loader, get_downloader
+        get_loader()
+        get_downloader()
+    console.print(f"[green]Resources warmed up in {time.perf_counter() - start:.1f}s[/]")
+
+
+def serve(run_job, defaults: dict, workers: int = 2, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+          socket_path: str | None = None):
+    """Run the job API until interrupted."""
+    manager = JobManager(run_job, defaults, workers)
+    server = make_server(manager, host, port, socket_path)
+    where = f"unix:{socket_path}" if socket_path else f"http://{host}:{server.server_address[1]}"
+    if not socket_path and host not in ("127.0.0.1", "localhost", "::1"):
+        console.print(f"[bold yellow]Warning: the job API has no authentication and listens on {host}.[/]")
+    console.print(f"[bold green]ShadowRecon serving jobs on {where} with {workers} worker(s). Ctrl+C to stop.[/]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("[cyan]Shutting down...[/]")
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
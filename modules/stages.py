@@ -0,0 +1,275 @@
+# modules/stages.py
+"""
+Stage Registry for ShadowRecon
+
+- Every recon stage registers its name, input artifacts and output artifacts here
+- A stage imports its module (and that module's heavy dependencies such as
+  bs4, instaloader or transformers) only when it actually runs
+- Maigret streams each confirmed site into the `live_results` queue while it runs,
+  so consumers can react to the first hits before the report is complete
+- Stages also record their results in the SQLite result store (modules/result_store.py)
+  and the identifiers they found in the correlation index (modules/correlation.py)
+- `build_stages` turns a `--stages` selection into scheduler stages; outputs of
+  stages that are not selected are taken from the previous run's files
+- Selected stages are memoized (modules/memo.py): a stage whose input fingerprint,
+  parameters and code match its last manifest is skipped unless it is in `--force`.
+  Stages fetching from the network also expire after a TTL
+"""
+import os
+import queue
+import importlib.util
+from rich.console import Console
+from modules import memo
+from modules.pipeline import stage
+
+console = Console()
+
+REGISTRY = {}
+# how long an Instagram extraction is reused before new posts are looked for
+INSTAGRAM_TTL = 24 * 3600
+
+
+def register(name: str, inputs=(), outputs=(), params=(), code=(), ttl=None, fingerprint=None):
+    """
+    Decorator adding a stage function `func(args, ctx, **options)` to the registry.
+
+    For memoization, `params` names the args attributes that change the stage's output, `code`
+    the modules whose source it depends on, `ttl(args)` how many seconds its outputs stay valid
+    (None: until an input changes) and `fingerprint(args, ctx)` what of its inputs matters
+    (default: the SHA-256 of every input file).
+    """
+    def wrap(func):
+        REGISTRY[name] = {'func': func, 'inputs': list(inputs), 'outputs': list(outputs), 'params': list(params),
+                          'code': list(code), 'ttl': ttl, 'fingerprint': fingerprint}
+        return func
+    return wrap
+
+
+def index_identifiers(args, options: dict, source: str, identifiers: list[tuple[str, str]]):
+    """Add what a stage found to the cross-target correlation index; never fails the stage."""
+    from modules.correlation import get_index
+    try:
+        get_index().add(args.target, options.get('run_id', 'adhoc'), source, identifiers)
+    except Exception as e:
+        console.print(f"[red]Could not update the correlation index: {e}[/]")
+
+
+def artifact_paths(target: str) -> dict:
+    """Where every artifact of a target lives on disk."""
+    out_dir = f"output/{target}"
+    return {
+        'maigret_report': f"{out_dir}/report_{target}_ndjson.json",
+        'bing_results': f"{out_dir}/bing_result.json",
+        'refined_targets': f"{out_dir}/refined_targets.json",
+        # the score stage re-sorts refined_targets.json in place
+        'ranked_targets': f"{out_dir}/refined_targets.json",
+        'instagram_data': f"{out_dir}/{target}_instagram.json",
+        'image_matches': f"{out_dir}/image_matches.json",
+    }
+
+
+@register('maigret', outputs=['maigret_report'], params=['username', 'max_variants'],
+          code=['modules.maigret', 'modules.maigret_cache', 'modules.usernames'],
+          ttl=lambda args: 0 if args.no_maigret_cache else args.maigret_ttl * 3600)
+def maigret_stage(args, ctx, **options):
+    from modules.maigret import run_maigret_multi
+    from modules.usernames import usernames_for
+    console.print("[bold cyan]\n[1] Running Maigret...\n")
+    usernames = usernames_for(args.target, args.username, args.max_variants) or [args.target]
+    result = run_maigret_multi(args.target, usernames, ttl=args.maigret_ttl * 3600,
+                               revalidate=args.maigret_revalidate, use_cache=not args.no_maigret_cache,
+                               live_results=options.get('live_results'))
+    from modules.result_store import get_store
+    get_store().add_source_records(args.target, 'maigret', result['records'])
+    from modules.correlation import identifiers_from_link
+    index_identifiers(args, options, 'maigret', [i for r in result['records'] for i in identifiers_from_link(r)])
+    return {'maigret_report': artifact_paths(args.target)['maigret_report'],
+            'notes': {'cache': result['usernames'], 'found_by_username': result['found'],
+                      'cache_age_seconds': {u: round(age, 1) for u, age in result['ages'].items()},
+                      'saved_seconds': round(result['saved_seconds'], 1), 'claimed': len(result['records']),
+                      **({'incomplete': True, 'failed': result['failed']} if result['failed'] else {})}}
+
+
+def bing_ttl(args) -> float:
+    from modules.http_client import CACHE_TTLS
+    return 0 if args.no_http_cache else CACHE_TTLS["www.bing.com"]
+
+
+@register('bing', outputs=['bing_results'], params=['username', 'info', 'bing_pages'],
+          code=['modules.bing', 'modules.serp_parser', 'modules.urls'], ttl=bing_ttl)
+def bing_stage(args, ctx, **options):
+    from modules.bing import bing
+    console.print("[bold cyan]\n[1] Running Bing Search ...\n")
+    # a failed source is reported as incomplete, not raised: refine still runs on the other one
+    results, failed, total = bing(args.target, args.username, args.info, pages=args.bing_pages, with_failures=True)
+    from modules.correlation import identifiers_from_link
+    index_identifiers(args, options, 'bing', [i for r in results for i in identifiers_from_link(r)])
+    notes = {'results': len(results)}
+    if failed:
+        notes.update(incomplete=True, failed_pages=f"{failed}/{total}")
+    return {'bing_results': artifact_paths(args.target)['bing_results'], 'notes': notes}
+
+
+def refine_backend(args) -> dict:
+    if not args.ai:
+        return {}
+    from modules.ai_correlator import BACKEND
+    return {'backend': BACKEND}
+
+
+@register('refine', inputs=['maigret_report', 'bing_results'], outputs=['refined_targets'], params=['ai'],
+          code=['modules.filter_links', 'modules.ai_correlator', 'modules.classifier_backends',
+                'modules.domain_rules', 'modules.urls', 'modules.ingest'],
+          fingerprint=lambda args, ctx: {**input_digests(ctx, ['maigret_report', 'bing_results']),
+                                         **refine_backend(args)})
+def refine_stage(args, ctx, **options):
+    from modules.result_store import get_store
+    output = artifact_paths(args.target)['refined_targets']
+    if args.ai:
+        # the classifier is then loaded once per process, on first use
+        from modules.ai_correlator import refine_targets
+        links = refine_targets(ctx['maigret_report'], ctx['bing_results'], output,
+                               args.classifier_batch_size, not args.no_classifier_cache)
+    else:
+        from modules.filter_links import refine_targets
+        links = refine_targets(ctx['maigret_report'], ctx['bing_results'], output)
+    get_store().save_links(args.target, links)
+    from modules.correlation import identifiers_from_link
+    index_identifiers(args, options, 'refine', [i for link in links for i in identifiers_from_link(link)])
+    return {'refined_targets': output}
+
+
+def installed(module: str) -> bool:
+    # stages that degrade without an optional dependency must rerun once it is installed
+    return importlib.util.find_spec(module) is not None
+
+
+@register('score', inputs=['refined_targets'], outputs=['ranked_targets'], params=['info', 'username'],
+          code=['modules.relevance'],
+          fingerprint=lambda args, ctx: {**input_digests(ctx, ['refined_targets']),
+                                         'transformers': installed('transformers')})
+def score_stage(args, ctx, **options):
+    from modules.relevance import rank_refined_targets
+    from modules.result_store import get_store
+    console.print("[bold cyan]\n[3] Scoring link relevance...\n")
+    ranked = rank_refined_targets(ctx['refined_targets'], args.target, args.info, args.username,
+                                  args.embedding_batch_size, not args.no_embedding_cache)
+    if ranked:
+        get_store().save_links(args.target, ranked)
+    return {'ranked_targets': ctx['refined_targets']}
+
+
+def instagram_fingerprint(args, ctx) -> dict:
+    # only the Instagram account picked from the ranked links matters, not the rest of the file
+    from modules.insta_extractor import load_refined_targets
+    return {'instagram_username': load_refined_targets(ctx['ranked_targets']).get('username')}
+
+
+@register('instagram', inputs=['ranked_targets'], outputs=['instagram_data'],
+          code=['modules.insta_extractor', 'modules.insta_checkpoint'],
+          ttl=lambda args: INSTAGRAM_TTL, fingerprint=instagram_fingerprint)
+def instagram_stage(args, ctx, prompt_login=True, **options):
+    from modules.insta_extractor import run_instagram_extraction
+    output = artifact_paths(args.target)['instagram_data']
+    data = run_instagram_extraction(ctx['ranked_targets'], args.target, output, prompt_login=prompt_login)
+    if data:
+        from modules.correlation import identifiers_from_profile
+        index_identifiers(args, options, 'instagram', identifiers_from_profile(data))
+    return {'instagram_data': output}
+
+
+@register('image', inputs=['instagram_data'], outputs=['image_matches'], params=['image_threshold'],
+          code=['modules.image_match'],
+          fingerprint=lambda args, ctx: {**input_digests(ctx, ['instagram_data']),
+                                         'image': memo.file_digest(args.image), 'pillow': installed('PIL')})
+def image_stage(args, ctx, **options):
+    from modules.image_match import match_image
+    output = artifact_paths(args.target)['image_matches']
+    image = args.image if args.image and os.path.exists(args.image) else None
+    console.print("[bold cyan]\n[5] Matching images...\n")
+    ranked = match_image(image, ctx['instagram_data'], args.target, output, threshold=args.image_threshold)
+    if ranked is None:
+        return {'image_matches': output, 'notes': {'incomplete': True}}
+    return {'image_matches': output, 'notes': {'profiles': len(ranked)}}
+
+
+def parse_selection(value: str | None) -> list[str]:
+    """Turn a comma separated `--stages` value into registry names, in registry order."""
+    if not value:
+        return list(REGISTRY)
+    names = [n.strip() for n in value.split(',') if n.strip()]
+    unknown = [n for n in names if n not in REGISTRY]
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(unknown)}. Available: {', '.join(REGISTRY)}")
+    return [n for n in REGISTRY if n in names]
+
+
+def input_digests(ctx: dict, inputs: list[str]) -> dict:
+    return {name: memo.file_digest(ctx.get(name)) for name in inputs}
+
+
+def memoized(name: str, args, options: dict, force: bool = False):
+    """Scheduler function running stage `name`, or reusing its outputs when its manifest still matches."""
+    entry = REGISTRY[name]
+
+    def manifest(ctx):
+        fingerprint = (entry['fingerprint'] or (lambda a, c: input_digests(c, entry['inputs'])))(args, ctx)
+        params = {p: getattr(args, p, None) for p in entry['params']}
+        return memo.current(fingerprint, params, memo.code_digest(entry['func'], entry['code']))
+
+    def run(ctx):
+        if not force:
+            saved = memo.load(args.target, name)
+            ttl = entry['ttl'](args) if entry['ttl'] else None
+            reason = memo.stale_reason(saved, manifest(ctx), ttl)
+            if reason is None:
+                console.print(f"[green]Stage '{name}' is up to date, reusing its outputs.[/]")
+                return {**saved['outputs'], 'notes': {'reused': True, 'manifest_finished_at': saved['finished_at']}}
+            console.print(f"[cyan]Running stage '{name}': {reason}.[/]")
+        try:
+            result = dict(entry['func'](args, ctx, **options) or {})
+        except BaseException:
+            memo.discard(args.target, name)
+            raise
+        outputs = {k: v for k, v in result.items() if k != 'notes'}
+        if (result.get('notes') or {}).get('incomplete'):
+            console.print(f"[yellow]Stage '{name}' finished with incomplete results; it will run again next time.[/]")
+            memo.discard(args.target, name)
+        else:
+            # fingerprinted after the run, so a stage rewriting its input in place (score) matches next time
+            memo.save(args.target, name, manifest(ctx), outputs, result.get('notes'))
+        return result
+    return run
+
+
+def parse_force(values) -> list[str]:
+    """Turn `--force` values (repeatable, comma separated, 'all' for every stage) into registry names."""
+    if isinstance(values, str):
+        values = [values]
+    joined = ",".join(values or [])
+    if 'all' in [n.strip() for n in joined.split(',')]:
+        return list(REGISTRY)
+    return parse_selection(joined) if joined.strip(', ') else []
+
+
+def build_stages(args, selected: list[str], force=(), **options) -> tuple[list[dict], dict]:
+    """
+    Return (scheduler stages, initial context) for the selected stage names. Stages named in
+    `force` always run; the others are skipped when their manifest is up to date.
+    """
+    options.setdefault('live_results', queue.Queue())
+    stages = []
+    for name in selected:
+        entry = REGISTRY[name]
+        stages.append(stage(name, memoized(name, args, options, force=name in force),
+                            inputs=entry['inputs'], outputs=entry['outputs']))
+
+    # artifacts of unselected stages come from an earlier run
+    paths = artifact_paths(args.target)
+    context = {}
+    for name, entry in REGISTRY.items():
+        if name in selected:
+            continue
+        for out in entry['outputs']:
+            context[out] = paths[out]
+    return stages, context
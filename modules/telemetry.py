@@ -0,0 +1,243 @@
+# modules/telemetry.py
+"""
+Run Telemetry for ShadowRecon
+
+- Process-wide counters and histograms with labels, cheap enough to update on every
+  stage, HTTP call, rate-limit wait and model batch (one lock, no dependencies)
+- Every metric is declared in METRICS with its type and help text and exported with the
+  shadowrecon_ prefix
+- A run's metrics are the difference between a snapshot taken when it starts and one taken
+  when it ends, written as output/<target>/metrics.json and in the Prometheus text format as
+  output/<target>/metrics.prom (for the node_exporter textfile collector). In batch and serve
+  mode targets overlap, so a run's numbers then include work of the runs beside it
+- `--profile` saves a cProfile dump (.prof, for pstats/snakeviz) and the top tracemalloc
+  allocations of every stage under output/<target>/profile/. Only one profiler can be active
+  at a time (Python 3.12 refuses a second one), so a stage starting while another is being
+  profiled gets only its allocation summary. On 3.12+ a profile covers every thread, so it
+  also holds the work of stages that ran beside it (the .txt says so); on 3.11 it covers the
+  stage's own thread. tracemalloc is process-wide, so parallel stages share allocations
+"""
+import os
+import io
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+PREFIX = "shadowrecon_"
+# seconds; shared by every histogram
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+METRICS = {
+    'stage_seconds': ('histogram', "Wall-clock time of a pipeline stage"),
+    'stage_runs_total': ('counter', "Pipeline stages by final status (ok, reused, failed, skipped)"),
+    'http_requests_total': ('counter', "HTTP GETs by host, status and where the response came from"),
+    'http_request_seconds': ('histogram', "Time until response headers of HTTP GETs sent to the network"),
+    'http_response_bytes_total': ('counter', "Body bytes of non-streamed HTTP responses"),
+    'rate_limit_wait_seconds_total': ('counter', "Time spent waiting on per-host rate limiters and schedulers"),
+    'throttled_total': ('counter', "429/403 responses seen by the adaptive schedulers"),
+    'media_files_total': ('counter', "Media downloads by result (downloaded, reused, failed)"),
+    'media_bytes_total': ('counter', "Media bytes downloaded"),
+    'model_inference_seconds': ('histogram', "Time of one model batch"),
+    'model_items_total': ('counter', "Texts run through a model"),
+    'maigret_seconds': ('histogram', "Wall-clock time of one Maigret process"),
+    'maigret_cache_total': ('counter', "Maigret runs by cache result (hit, revalidated, miss, off)"),
+}
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+
+
+def _key(name: str, labels: dict) -> tuple:
+    if name not in METRICS:
+        raise KeyError(f"Undeclared metric '{name}'")
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, value: float = 1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, value: float, **labels):
+    key = _key(name, labels)
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = {'count': 0, 'sum': 0.0, 'buckets': [0] * len(BUCKETS)}
+        h['count'] += 1
+        h['sum'] += value
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                h['buckets'][i] += 1
+                break
+
+
+@contextmanager
+def timer(name: str, **labels):
+    """Observe how long the block took into histogram `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {'counters': dict(_counters),
+                'histograms': {k: {**h, 'buckets': list(h['buckets'])} for k, h in _histograms.items()}}
+
+
+def diff(before: dict, after: dict) -> dict:
+    """What happened between two snapshots."""
+    counters = {k: v - before['counters'].get(k, 0) for k, v in after['counters'].items()}
+    histograms = {}
+    for k, h in after['histograms'].items():
+        old = before['histograms'].get(k, {'count': 0, 'sum': 0.0, 'buckets': [0] * len(BUCKETS)})
+        if h['count'] == old['count']:
+            continue
+        histograms[k] = {'count': h['count'] - old['count'], 'sum': h['sum'] - old['sum'],
+                         'buckets': [a - b for a, b in zip(h['buckets'], old['buckets'])]}
+    return {'counters': {k: v for k, v in counters.items() if v}, 'histograms': histograms}
+
+
+def to_json(snap: dict) -> dict:
+    """{metric: [{'labels': {...}, 'value' | 'count'/'sum'/'buckets'}]} for the JSON report."""
+    out = {}
+    for (name, labels), value in sorted(snap['counters'].items()):
+        out.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+    for (name, labels), h in sorted(snap['histograms'].items()):
+        out.setdefault(name, []).append({'labels': dict(labels), 'count': h['count'], 'sum': h['sum'],
+                                         'buckets': dict(zip(map(str, BUCKETS), h['buckets']))})
+    return out
+
+
+def _labels(labels: tuple, extra: dict | None = None) -> str:
+    pairs = list(labels) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def to_prometheus(snap: dict, extra_labels: dict | None = None) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        full = PREFIX + name
+        counters = sorted((l, v) for (n, l), v in snap['counters'].items() if n == name)
+        histograms = sorted((l, h) for (n, l), h in snap['histograms'].items() if n == name)
+        if not counters and not histograms:
+            continue
+        lines += [f"# HELP {full} {help_text}", f"# TYPE {full} {kind}"]
+        for labels, value in counters:
+            lines.append(f"{full}{_labels(labels, extra_labels)} {value:g}")
+        for labels, h in histograms:
+            cumulative = 0
+            for bound, count in zip(BUCKETS, h['buckets']):
+                cumulative += count
+                lines.append(f"{full}_bucket{_labels(labels, {**(extra_labels or {}), 'le': f'{bound:g}'})} {cumulative}")
+            lines.append(f"{full}_bucket{_labels(labels, {**(extra_labels or {}), 'le': '+Inf'})} {h['count']}")
+            lines.append(f"{full}_sum{_labels(labels, extra_labels)} {h['sum']:g}")
+            lines.append(f"{full}_count{_labels(labels, extra_labels)} {h['count']}")
+    return "\n".join(lines) + "\n"
+
+
+_active_runs = 0
+_runs_started = 0
+_active_lock = threading.Lock()
+
+
+@contextmanager
+def run_scope():
+    """Snapshot around one target run; yields a dict that holds the run's metrics afterwards."""
+    global _active_runs, _runs_started
+    with _active_lock:
+        _active_runs += 1
+        _runs_started += 1
+        started_index = _runs_started
+        overlapping = _active_runs > 1
+    before = snapshot()
+    result = {'started_at': time.time()}
+    try:
+        yield result
+    finally:
+        with _active_lock:
+            # another run still going, or one that started (and maybe ended) while this one ran
+            overlapping = overlapping or _active_runs > 1 or _runs_started != started_index
+            _active_runs -= 1
+        result.update(finished_at=time.time(), overlapping_runs=overlapping, metrics=diff(before, snapshot()))
+
+
+def write_run_files(out_dir: str, target: str, run: dict) -> tuple[str, str]:
+    """Write metrics.json and metrics.prom for one run; returns their paths."""
+    from modules.result_store import write_json
+    json_path = write_json(os.path.join(out_dir, "metrics.json"),
+                           {'target': target, 'started_at': run['started_at'], 'finished_at': run['finished_at'],
+                            'overlapping_runs': run['overlapping_runs'], 'metrics': to_json(run['metrics'])})
+    prom_path = os.path.join(out_dir, "metrics.prom")
+    with open(prom_path + ".tmp", 'w', encoding='utf-8') as f:
+        f.write(to_prometheus(run['metrics'], {'target': target}))
+    os.replace(prom_path + ".tmp", prom_path)
+    return json_path, prom_path
+
+
+# held by the stage whose cProfile is running; other stages overlapping it are not profiled
+_profile_lock = threading.Lock()
+_profile_overlapped = False
+
+
+def _start_profiler() -> cProfile.Profile | None:
+    """Start the process's one profiler, or None when another stage (or tool) holds it."""
+    global _profile_overlapped
+    if not _profile_lock.acquire(blocking=False):
+        _profile_overlapped = True
+        return None
+    _profile_overlapped = False
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # another profiling tool is active (Python 3.12+)
+        _profile_lock.release()
+        return None
+    return profiler
+
+
+@contextmanager
+def profile_stage(stage: str, out_dir: str, top: int = 25):
+    """cProfile the stage (when no other stage is being profiled) and diff tracemalloc snapshots around it."""
+    os.makedirs(out_dir, exist_ok=True)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(10)
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    profiler = _start_profiler()
+    try:
+        yield
+    finally:
+        text = io.StringIO()
+        if profiler is not None:
+            profiler.disable()
+            overlapped = _profile_overlapped
+            _profile_lock.release()
+            profiler.dump_stats(os.path.join(out_dir, f"{stage}.prof"))
+            pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(top)
+        _, peak = tracemalloc.get_traced_memory()
+        growth = tracemalloc.take_snapshot().compare_to(before, 'lineno')
+        with open(os.path.join(out_dir, f"{stage}.txt"), 'w', encoding='utf-8') as f:
+            f.write(f"Stage {stage}: peak traced memory {peak / (1 << 20):.1f} MiB\n\n")
+            f.write(f"Top {top} allocation changes by line:\n")
+            f.writelines(f"{stat}\n" for stat in growth[:top])
+            if profiler is None:
+                f.write("\nNo CPU profile: another stage was being profiled while this one ran.\n")
+            else:
+                if overlapped:
+                    f.write("\nOther stages ran during this profile; on Python 3.12+ their functions are "
+                            "included in it.\n")
+                f.write(f"\nTop {top} functions by cumulative time:\n")
+                f.write(text.getvalue())
@@ -0,0 +1,52 @@
+# modules/urls.py
+"""
+URL helpers for ShadowRecon
+
+- canonicalize parses a URL once and returns its bare host and canonical form
+- normalize_url gives the canonical form used as a dedup key, so `www.` vs bare
+  host, http vs https, letter case in the host, default ports, fragments,
+  tracking parameters and trailing slashes no longer produce duplicates
+"""
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "igshid", "ref_src")
+
+
+def normalize_url(url: str) -> str:
+    """Return the canonical form of `url` (https, lowercase bare host, no fragment or trailing slash)."""
+    return canonicalize(url)[1]
+
+
+def canonicalize(url: str) -> tuple[str, str]:
+    """Parse `url` once and return (bare lowercase host, canonical URL)."""
+    url = url.strip()
+    # fast path for the common scheme://netloc/path?query#fragment shape
+    scheme, sep, rest = url.partition('://')
+    if sep and scheme.isalpha():
+        rest = rest.partition('#')[0]
+        rest, _, query = rest.partition('?')
+        netloc, slash, path = rest.partition('/')
+        path = slash + path
+    else:
+        try:
+            parts = urlsplit(url)
+        except ValueError:
+            return '', url
+        netloc, path, query = parts.netloc, parts.path, parts.query
+    if not netloc:
+        return '', url
+    netloc = netloc.rpartition('@')[2].lower()
+    if netloc.startswith('['):
+        host, port = netloc, ''  # IPv6 literal, kept as written
+        if ']:' in netloc:
+            host, port = netloc.rsplit(':', 1)
+    else:
+        host, _, port = netloc.partition(':')
+    if host.startswith('www.'):
+        host = host[4:]
+    netloc = f"{host}:{port}" if port and port not in ('80', '443') else host
+    path = path.rstrip('/')
+    if query:
+        query = urlencode([(k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+                           if not k.lower().startswith(TRACKING_PARAMS)])
+    return host, f"https://{netloc}{path}?{query}" if query else f"https://{netloc}{path}"
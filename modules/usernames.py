@@ -0,0 +1,54 @@
+# modules/usernames.py
+"""
+Username Variant Generation for ShadowRecon
+
+- A multi-word real name is a poor Maigret username, so the target name is turned
+  into the handles people actually register: joined, dotted, underscored, dashed
+  and initial-based forms
+- The explicit --username always comes first; variants follow in order of how
+  common the pattern is, without duplicates
+"""
+import re
+import unicodedata
+
+DEFAULT_MAX_VARIANTS = 6
+
+
+def name_parts(name: str) -> list[str]:
+    """Lowercase ASCII words of a name ("José O'Neil" -> ['jose', 'oneil'])."""
+    ascii_name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode()
+    words = [re.sub(r'[^a-z0-9]', '', w) for w in ascii_name.lower().split()]
+    return [w for w in words if w]
+
+
+def name_variants(name: str) -> list[str]:
+    """Username patterns derived from a real name, most common first."""
+    parts = name_parts(name)
+    if not parts:
+        return []
+    if len(parts) == 1:
+        return parts
+    first, last = parts[0], parts[-1]
+    initials = ''.join(p[0] for p in parts)
+    candidates = [
+        ''.join(parts),            # johndoe
+        '.'.join(parts),           # john.doe
+        '_'.join(parts),           # john_doe
+        first[0] + last,           # jdoe
+        first + last[0],           # johnd
+        '-'.join(parts),           # john-doe
+        last + first,              # doejohn
+        f"{first[0]}.{last}",      # j.doe
+        f"{last}.{first}",         # doe.john
+        initials,                  # jd
+    ]
+    return list(dict.fromkeys(c for c in candidates if len(c) > 1))
+
+
+def usernames_for(target: str, username: str | None = None, max_variants: int = DEFAULT_MAX_VARIANTS) -> list[str]:
+    """The explicit username (if any) followed by up to `max_variants` generated from the target name."""
+    names = [username.strip()] if username and username.strip() else []
+    for variant in name_variants(target)[:max_variants]:
+        if variant not in names:
+            names.append(variant)
+    return names